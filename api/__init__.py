@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from . import theory, skill, profession, quest, user_progress
+from . import theory, skill, profession, quest, user_progress, bulk, export, metrics
 
 api_router = APIRouter()
 api_router.include_router(theory.router)
@@ -7,3 +7,7 @@ api_router.include_router(skill.router)
 api_router.include_router(profession.router)
 api_router.include_router(quest.router)
 api_router.include_router(user_progress.router)
+api_router.include_router(user_progress.users_router)
+api_router.include_router(bulk.router)
+api_router.include_router(export.router)
+api_router.include_router(metrics.router)
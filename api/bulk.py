@@ -0,0 +1,120 @@
+from typing import Any, List, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pymongo.errors import PyMongoError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.pagination import NDJSON_MEDIA_TYPE
+from db.mongo import get_mongo_db
+from db.session import get_session
+from schemas.bulk import (
+    CatalogRecord,
+    ImportResult,
+    ProfessionImport,
+    QuestImport,
+    RowError,
+    SkillImport,
+    TheoryImport,
+)
+from services.import_service import import_service, parse_records
+from services.exceptions import NotFoundError
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+async def read_records(request: Request, schema: Any, skip_invalid: bool) -> Tuple[List, List[RowError]]:
+    """
+    Тело запроса — JSON-массив записей или NDJSON (Content-Type: application/x-ndjson,
+    одна запись на строку). Каждая запись валидируется отдельно; при ошибках без
+    skipInvalid ничего не пишется и возвращается 422 со списком ошибок по записям.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    try:
+        items, errors = parse_records(await request.body(), content_type == NDJSON_MEDIA_TYPE, schema)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if errors and not skip_invalid:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": "Import rejected, nothing was written", "errors": [e.model_dump() for e in errors]},
+        )
+    return items, errors
+
+
+def _skip_invalid(skip_invalid: bool = Query(False, alias="skipInvalid")) -> bool:
+    """skipInvalid=true — импортировать валидные записи, невалидные вернуть в errors."""
+    return skip_invalid
+
+
+async def _run(import_call, errors: List[RowError]) -> ImportResult:
+    try:
+        result = await import_call
+    except IntegrityError as e:
+        # например, несуществующий professionIds/theoryIds — транзакция откатывается целиком
+        raise HTTPException(status_code=409, detail=f"Import rejected by database: {e.orig}")
+    result.errors = errors
+    return result
+
+
+@router.post("/professions", response_model=ImportResult, status_code=status.HTTP_201_CREATED)
+async def import_professions(
+    request: Request,
+    skip_invalid: bool = Depends(_skip_invalid),
+    db: AsyncSession = Depends(get_session),
+):
+    """Профессии целиком: profession -> skills -> theories -> subTheories."""
+    items, errors = await read_records(request, ProfessionImport, skip_invalid)
+    return await _run(import_service.import_professions(db, items), errors)
+
+
+@router.post("/skills", response_model=ImportResult, status_code=status.HTTP_201_CREATED)
+async def import_skills(
+    request: Request,
+    skip_invalid: bool = Depends(_skip_invalid),
+    db: AsyncSession = Depends(get_session),
+):
+    """Скиллы с деревьями теорий; professionIds — привязка к существующим профессиям."""
+    items, errors = await read_records(request, SkillImport, skip_invalid)
+    return await _run(import_service.import_skills(db, items), errors)
+
+
+@router.post("/skills/{skill_id}/theories", response_model=ImportResult, status_code=status.HTTP_201_CREATED)
+async def import_theories(
+    skill_id: int,
+    request: Request,
+    skip_invalid: bool = Depends(_skip_invalid),
+    db: AsyncSession = Depends(get_session),
+):
+    """Деревья теорий в существующий скилл; корни встают после уже имеющихся."""
+    items, errors = await read_records(request, TheoryImport, skip_invalid)
+    try:
+        return await _run(import_service.import_theories(db, skill_id, items), errors)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/quests", response_model=ImportResult, status_code=status.HTTP_201_CREATED)
+async def import_quests(
+    request: Request,
+    skip_invalid: bool = Depends(_skip_invalid),
+    db: AsyncSession = Depends(get_session),
+):
+    """Квесты; theoryIds — привязка к существующим теориям."""
+    items, errors = await read_records(request, QuestImport, skip_invalid)
+    return await _run(import_service.import_quests(db, items), errors)
+
+
+@router.post("/catalog", response_model=ImportResult, status_code=status.HTTP_201_CREATED)
+async def import_catalog(
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+    mongo_db=Depends(get_mongo_db),
+):
+    """Выгрузка GET /api/export/catalog целиком: новые строки, ссылки переназначаются."""
+    records, errors = await read_records(request, CatalogRecord, skip_invalid=False)
+    try:
+        return await _run(import_service.import_catalog(db, mongo_db, records), errors)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except PyMongoError as e:
+        raise HTTPException(status_code=503, detail=f"Scenario import failed, nothing was written: {e}")
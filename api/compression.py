@@ -0,0 +1,412 @@
+# api/compression.py
+"""
+Сжатие ответов по Accept-Encoding (zstd / br / gzip) и кэш готовых ответов каталога.
+
+CompressionMiddleware:
+- выбирает кодировку по Accept-Encoding (q-значения; при равных — порядок
+  settings.compression_encodings), сжимает ответы от compression_minimum_size байт,
+  потоковые (NDJSON) — по частям, с flush после каждой;
+- ответы GET-эндпоинтов каталога (зависимость catalog_cache) кладёт в ResponseCache
+  вместе с ETag: повторный запрос того же URL, пока ETag не изменился (версии ресурсов
+  общие для всех процессов, services.versions; у ответов из снимка каталога — и его
+  поколение, api.conditional.catalog_etag) и запись не старше
+  settings.response_cache_ttl_s, отдаётся из памяти — без роутинга, БД, сериализации
+  и повторного сжатия (сжатые варианты тела хранятся рядом с исходным и считаются один раз).
+
+Сжатие и кэш включаются независимо (APP_COMPRESSION_ENABLED, APP_RESPONSE_CACHE_ENABLED).
+brotli и zstandard — необязательные зависимости: без пакета кодировка просто не предлагается.
+"""
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from api.conditional import (
+    CATALOG_RESOURCES_SCOPE_KEY,
+    CATALOG_SNAPSHOT_SCOPE_KEY,
+    cache_headers,
+    catalog_etag,
+    etag_matches,
+)
+from core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - необязательная зависимость
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - необязательная зависимость
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript")
+
+
+# -------- Кодеки --------
+# Уровни — быстрые: ответ каталога сжимается заново после каждой смены версии ресурса
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: формат gzip
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class Codec:
+    def __init__(self, name: str, stream_cls, level: int):
+        self.name = name
+        self._stream_cls = stream_cls
+        self._level = level
+
+    def compress(self, data: bytes) -> bytes:
+        stream = self.stream()
+        return stream.chunk(data) + stream.finish()
+
+    def stream(self):
+        return self._stream_cls(self._level)
+
+
+_KNOWN_CODECS: Dict[str, Codec] = {"gzip": Codec("gzip", _GzipStream, level=6)}
+if brotli is not None:
+    _KNOWN_CODECS["br"] = Codec("br", _BrotliStream, level=4)
+if zstandard is not None:
+    _KNOWN_CODECS["zstd"] = Codec("zstd", _ZstdStream, level=3)
+
+# включённые и доступные, в порядке предпочтения сервера
+CODECS: Dict[str, Codec] = {
+    name: _KNOWN_CODECS[name] for name in settings.compression_encodings if name in _KNOWN_CODECS
+}
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    Кодировка из CODECS для заголовка Accept-Encoding (RFC 9110): наибольшее q > 0,
+    при равных — порядок сервера; "*" покрывает неназванные. None — без сжатия.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    best: Optional[str] = None
+    best_q = 0.0
+    for name in CODECS:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if vary is None:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+# -------- Кэш готовых ответов --------
+
+class CachedResponse:
+    __slots__ = ("etag", "resources", "snapshot", "route", "headers", "body", "encoded", "expires_at")
+
+    def __init__(
+        self,
+        etag: str,
+        resources: Sequence[str],
+        headers: List[Tuple[bytes, bytes]],
+        body: bytes,
+        snapshot: bool = False,
+        route: Any = None,
+    ):
+        self.etag = etag
+        self.resources = tuple(resources)
+        self.snapshot = snapshot  # ответ из снимка каталога: в ETag его поколение
+        self.route = route  # scope["route"] исходного запроса — метки метрик для ответов из кэша
+        self.headers = headers  # без content-length/content-encoding/vary
+        self.body = body
+        self.encoded: Dict[str, bytes] = {}
+        self.expires_at = float("inf")  # time.monotonic(); ставит ResponseCache.put
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(b) for b in self.encoded.values())
+
+
+class ResponseCache:
+    """
+    LRU готовых ответов каталога, ограниченный числом записей и суммарным размером.
+    Запись актуальна, пока ETag текущих версий её ресурсов совпадает с сохранённым
+    и она не старше ttl_s. TTL — страховка для изменений каталога в обход сервисов
+    (ручной SQL без catalog_version): такой ответ живёт не дольше ttl_s; 0 — без лимита.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_s: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # записи, вытесненные сменой версии ресурса
+        self.expired = 0  # записи старше ttl_s
+        self.evictions = 0
+
+    async def get(self, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        etag, _ = await catalog_etag(entry.resources, entry.snapshot)
+        if self._entries.get(key) is not entry:
+            self.misses += 1  # пока ждали версии или снимок, запись заменили или вытеснили
+            return None
+        if entry.etag != etag:
+            self._remove(key)
+            self.stale += 1
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, entry: CachedResponse) -> None:
+        if self.ttl_s:
+            entry.expires_at = time.monotonic() + self.ttl_s
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._evict()
+
+    def body(self, key: Hashable, entry: CachedResponse, encoding: Optional[str]) -> bytes:
+        """Тело в нужной кодировке; сжатый вариант считается один раз и остаётся в записи."""
+        if encoding is None:
+            return entry.body
+        encoded = entry.encoded.get(encoding)
+        if encoded is None:
+            encoded = entry.encoded[encoding] = CODECS[encoding].compress(entry.body)
+            if self._entries.get(key) is entry:
+                self._bytes += len(encoded)
+                self._evict()
+        return encoded
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    max_bytes=settings.response_cache_max_bytes,
+    ttl_s=settings.response_cache_ttl_s,
+)
+
+_SKIP_CACHED_HEADERS = {b"content-length", b"content-encoding", b"vary"}
+
+
+# -------- ASGI middleware --------
+
+class CompressionMiddleware:
+    """Сжатие (compress=False — отдаётся без сжатия) и кэш готовых ответов (cache=None — без кэша)."""
+
+    def __init__(self, app, cache: Optional[ResponseCache] = None, compress: bool = True):
+        self.app = app
+        self.cache = cache
+        self.compress = compress
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding", "")) if self.compress else None
+        key = None
+        if self.cache is not None and scope["method"] == "GET":
+            key = (scope["path"], scope["query_string"])
+            entry = await self.cache.get(key)
+            if entry is not None:
+                # ответ из кэша не проходит роутинг: маршрут для метрик (core.metrics) — из записи
+                scope["route"] = entry.route
+                await self._send_cached(send, key, entry, encoding, request_headers.get("if-none-match"))
+                return
+
+        responder = _Responder(send, scope, encoding, self.cache, key)
+        await self.app(scope, receive, responder.send)
+
+    async def _send_cached(self, send, key, entry: CachedResponse, encoding, if_none_match) -> None:
+        if etag_matches(if_none_match, entry.etag):
+            headers = MutableHeaders()
+            headers.update(cache_headers(entry.etag))
+            if self.compress:
+                _add_vary(headers)
+            await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if encoding is not None and len(entry.body) < settings.compression_minimum_size:
+            encoding = None
+        body = self.cache.body(key, entry, encoding)
+        headers = MutableHeaders(raw=list(entry.headers))
+        headers["Content-Length"] = str(len(body))
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        if self.compress:
+            _add_vary(headers)
+        await send({"type": "http.response.start", "status": 200, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
+
+
+class _Responder:
+    """Обёртка send одного запроса: ждёт первую часть тела, чтобы решить, сжимать ли и кэшировать ли ответ."""
+
+    def __init__(self, send, scope, encoding: Optional[str], cache: Optional[ResponseCache], key):
+        self._send = send
+        self._scope = scope
+        self._encoding = encoding
+        self._cache = cache
+        self._key = key
+        self._start: Optional[dict] = None
+        self._cached: Optional[CachedResponse] = None
+        self._stream = None  # потоковый компрессор, если тело идёт частями
+        self._started = False
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body" or self._start is None:
+            await self._send(message)
+            return
+
+        if self._started:
+            await self._send_chunk(message)
+            return
+        self._started = True
+
+        headers = MutableHeaders(scope=self._start)
+        status = self._start["status"]
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not more_body:
+            self._maybe_cache(headers, status, body)
+        encoding = self._encoding if status not in (204, 304) and _compressible(headers) else None
+        if encoding is not None:
+            _add_vary(headers)
+        if not more_body:
+            if encoding is None or len(body) < settings.compression_minimum_size:
+                await self._send(self._start)
+                await self._send(message)
+                return
+            if self._cached is not None:
+                body = self._cache.body(self._key, self._cached, encoding)
+            else:
+                body = CODECS[encoding].compress(body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            await self._send(self._start)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        # потоковый ответ: длина заранее неизвестна — сжимаем по частям
+        if encoding is not None:
+            self._stream = CODECS[encoding].stream()
+            headers["Content-Encoding"] = encoding
+            del headers["Content-Length"]
+        await self._send(self._start)
+        await self._send_chunk(message)
+
+    async def _send_chunk(self, message) -> None:
+        if self._stream is None:
+            await self._send(message)
+            return
+        more_body = message.get("more_body", False)
+        data = self._stream.chunk(message.get("body", b""))
+        if not more_body:
+            data += self._stream.finish()
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _maybe_cache(self, headers: MutableHeaders, status: int, body: bytes) -> None:
+        resources = self._scope.get(CATALOG_RESOURCES_SCOPE_KEY)
+        etag = headers.get("etag")
+        if self._key is None or status != 200 or not resources or etag is None:
+            return
+        if "content-encoding" in headers or len(body) > self._cache.max_bytes:
+            return
+        cached_headers = [(k, v) for k, v in self._start["headers"] if k.lower() not in _SKIP_CACHED_HEADERS]
+        snapshot = CATALOG_SNAPSHOT_SCOPE_KEY in self._scope
+        self._cached = CachedResponse(etag, resources, cached_headers, body, snapshot, self._scope.get("route"))
+        self._cache.put(self._key, self._cached)
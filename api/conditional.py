@@ -0,0 +1,95 @@
+# api/conditional.py
+from typing import Awaitable, Callable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+from core.config import settings
+from services.catalog_snapshot import CatalogSnapshot, catalog_snapshot
+from services.versions import catalog_versions
+
+# Ключ scope с ресурсами ответа catalog_cache: такой ответ можно держать в кэше готовых
+# ответов (api.compression), пока ETag этих ресурсов не изменился
+CATALOG_RESOURCES_SCOPE_KEY = "learner.catalog_resources"
+# Ключ scope со снимком, поколение которого вошло в ETag (catalog_cache(..., snapshot=True));
+# тот же снимок получает обработчик — тело и ETag всегда от одних данных
+CATALOG_SNAPSHOT_SCOPE_KEY = "learner.catalog_snapshot"
+CATALOG_GENERATION_HEADER = "X-Catalog-Generation"
+
+
+def cache_headers(etag: str) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={settings.catalog_cache_max_age_s}, "
+            f"s-maxage={settings.catalog_cache_s_maxage_s}, must-revalidate"
+        ),
+    }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Слабое сравнение (RFC 9110): W/ не учитывается
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+async def _load_snapshot() -> Optional[CatalogSnapshot]:
+    if not settings.catalog_snapshot_enabled:
+        return None
+    try:
+        return await catalog_snapshot.get()
+    except Exception:
+        return None  # ошибку сборки логирует CatalogSnapshotStore; читаем из Postgres
+
+
+async def catalog_etag(resources: Sequence[str], snapshot: bool) -> Tuple[str, Optional[CatalogSnapshot]]:
+    """
+    Текущий ETag ресурсов и снимок каталога, если ответ отдаётся из него (snapshot=True):
+    тогда в ETag входит поколение снимка и пересборка по возрасту (изменения в обход
+    catalog_version) меняет ETag. Общая для catalog_cache и кэша готовых ответов.
+    """
+    await catalog_versions.refresh()
+    current = await _load_snapshot() if snapshot else None
+    generation = current.generation if current is not None else None
+    return catalog_versions.etag(*resources, generation=generation), current
+
+
+def catalog_cache(*resources: str, snapshot: bool = False) -> Callable[[Request, Response], Awaitable[str]]:
+    """
+    Зависимость для GET-эндпоинтов каталога: ETag из версий ресурсов и Cache-Control.
+    Если клиент прислал актуальный If-None-Match — сразу 304, без запроса каталога
+    (версии читаются из catalog_version не чаще раза в APP_CATALOG_VERSIONS_TTL_S).
+    snapshot=True — маршрут читает из снимка каталога (current_catalog_snapshot).
+    """
+
+    async def _dependency(request: Request, response: Response) -> str:
+        etag, current = await catalog_etag(resources, snapshot)
+        request.scope[CATALOG_RESOURCES_SCOPE_KEY] = resources
+        if snapshot:
+            request.scope[CATALOG_SNAPSHOT_SCOPE_KEY] = current
+        headers = cache_headers(etag)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return etag
+
+    return _dependency
+
+
+async def current_catalog_snapshot(request: Request, response: Response) -> Optional[CatalogSnapshot]:
+    """
+    Зависимость для чтений каталога из памяти: CatalogSnapshot, поколение которого вошло
+    в ETag (catalog_cache(..., snapshot=True) из dependencies маршрута выполняется раньше,
+    ответ 304 тело не строит), и это поколение в X-Catalog-Generation. None — снимок
+    выключен или не собрался: сервисы читают из Postgres.
+    """
+    if CATALOG_SNAPSHOT_SCOPE_KEY in request.scope:
+        snapshot = request.scope[CATALOG_SNAPSHOT_SCOPE_KEY]
+    else:
+        snapshot = await _load_snapshot()
+    if snapshot is not None:
+        response.headers[CATALOG_GENERATION_HEADER] = str(snapshot.generation)
+    return snapshot
@@ -0,0 +1,35 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.pagination import NDJSON_MEDIA_TYPE
+from db.mongo import get_mongo_db
+from db.session import get_session
+from services.export_service import encode_json_array, encode_ndjson, export_service
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/catalog")
+async def export_catalog(
+    format: Literal["ndjson", "json"] = Query("ndjson"),
+    scenarios: bool = Query(True),
+    db: AsyncSession = Depends(get_session),
+    mongo_db=Depends(get_mongo_db),
+):
+    """
+    Потоковая выгрузка каталога плоскими записями {"type": ...}:
+    - format: ndjson (по записи на строку) или json (один массив)
+    - scenarios: выгружать ли сценарии квестов из Mongo
+    Результат можно отправить как есть в POST /api/import/catalog.
+    """
+    records = export_service.stream_catalog(db, mongo_db if scenarios else None)
+    if format == "json":
+        body, media_type, filename = encode_json_array(records), "application/json", "catalog.json"
+    else:
+        body, media_type, filename = encode_ndjson(records), NDJSON_MEDIA_TYPE, "catalog.ndjson"
+    return StreamingResponse(
+        body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from api.compression import response_cache
+from core.metrics import registry
+from db.session import pool_metrics
+from services.catalog_snapshot import catalog_snapshot
+from services.quest_service import quest_scenario_cache
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+# GET /metrics (без /api) — формат Prometheus: гистограммы по маршрутам + состояние пула и кэша
+prometheus_router = APIRouter(tags=["metrics"])
+
+registry.gauges("learner_db_pool", pool_metrics)
+registry.gauges("learner_quest_scenario_cache", quest_scenario_cache.stats)
+registry.gauges("learner_response_cache", response_cache.stats)
+registry.gauges("learner_catalog_snapshot", catalog_snapshot.stats)
+
+
+@router.get("/quest-scenario-cache")
+async def quest_scenario_cache_stats():
+    return quest_scenario_cache.stats()
+
+
+@router.get("/response-cache")
+async def response_cache_stats():
+    return response_cache.stats()
+
+
+@router.get("/catalog-snapshot")
+async def catalog_snapshot_stats():
+    return catalog_snapshot.stats()
+
+
+@router.get("/db-pool")
+async def db_pool():
+    return pool_metrics()
+
+
+@prometheus_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
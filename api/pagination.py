@@ -0,0 +1,76 @@
+# api/pagination.py
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Sequence, Tuple
+
+import orjson
+
+from fastapi import HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-After-Id"
+NEXT_RANK_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# id в БД — INTEGER (int32): большее значение — 422, а не ошибка привязки параметра asyncpg (500)
+MAX_ID = 2**31 - 1
+
+
+@dataclass
+class PageParams:
+    after_id: Optional[int]
+    limit: Optional[int]
+    stream: bool
+
+
+def page_params(
+    after_id: Optional[int] = Query(None, alias="afterId", ge=0, le=MAX_ID),
+    limit: Optional[int] = Query(None, ge=1, le=settings.page_max_limit),
+    stream: bool = Query(False),
+) -> PageParams:
+    """
+    Keyset-пагинация для списков:
+    - afterId: вернуть записи с id > afterId (курсор из заголовка X-Next-After-Id)
+    - limit: размер страницы (без limit — весь список, как раньше)
+    - stream: отдать весь список построчно в NDJSON (память на сервере не растёт)
+    """
+    return PageParams(after_id=after_id, limit=limit, stream=stream)
+
+
+def set_next_cursor(response: Response, items: Sequence, page: PageParams) -> None:
+    # Полная страница — возможно, есть продолжение: отдаём курсор для следующего запроса
+    if page.limit is not None and len(items) == page.limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(items[-1]["id"])
+
+
+def rank_cursor(cursor: Optional[str] = Query(None)) -> Optional[Tuple[float, int]]:
+    """
+    Курсор выдачи, упорядоченной по (rank DESC, id): "<rank>:<id>" последней строки
+    предыдущей страницы (из заголовка X-Next-Cursor).
+    """
+    if cursor is None:
+        return None
+    try:
+        rank, id_ = cursor.split(":")
+        return float(rank), int(id_)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+
+def set_next_rank_cursor(response: Response, items: Sequence, limit: int) -> None:
+    if len(items) == limit:
+        last = items[-1]
+        # repr — точное значение float: на следующей странице сравнение с rank строгое
+        response.headers[NEXT_RANK_CURSOR_HEADER] = f"{last['rank']!r}:{last['id']}"
+
+
+def ndjson_response(payloads: AsyncIterator[dict], response: Optional[Response] = None) -> StreamingResponse:
+    # Строки уже в формате API (словари из *_payload) — только orjson.dumps на строку.
+    # Заголовки внедрённого Response (ETag, Cache-Control) переносим, как json_response
+    async def _lines():
+        async for payload in payloads:
+            yield orjson.dumps(payload) + b"\n"
+
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    return StreamingResponse(_lines(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
@@ -1,25 +1,52 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.conditional import catalog_cache, current_catalog_snapshot
+from api.responses import json_response
+from api.pagination import PageParams, page_params, set_next_cursor, ndjson_response
 from db.session import get_session
 from schemas.profession import ProfessionOut, ProfessionCreate
 from schemas.skill import SkillOut, SkillCreate
+from services.catalog_snapshot import CatalogSnapshot
 from services.profession_service import profession_service
 from services.exceptions import NotFoundError
+from services.versions import PROFESSIONS, SKILLS
 
 router = APIRouter(prefix="/professions", tags=["professions"])
 
 
-@router.get("", response_model=List[ProfessionOut])
-async def get_all(db: AsyncSession = Depends(get_session)):
-    return await profession_service.find_all(db)
+@router.get(
+    "",
+    response_model=List[ProfessionOut],
+    dependencies=[Depends(catalog_cache(PROFESSIONS, snapshot=True))],
+)
+async def get_all(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    snapshot: Optional[CatalogSnapshot] = Depends(current_catalog_snapshot),
+    db: AsyncSession = Depends(get_session),
+):
+    if page.stream:
+        return ndjson_response(profession_service.stream_all(db, page.after_id), response)
+    items = await profession_service.find_all(db, page.after_id, page.limit, snapshot)
+    set_next_cursor(response, items, page)
+    return json_response(items, response)
 
 
-@router.get("/{id}/skills", response_model=List[SkillOut])
-async def get_skills_by_profession(id: int, db: AsyncSession = Depends(get_session)):
+@router.get(
+    "/{id}/skills",
+    response_model=List[SkillOut],
+    dependencies=[Depends(catalog_cache(PROFESSIONS, SKILLS, snapshot=True))],
+)
+async def get_skills_by_profession(
+    id: int,
+    response: Response,
+    snapshot: Optional[CatalogSnapshot] = Depends(current_catalog_snapshot),
+    db: AsyncSession = Depends(get_session),
+):
     try:
-        return await profession_service.get_skills_by_profession(db, id)
+        return json_response(await profession_service.get_skills_by_profession(db, id, snapshot), response)
     except NotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -1,34 +1,40 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.mongo import get_mongo_db
+from api.conditional import catalog_cache
+from api.responses import json_response
+from api.pagination import PageParams, page_params, set_next_cursor, ndjson_response
 from db.session import get_session
 from schemas.quest import QuestOut, QuestCreate, QuestDetailedOut
 from services.quest_service import quest_service
 from services.exceptions import NotFoundError
+from services.versions import QUESTS
 
 router = APIRouter(prefix="/quests", tags=["quests"])
 
 
-@router.get("", response_model=List[QuestOut])
-async def get_all(db: AsyncSession = Depends(get_session)):
-    return await quest_service.find_all(db)
+@router.get("", response_model=List[QuestOut], dependencies=[Depends(catalog_cache(QUESTS))])
+async def get_all(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_session),
+):
+    if page.stream:
+        return ndjson_response(quest_service.stream_all(db, page.after_id), response)
+    items = await quest_service.find_all(db, page.after_id, page.limit)
+    set_next_cursor(response, items, page)
+    return json_response(items, response)
 
 @router.get("/{id}", response_model=QuestDetailedOut)
 async def get_one(id: int, db: AsyncSession = Depends(get_session), mongo_db = Depends(get_mongo_db)):
-    # 1) SQL
-    quest = await quest_service.find_by_id(id, db)
-    if not quest:
-        raise HTTPException(status_code=404, detail=f"Quest not found with id: {id}")
-    # 2) Mongo
-    col = mongo_db['quest_meta']
-    doc = await col.find_one({"quest_id": id}, {"_id": 0})
-    scenario = (doc or {}).get("scenario")
-
-    # 3) Склейка в QuestDetailedOut
-    base = QuestOut.model_validate(quest)
-    return QuestDetailedOut(**base.model_dump(), scenario=scenario)
+    try:
+        return json_response(await quest_service.get_detailed(db, mongo_db, id))
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Quest lookup timed out for id: {id}")
 
 @router.post("", response_model=QuestOut, status_code=status.HTTP_201_CREATED)
 async def create(quest: QuestCreate, db: AsyncSession = Depends(get_session)):
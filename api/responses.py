@@ -0,0 +1,21 @@
+# api/responses.py
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+from core.metrics import timed_serialization
+
+
+def json_response(payload: Any, response: Optional[Response] = None, status_code: int = 200) -> ORJSONResponse:
+    """
+    Быстрый путь ответа: payload уже в формате API (словари из *_payload),
+    поэтому минуем валидацию response_model и сериализуем сразу через orjson.
+    FastAPI не переносит заголовки из внедрённого Response, когда эндпоint
+    возвращает Response сам, — копируем их (ETag, Cache-Control, курсор) явно.
+    """
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    with timed_serialization():
+        return ORJSONResponse(payload, status_code=status_code, headers=headers)
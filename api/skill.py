@@ -1,19 +1,33 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Response, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.conditional import catalog_cache, current_catalog_snapshot
+from api.responses import json_response
+from api.pagination import PageParams, page_params, set_next_cursor, ndjson_response
 from db.session import get_session
 from schemas.skill import SkillOut, SkillCreate, SkillUpdate
-from schemas.theory import TheoryOut, TheoryCreate
+from schemas.theory import TheoryCreate, TheoryFields, TheoryOut, TheorySummaryOut
+from services.catalog_snapshot import CatalogSnapshot
 from services.skill_service import skill_service
 from services.exceptions import NotFoundError
+from services.versions import SKILLS, THEORIES
 
 router = APIRouter(prefix="/skills", tags=["skills"])
 
 
-@router.get("", response_model=List[SkillOut])
-async def find_all(db: AsyncSession = Depends(get_session)):
-    return await skill_service.find_all(db)
+@router.get("", response_model=List[SkillOut], dependencies=[Depends(catalog_cache(SKILLS, snapshot=True))])
+async def find_all(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    snapshot: Optional[CatalogSnapshot] = Depends(current_catalog_snapshot),
+    db: AsyncSession = Depends(get_session),
+):
+    if page.stream:
+        return ndjson_response(skill_service.stream_all(db, page.after_id), response)
+    items = await skill_service.find_all(db, page.after_id, page.limit, snapshot)
+    set_next_cursor(response, items, page)
+    return json_response(items, response)
 
 
 @router.put("/{id}", response_model=SkillOut)
@@ -28,13 +42,29 @@ async def update(
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@router.get("/{skill_id}/theories", response_model=List[TheoryOut])
+@router.get(
+    "/{skill_id}/theories",
+    response_model=Union[List[TheoryOut], List[TheorySummaryOut]],
+    dependencies=[Depends(catalog_cache(SKILLS, THEORIES, snapshot=True))],
+)
 async def get_theories_by_skill(
     skill_id: int,
+    response: Response,
+    max_depth: Optional[int] = Query(None, alias="maxDepth", ge=0),
+    fields: TheoryFields = Query("full"),
+    snapshot: Optional[CatalogSnapshot] = Depends(current_catalog_snapshot),
     db: AsyncSession = Depends(get_session),
 ):
+    """
+    Дерево теорий навыка:
+    - maxDepth: максимальная глубина (0 — только корни), по умолчанию без ограничения
+    - fields=summary: узлы без content (тела — GET /theories/{id} или /theories/batch?ids=);
+      отдаётся из снимка каталога в памяти, без запросов в БД
+    """
     try:
-        return await skill_service.get_theories_by_skill(db, skill_id)
+        return json_response(
+            await skill_service.get_theories_by_skill(db, skill_id, max_depth, fields, snapshot), response
+        )
     except NotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -75,6 +105,8 @@ async def move_theory(
         )
     except NotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     return None
 
 
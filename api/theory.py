@@ -1,17 +1,119 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Tuple, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.conditional import catalog_cache
+from api.responses import json_response
+from api.pagination import (
+    PageParams,
+    page_params,
+    rank_cursor,
+    set_next_cursor,
+    set_next_rank_cursor,
+    ndjson_response,
+)
+from core.config import settings
 from db.session import get_session
-from schemas.theory import TheoryOut, TheoryCreate, TheoryUpdate
+from schemas.theory import (
+    TheoryCreate,
+    TheoryFields,
+    TheoryOut,
+    TheorySearchHitOut,
+    TheorySummaryOut,
+    TheoryUpdate,
+)
 from services.theory_service import theory_service
 from services.exceptions import NotFoundError
+from services.versions import PROFESSIONS, THEORIES
 
 router = APIRouter(prefix="/theories", tags=["theories"])
 
-@router.get("", response_model=List[TheoryOut])
-async def get_all(db: AsyncSession = Depends(get_session)):
-    return await theory_service.find_all(db)
+@router.get(
+    "",
+    response_model=Union[List[TheoryOut], List[TheorySummaryOut]],
+    dependencies=[Depends(catalog_cache(THEORIES))],
+)
+async def get_all(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    fields: TheoryFields = Query("full"),
+    db: AsyncSession = Depends(get_session),
+):
+    """fields=summary — без content (тела — GET /theories/{id} или /theories/batch?ids=)."""
+    if page.stream:
+        return ndjson_response(theory_service.stream_all(db, page.after_id, fields), response)
+    items = await theory_service.find_all(db, page.after_id, page.limit, fields)
+    set_next_cursor(response, items, page)
+    return json_response(items, response)
+
+@router.get("/batch", response_model=List[TheoryOut], dependencies=[Depends(catalog_cache(THEORIES))])
+async def get_batch(
+    response: Response,
+    ids: List[int] = Query(..., min_length=1, max_length=settings.page_max_limit),
+    db: AsyncSession = Depends(get_session),
+):
+    """Теории с content по списку ?ids=1&ids=2 (по возрастанию id, несуществующие пропускаются)."""
+    return json_response(await theory_service.find_by_ids(db, ids), response)
+
+@router.get(
+    "/search",
+    response_model=List[TheorySearchHitOut],
+    dependencies=[Depends(catalog_cache(THEORIES, PROFESSIONS))],
+)
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    skill_id: Optional[int] = Query(None, alias="skillId"),
+    profession_id: Optional[int] = Query(None, alias="professionId"),
+    limit: int = Query(20, ge=1, le=settings.page_max_limit),
+    after: Optional[Tuple[float, int]] = Depends(rank_cursor),
+    db: AsyncSession = Depends(get_session),
+):
+    try:
+        items = await theory_service.search(db, q, skill_id, profession_id, after, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    set_next_rank_cursor(response, items, limit)
+    return json_response(items, response)
+
+@router.get("/{id}", response_model=TheoryOut, dependencies=[Depends(catalog_cache(THEORIES))])
+async def get_by_id(id: int, response: Response, db: AsyncSession = Depends(get_session)):
+    try:
+        return json_response(await theory_service.get_by_id(db, id), response)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get(
+    "/{id}/subtree",
+    response_model=Union[TheoryOut, TheorySummaryOut],
+    dependencies=[Depends(catalog_cache(THEORIES))],
+)
+async def get_subtree(
+    id: int,
+    response: Response,
+    fields: TheoryFields = Query("full"),
+    db: AsyncSession = Depends(get_session),
+):
+    try:
+        return json_response(await theory_service.get_subtree(db, id, fields), response)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get(
+    "/{id}/ancestors",
+    response_model=Union[List[TheoryOut], List[TheorySummaryOut]],
+    dependencies=[Depends(catalog_cache(THEORIES))],
+)
+async def get_ancestors(
+    id: int,
+    response: Response,
+    fields: TheoryFields = Query("full"),
+    db: AsyncSession = Depends(get_session),
+):
+    try:
+        return json_response(await theory_service.get_ancestors(db, id, fields), response)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 @router.post("", response_model=TheoryOut, status_code=status.HTTP_201_CREATED)
 async def create(theory: TheoryCreate, db: AsyncSession = Depends(get_session)):
@@ -23,6 +125,8 @@ async def update(id: int, theory: TheoryUpdate, db: AsyncSession = Depends(get_s
         return await theory_service.update(db, id, theory)
     except NotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete(id: int, db: AsyncSession = Depends(get_session)):
@@ -1,29 +1,169 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Callable, Optional, Union
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, status
 from pydantic import BaseModel, Field
+from pymongo.errors import PyMongoError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.pagination import MAX_ID
+from api.responses import json_response
+from core.config import settings
+from db.mongo import get_mongo_db
 from db.session import get_session
-from schemas.user_progress import UserProgressOut
+from schemas.user_progress import (
+    CompleteItemsIn,
+    IdEncoding,
+    ProfessionProgressOut,
+    ProgressDeltaOut,
+    SelectProfessionsIn,
+    SkillProgressOut,
+    TheoryProgressOut,
+    UserProgressCompactOut,
+    UserProgressOut,
+)
 from services.user_progress_service import user_progress_service
 from services.exceptions import NotFoundError
 
-router = APIRouter(prefix="/user-progress", tags=["user-progress"])
 
 class UserNameIn(BaseModel):
     userName: str = Field(..., min_length=1)
 
 
-@router.get("", response_model=UserProgressOut)
-async def get_user_progress(db: AsyncSession = Depends(get_session)):
-    try:
-        up = await user_progress_service.get_user_progress(db)
-        if up is None:
-            raise NotFoundError("User progress not found")
-        return up
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+def user_id_from_header(
+    x_user_id: Optional[int] = Header(None, alias="X-User-Id", ge=1, le=MAX_ID),
+) -> int:
+    """Пользователь из X-User-Id; без заголовка — APP_DEFAULT_USER_ID (0 — заголовок обязателен)."""
+    if x_user_id is not None:
+        return x_user_id
+    if settings.default_user_id:
+        return settings.default_user_id
+    raise HTTPException(status_code=400, detail="X-User-Id header is required")
+
+
+def user_id_from_path(
+    user_id: int = Path(..., ge=1, le=MAX_ID),
+    x_user_id: Optional[int] = Header(None, alias="X-User-Id", ge=1, le=MAX_ID),
+) -> int:
+    """Пользователь из пути — только свой: id должен совпадать с X-User-Id (его выставляет шлюз)."""
+    if x_user_id is None:
+        raise HTTPException(status_code=400, detail="X-User-Id header is required")
+    if x_user_id != user_id:
+        raise HTTPException(status_code=403, detail="Progress of another user is not accessible")
+    return user_id
+
+
+def _progress_router(prefix: str, current_user_id: Callable[..., int]) -> APIRouter:
+    """Одни и те же эндпоинты прогресса; пользователь берётся зависимостью current_user_id."""
+    router = APIRouter(prefix=prefix, tags=["user-progress"])
+
+    @router.get("", response_model=Union[UserProgressOut, UserProgressCompactOut])
+    async def get_user_progress(
+        encoding: IdEncoding = Query("ids"),
+        user_id: int = Depends(current_user_id),
+        db: AsyncSession = Depends(get_session),
+    ):
+        """encoding=delta|ranges — компактные списки id для длинной истории."""
+        try:
+            up = await user_progress_service.get_user_progress(db, user_id, encoding)
+            if up is None:
+                raise NotFoundError("User progress not found")
+            return json_response(up)
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+    @router.post("", response_model=UserProgressOut, status_code=status.HTTP_201_CREATED)
+    async def create_user_progress(
+        payload: UserNameIn,
+        user_id: int = Depends(current_user_id),
+        db: AsyncSession = Depends(get_session),
+    ):
+        try:
+            up = await user_progress_service.create_user_progress(db, user_id, payload.userName)
+            return json_response(up, status_code=status.HTTP_201_CREATED)
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+    @router.post("/completed-theories", response_model=ProgressDeltaOut)
+    async def complete_theories(
+        payload: CompleteItemsIn,
+        user_id: int = Depends(current_user_id),
+        db: AsyncSession = Depends(get_session),
+        mongo_db=Depends(get_mongo_db),
+    ):
+        """Отметить теории пройденными; очки (по наградам квестов) — только за новые отметки."""
+        try:
+            return await user_progress_service.complete_theories(db, mongo_db, user_id, payload.items)
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except PyMongoError as e:
+            raise HTTPException(status_code=503, detail=f"Quest rewards lookup failed, nothing was written: {e}")
+
+    @router.post("/completed-quests", response_model=ProgressDeltaOut)
+    async def complete_quests(
+        payload: CompleteItemsIn,
+        user_id: int = Depends(current_user_id),
+        db: AsyncSession = Depends(get_session),
+        mongo_db=Depends(get_mongo_db),
+    ):
+        """Отметить квесты пройденными; очки (по наградам квестов) — только за новые отметки."""
+        try:
+            return await user_progress_service.complete_quests(db, mongo_db, user_id, payload.items)
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except PyMongoError as e:
+            raise HTTPException(status_code=503, detail=f"Quest rewards lookup failed, nothing was written: {e}")
+
+    @router.post("/selected-professions", response_model=ProgressDeltaOut)
+    async def select_professions(
+        payload: SelectProfessionsIn,
+        user_id: int = Depends(current_user_id),
+        db: AsyncSession = Depends(get_session),
+    ):
+        try:
+            return await user_progress_service.select_professions(db, user_id, payload.ids)
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+    # --- сводки: сколько теорий пройдено из скилла / профессии / поддерева теории ---
+
+    @router.get("/summary/skills/{skill_id}", response_model=SkillProgressOut)
+    async def skill_summary(
+        skill_id: int,
+        user_id: int = Depends(current_user_id),
+        db: AsyncSession = Depends(get_session),
+    ):
+        try:
+            return await user_progress_service.skill_summary(db, user_id, skill_id)
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+    @router.get("/summary/professions/{profession_id}", response_model=ProfessionProgressOut)
+    async def profession_summary(
+        profession_id: int,
+        user_id: int = Depends(current_user_id),
+        db: AsyncSession = Depends(get_session),
+    ):
+        """Итог по профессии и разбивка по её скиллам."""
+        try:
+            return await user_progress_service.profession_summary(db, user_id, profession_id)
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+    @router.get("/summary/theories/{theory_id}", response_model=TheoryProgressOut)
+    async def theory_summary(
+        theory_id: int,
+        user_id: int = Depends(current_user_id),
+        db: AsyncSession = Depends(get_session),
+    ):
+        """Итог по поддереву теории, включая её саму."""
+        try:
+            return await user_progress_service.theory_summary(db, user_id, theory_id)
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+    return router
 
 
-@router.post("", response_model=UserProgressOut, status_code=status.HTTP_201_CREATED)
-async def create_user_progress(payload: UserNameIn, db: AsyncSession = Depends(get_session)):
-    return await user_progress_service.create_user_progress(db, payload.userName)
+# /api/user-progress — текущий пользователь из заголовка; /api/users/{user_id}/progress — тот же пользователь по id
+router = _progress_router("/user-progress", user_id_from_header)
+users_router = _progress_router("/users/{user_id}/progress", user_id_from_path)
@@ -0,0 +1,369 @@
+# benchmarks/api_load.py
+"""
+Нагрузочный прогон всех роутеров api/ на синтетическом каталоге.
+
+1) Каталог (профессии -> скиллы -> деревья теорий глубины --depth с ветвлением --fanout,
+   квесты со связями, сценариями и наградами в Mongo) создаётся через ImportService.import_catalog,
+   плюс --users пользователей с частью пройденных теорий.
+2) Каждый сценарий (эндпоинт) гоняется --requests раз при фиксированной --concurrency
+   асинхронным httpx-клиентом: в процессе (ASGITransport, по умолчанию) или на --url.
+3) Для сценария: p50/p95/p99, пропускная способность, ошибки и число SQL-запросов
+   на запрос — из заголовка Server-Timing (APP_SERVER_TIMING=true; у потоковых ответов,
+   например export.catalog, заголовок уходит до запросов тела — там 0).
+4) --save пишет результаты в JSON; --baseline сравнивает с сохранёнными: рост числа
+   SQL-запросов — регрессия всегда, p95 — если хуже на --tolerance. Код выхода 1 при регрессии.
+   Задержки зависят от машины — базовую линию снимайте на той же, число запросов — нет.
+
+Запуск (нужна БД из APP_DB_URL с миграциями; данные фиксируются, а в конце удаляются):
+    python -m benchmarks.api_load --no-mongo --save benchmarks/baselines/api_load.json
+    python -m benchmarks.api_load --no-mongo --baseline benchmarks/baselines/api_load.json
+    python -m benchmarks.api_load --no-mongo --only skills.theories quests.detail
+Пул соединений должен вмещать клиентов: APP_DB_POOL_SIZE >= --concurrency.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+from sqlalchemy import delete, select
+
+from core.config import settings
+from db.mongo import close_mongo, get_mongo_db
+from db.session import AsyncSessionLocal, engine
+from models.models import Profession, Quest, Skill, Theory, UserProgress
+from schemas.bulk import (
+    ProfessionRecord,
+    ProfessionSkillRecord,
+    QuestRecord,
+    QuestScenarioRecord,
+    SkillRecord,
+    TheoryQuestRecord,
+    TheoryRecord,
+)
+from schemas.quest import QuestRewards
+from schemas.user_progress import ProgressItemIn
+from services.import_service import import_service
+from services.user_progress_service import user_progress_service
+
+PREFIX = "bench-api"
+# id тестовых пользователей — вне диапазона реальных (как в progress_load)
+USER_ID_BASE = 2_100_000_000
+_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+# -------- Синтетический каталог --------
+
+def catalog_records(args, rnd: random.Random) -> list:
+    records: list = []
+    theory_ids: List[int] = []
+    next_id = iter(range(1, 10**9))
+    for p in range(args.professions):
+        profession_id = next(next_id)
+        records.append(ProfessionRecord(type="profession", id=profession_id, name=f"{PREFIX}-p{p}", icon="i"))
+        for s in range(args.skills):
+            skill_id = next(next_id)
+            records.append(SkillRecord(type="skill", id=skill_id, name=f"{PREFIX}-p{p}-s{s}", icon="i"))
+            records.append(ProfessionSkillRecord(type="professionSkill", professionId=profession_id, skillId=skill_id))
+            parents: List[Optional[int]] = [None]
+            for _ in range(args.depth):
+                level: List[int] = []
+                for parent_id in parents:
+                    for i in range(args.fanout):
+                        theory_id = next(next_id)
+                        records.append(
+                            TheoryRecord(
+                                type="theory", id=theory_id, skillId=skill_id, parentId=parent_id,
+                                title=f"t{theory_id}", content="lorem ipsum " * 40, orderIndex=i,
+                            )
+                        )
+                        level.append(theory_id)
+                theory_ids.extend(level)
+                parents = level
+    for q in range(args.quests):
+        quest_id = next(next_id)
+        records.append(QuestRecord(type="quest", id=quest_id, name=f"{PREFIX}-q{q}", description="d" * 200))
+        for theory_id in rnd.sample(theory_ids, min(args.quest_theories, len(theory_ids))):
+            records.append(TheoryQuestRecord(type="theoryQuest", questId=quest_id, theoryId=theory_id))
+        if not args.no_mongo:
+            scenario = {"steps": [{"n": i, "text": "step " * 20} for i in range(10)]}
+            rewards = QuestRewards(experiencePoints=50, goldPoints=5, theoryExperiencePoints=10, theoryGoldPoints=1)
+            records.append(
+                QuestScenarioRecord(type="questScenario", questId=quest_id, scenario=scenario, rewards=rewards)
+            )
+    return records
+
+
+@dataclass
+class Seeded:
+    professions: List[int] = field(default_factory=list)
+    skills: List[int] = field(default_factory=list)
+    quests: List[int] = field(default_factory=list)
+    theories: List[int] = field(default_factory=list)
+    # скилл -> корневые теории (для move-theory)
+    roots: Dict[int, List[int]] = field(default_factory=dict)
+    users: List[int] = field(default_factory=list)
+
+
+async def seed(args, rnd: random.Random) -> Seeded:
+    async with AsyncSessionLocal() as db:
+        mongo_db = None if args.no_mongo else get_mongo_db()
+        await import_service.import_catalog(db, mongo_db, catalog_records(args, rnd))
+
+        s = Seeded()
+        s.professions = list((await db.execute(
+            select(Profession.id).where(Profession.name.like(f"{PREFIX}-%")).order_by(Profession.id)
+        )).scalars())
+        s.skills = list((await db.execute(
+            select(Skill.id).where(Skill.name.like(f"{PREFIX}-%")).order_by(Skill.id)
+        )).scalars())
+        s.quests = list((await db.execute(
+            select(Quest.id).where(Quest.name.like(f"{PREFIX}-%")).order_by(Quest.id)
+        )).scalars())
+        for theory_id, skill_id, parent_id in await db.execute(
+            select(Theory.id, Theory.skill_id, Theory.parent_id).where(Theory.skill_id.in_(s.skills))
+        ):
+            s.theories.append(theory_id)
+            if parent_id is None:
+                s.roots.setdefault(skill_id, []).append(theory_id)
+
+    mongo_db = None if args.no_mongo else get_mongo_db()
+    for i in range(args.users):
+        user_id = USER_ID_BASE + i
+        async with AsyncSessionLocal() as db:
+            await user_progress_service.create_user_progress(db, user_id, f"{PREFIX}-u{i}")
+            done = rnd.sample(s.theories, len(s.theories) * args.completed_pct // 100)
+            if done:
+                items = [ProgressItemIn(id=t) for t in done]
+                await user_progress_service.complete_theories(db, mongo_db, user_id, items)
+        s.users.append(user_id)
+    return s
+
+
+async def cleanup(args) -> None:
+    async with AsyncSessionLocal() as db:
+        quest_ids = list((await db.execute(select(Quest.id).where(Quest.name.like(f"{PREFIX}-%")))).scalars())
+        skill_ids = select(Skill.id).where(Skill.name.like(f"{PREFIX}-%")).scalar_subquery()
+        # строки прогресса, связи и счётчики уходят каскадом
+        await db.execute(delete(UserProgress).where(UserProgress.id >= USER_ID_BASE))
+        await db.execute(delete(Theory).where(Theory.skill_id.in_(skill_ids)))
+        await db.execute(delete(Quest).where(Quest.id.in_(quest_ids)))
+        await db.execute(delete(Skill).where(Skill.name.like(f"{PREFIX}-%")))
+        await db.execute(delete(Profession).where(Profession.name.like(f"{PREFIX}-%")))
+        await db.commit()
+    if not args.no_mongo and quest_ids:
+        await get_mongo_db()["quest_meta"].delete_many({"quest_id": {"$in": quest_ids}})
+
+
+# -------- Сценарии --------
+
+class Request(NamedTuple):
+    method: str
+    url: str
+    body: Optional[Any] = None
+    headers: Optional[Dict[str, str]] = None
+
+
+# name -> (метод, путь, тело и заголовки запроса по случайным данным каталога)
+Scenario = Callable[[Seeded, random.Random], Request]
+
+
+def _pick(rnd: random.Random, items: List[int]) -> int:
+    return rnd.choice(items)
+
+
+def _progress(s: Seeded, rnd: random.Random, path: str = "", body: Optional[Any] = None) -> Request:
+    # /api/users/{id}/progress отдаёт только прогресс пользователя из X-User-Id
+    user_id = _pick(rnd, s.users)
+    method = "GET" if body is None else "POST"
+    return Request(method, f"/api/users/{user_id}/progress{path}", body, {"X-User-Id": str(user_id)})
+
+
+def _move(s: Seeded, rnd: random.Random) -> Request:
+    skill_id = rnd.choice([k for k, v in s.roots.items() if len(v) > 1])
+    roots = s.roots[skill_id]
+    return (
+        "PUT",
+        f"/api/skills/{skill_id}/theories/move-theory"
+        f"?targetTheoryId={rnd.choice(roots)}&newIndexPosition={rnd.randrange(len(roots))}",
+        None,
+    )
+
+
+def _import_skill(s: Seeded, rnd: random.Random) -> Request:
+    theories = [{"title": f"t{i}", "content": "lorem ipsum", "subTheories": [{"title": "c", "content": "c"}]}
+                for i in range(5)]
+    return "POST", "/api/import/skills", [{"name": f"{PREFIX}-import-{rnd.random()}", "icon": "i",
+                                           "professionIds": [_pick(rnd, s.professions)], "theories": theories}]
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "professions.list": lambda s, rnd: ("GET", "/api/professions?limit=100", None),
+    "professions.skills": lambda s, rnd: ("GET", f"/api/professions/{_pick(rnd, s.professions)}/skills", None),
+    "skills.list": lambda s, rnd: ("GET", "/api/skills?limit=100", None),
+    "skills.theories": lambda s, rnd: ("GET", f"/api/skills/{_pick(rnd, s.skills)}/theories", None),
+    "skills.move_theory": _move,
+    "theories.list": lambda s, rnd: ("GET", "/api/theories?limit=100", None),
+    "quests.list": lambda s, rnd: ("GET", "/api/quests?limit=100", None),
+    "quests.detail": lambda s, rnd: ("GET", f"/api/quests/{_pick(rnd, s.quests)}", None),
+    "progress.get": lambda s, rnd: _progress(s, rnd),
+    "progress.complete": lambda s, rnd: _progress(
+        s, rnd, "/completed-theories", {"items": [{"id": t} for t in rnd.sample(s.theories, 5)]}
+    ),
+    "progress.summary_profession": lambda s, rnd: _progress(
+        s, rnd, f"/summary/professions/{_pick(rnd, s.professions)}"
+    ),
+    "progress.summary_theory": lambda s, rnd: _progress(s, rnd, f"/summary/theories/{_pick(rnd, s.theories)}"),
+    "import.skills": _import_skill,
+    "export.catalog": lambda s, rnd: ("GET", "/api/export/catalog?scenarios=false", None),
+    "metrics.db_pool": lambda s, rnd: ("GET", "/api/metrics/db-pool", None),
+}
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, s: Seeded, args, rnd: random.Random) -> dict:
+    # запросы заранее: одинаковая последовательность при одном --seed
+    requests = [Request(*scenario(s, rnd)) for _ in range(args.warmup + args.requests)]
+    for method, url, body, headers in requests[: args.warmup]:
+        await client.request(method, url, json=body, headers=headers)
+
+    pending = iter(requests[args.warmup:])
+    timings: List[float] = []
+    queries: List[int] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for method, url, body, headers in pending:
+            started = time.perf_counter()
+            try:
+                resp = await client.request(method, url, json=body, headers=headers)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            timings.append(time.perf_counter() - started)
+            if resp.status_code >= 400:
+                errors += 1
+            match = _QUERIES.search(resp.headers.get("server-timing", ""))
+            if match:
+                queries.append(int(match.group(1)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    pct = lambda p: round(timings[min(len(timings) - 1, int(len(timings) * p))] * 1000, 2) if timings else None  # noqa: E731
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "throughput_rps": round(len(timings) / elapsed, 1) if elapsed else None,
+        "p50_ms": pct(0.5),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+        "max_queries": max(queries) if queries else None,
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if (current["max_queries"] or 0) > (base.get("max_queries") or 0):
+            regressions.append(f"{name}: max_queries {base.get('max_queries')} -> {current['max_queries']}")
+        if base.get("p95_ms") and current["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+    return regressions
+
+
+@asynccontextmanager
+async def http_client(url: Optional[str]):
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+            yield client
+        return
+    import main  # приложение в процессе, со своим lifespan (Mongo, пул)
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+
+
+async def main_(args) -> int:
+    rnd = random.Random(args.seed)
+    names = args.only or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        print(f"unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    if args.no_mongo:
+        # приложение в процессе не ходит в Mongo: quests.detail и progress.complete не ждут его таймаутов
+        settings.mongo_enabled = False
+    config = {k: v for k, v in vars(args).items() if k not in ("save", "baseline", "url")}
+    results: Dict[str, dict] = {}
+    seeded = await seed(args, rnd)
+    try:
+        print(f"theories={len(seeded.theories)} quests={len(seeded.quests)} users={len(seeded.users)} "
+              f"concurrency={args.concurrency} requests={args.requests}")
+        async with http_client(args.url) as client:
+            for name in names:
+                results[name] = await run_scenario(client, SCENARIOS[name], seeded, args, rnd)
+                r = results[name]
+                print(
+                    f"{name:<28} rps={r['throughput_rps']!s:>8} p50={r['p50_ms']!s:>8}ms p95={r['p95_ms']!s:>8}ms "
+                    f"p99={r['p99_ms']!s:>8}ms queries={r['queries_per_request']!s:>6} errors={r['errors']}"
+                )
+    finally:
+        await cleanup(args)
+        close_mongo()
+        await engine.dispose()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"config": config, "scenarios": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["scenarios"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"no regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--professions", type=int, default=5)
+    parser.add_argument("--skills", type=int, default=4, help="skills per profession")
+    parser.add_argument("--depth", type=int, default=3, help="theory tree depth per skill")
+    parser.add_argument("--fanout", type=int, default=3, help="roots per skill and children per theory")
+    parser.add_argument("--quests", type=int, default=50)
+    parser.add_argument("--quest-theories", type=int, default=3)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--completed-pct", type=int, default=30, help="share of theories each user completed")
+    parser.add_argument("--no-mongo", action="store_true",
+                        help="no Mongo at all: no quest scenarios, the app runs with APP_MONGO_ENABLED=false "
+                             "(start a --url server with it too)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--only", nargs="+", help="scenario names (default: all)")
+    parser.add_argument("--url", help="running server instead of the in-process app")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare with a saved results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown vs baseline")
+    sys.exit(asyncio.run(main_(parser.parse_args())))
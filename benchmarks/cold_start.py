@@ -0,0 +1,139 @@
+# benchmarks/cold_start.py
+"""
+Холодный старт процесса: импорт приложения, lifespan и первые запросы — с прогревом и без.
+
+Каждый замер — в новом процессе интерпретатора (иначе модули и соединения уже прогреты):
+1) import: `python -X importtime -c "import main"` — суммарное время импорта main (медиана
+   --repeat запусков) и самые дорогие модули по собственному времени;
+2) startup: lifespan (Mongo, APP_WARMUP_*) и первые запросы к горячим эндпоинтам
+   через ASGITransport, отдельно с APP_WARMUP_ENABLED=true и false. Прогрев переносит
+   стоимость первых запросов в старт — сравнивайте first request, а не только startup.
+
+--budget-ms: код выхода 1, если медиана импорта main больше бюджета (для CI).
+
+Запуск (startup требует БД из APP_DB_URL с миграциями; данные не меняются):
+    python -m benchmarks.cold_start --repeat 5 --budget-ms 1500
+    python -m benchmarks.cold_start --no-startup --top 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# горячие GET-эндпоинты: каталог, дерево теорий скилла, прогресс, схема для /docs
+FIRST_REQUESTS = [
+    "/api/professions?limit=50",
+    "/api/skills?limit=50",
+    "/api/theories?limit=50&fields=summary",
+    "/api/quests?limit=50",
+    "/api/user-progress",
+    "/openapi.json",
+]
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+# -------- Импорт --------
+
+def import_once() -> Tuple[float, Dict[str, int]]:
+    """Один импорт main в новом процессе: (суммарно мс, собственное время модулей в мкс)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    self_us: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if not match:
+            continue
+        own, cumulative, indent, name = match.groups()
+        self_us[name] = int(own)
+        if name == "main" and not indent:
+            total_us = int(cumulative)
+    return total_us / 1000, self_us
+
+
+def measure_import(repeat: int, top: int) -> float:
+    totals: List[float] = []
+    per_module: Dict[str, List[int]] = {}
+    for _ in range(repeat):
+        total, self_us = import_once()
+        totals.append(total)
+        for name, us in self_us.items():
+            per_module.setdefault(name, []).append(us)
+    median = statistics.median(totals)
+    print(f"import main: median={median:.1f}ms min={min(totals):.1f}ms max={max(totals):.1f}ms ({repeat} runs)")
+    heaviest = sorted(((statistics.median(v), k) for k, v in per_module.items()), reverse=True)[:top]
+    for us, name in heaviest:
+        print(f"  {us / 1000:8.1f}ms  {name}")
+    return median
+
+
+# -------- Старт и первые запросы (выполняется в дочернем процессе) --------
+
+async def child() -> None:
+    import httpx
+
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+    result: Dict[str, float] = {"import": imported - started}
+
+    async with main.app.router.lifespan_context(main.app):
+        result["startup"] = time.perf_counter() - imported
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for url in FIRST_REQUESTS:
+                t0 = time.perf_counter()
+                response = await client.get(url, headers={"X-User-Id": "1"})
+                result[url] = time.perf_counter() - t0
+                result[f"{url} status"] = response.status_code
+    print(json.dumps(result))
+
+
+def measure_startup(repeat: int) -> None:
+    for warmup in ("true", "false"):
+        runs: List[Dict[str, float]] = []
+        for _ in range(repeat):
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.cold_start", "--child"],
+                capture_output=True, text=True, check=True,
+                env={**os.environ, "APP_WARMUP_ENABLED": warmup},
+            )
+            runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+        def med(key: str) -> float:
+            return statistics.median(run[key] for run in runs) * 1000
+
+        first = sum(med(url) for url in FIRST_REQUESTS)
+        print(f"warm-up={warmup}: import={med('import'):.1f}ms startup={med('startup'):.1f}ms "
+              f"first requests total={first:.1f}ms ({repeat} runs)")
+        for url in FIRST_REQUESTS:
+            print(f"  {url:<42} {med(url):8.1f}ms  status={runs[-1][f'{url} status']:.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="самые дорогие модули импорта")
+    parser.add_argument("--budget-ms", type=float, default=None, help="бюджет медианы импорта main")
+    parser.add_argument("--no-startup", action="store_true", help="только импорт, без БД")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(child())
+        sys.exit(0)
+
+    import_median = measure_import(args.repeat, args.top)
+    if not args.no_startup:
+        measure_startup(args.repeat)
+    if args.budget_ms is not None and import_median > args.budget_ms:
+        print(f"REGRESSION: import main {import_median:.1f}ms > budget {args.budget_ms:.0f}ms")
+        sys.exit(1)
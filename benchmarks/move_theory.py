@@ -0,0 +1,94 @@
+# benchmarks/move_theory.py
+"""
+Задержка SkillService.move_theory в зависимости от числа соседей
+для режимов нумерации dense и sparse (APP_THEORY_ORDER_MODE).
+
+Запуск (нужна БД из APP_DB_URL, данные создаются в транзакции и откатываются):
+    python -m benchmarks.move_theory --siblings 10 100 500 2000 --moves 50
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+
+from sqlalchemy import event, insert
+
+from benchmarks.theory_tree import StatementCounter
+from core.config import settings
+from db.session import engine, AsyncSessionLocal
+from models.models import Skill, Theory
+from services.skill_service import skill_service
+
+
+async def seed_siblings(db, count: int) -> tuple[int, List[int]]:
+    skill = Skill(name=f"bench-move-{count}", icon="bench")
+    db.add(skill)
+    await db.flush()
+    step, offset = skill_service._order_step()
+    res = await db.execute(
+        insert(Theory).returning(Theory.id),
+        [
+            {
+                "title": f"t{i}",
+                "content": "lorem ipsum",
+                "difficulty_level": 0,
+                "order_index": offset + i * step,
+                "skill_id": skill.id,
+                "parent_id": None,
+            }
+            for i in range(count)
+        ],
+    )
+    return skill.id, list(res.scalars().all())
+
+
+async def main(siblings: List[int], moves: int, seed: int) -> None:
+    counter = StatementCounter()
+    rnd = random.Random(seed)
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            for mode in ("dense", "sparse"):
+                settings.theory_order_mode = mode
+                print(f"mode={mode}")
+                for count in siblings:
+                    async with AsyncSessionLocal(bind=conn, join_transaction_mode="create_savepoint") as db:
+                        skill_id, ids = await seed_siblings(db, count)
+                        # commit отпускает SAVEPOINT; внешняя транзакция всё равно откатывается в конце
+                        await db.commit()
+
+                    event.listen(conn.sync_connection, "before_cursor_execute", counter)
+                    counter.count = 0
+                    timings = []
+                    for _ in range(moves):
+                        async with AsyncSessionLocal(bind=conn, join_transaction_mode="create_savepoint") as db:
+                            started = time.perf_counter()
+                            await skill_service.move_theory(
+                                db=db,
+                                skill_id=skill_id,
+                                target_theory_id=rnd.choice(ids),
+                                new_index_position=rnd.randrange(count),
+                                new_parent_id=None,
+                            )
+                            timings.append(time.perf_counter() - started)
+                    event.remove(conn.sync_connection, "before_cursor_execute", counter)
+
+                    timings.sort()
+                    print(
+                        f"  siblings={count:<6} statements/move={counter.count / moves:5.1f} "
+                        f"median={timings[len(timings) // 2] * 1000:7.2f}ms "
+                        f"p95={timings[int(len(timings) * 0.95)] * 1000:7.2f}ms"
+                    )
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--siblings", type=int, nargs="+", default=[10, 100, 500, 2000])
+    parser.add_argument("--moves", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(main(args.siblings, args.moves, args.seed))
@@ -0,0 +1,121 @@
+# benchmarks/progress_load.py
+"""
+Нагрузочный тест записи прогресса: concurrency писателей отмечают случайные
+теории у случайных пользователей (UserProgressService.complete_theories: поиск
+квестов теорий для наград и один INSERT ... ON CONFLICT + UPDATE) в течение duration секунд.
+Прогон повторяется для каждого числа пользователей из --users: при 1 пользователе
+все писатели бьются в одну строку user_progress, при многих — расходятся по
+строкам и секциям таблиц связей.
+
+Запуск (нужна БД из APP_DB_URL с миграциями; данные фиксируются, а в конце удаляются):
+    python -m benchmarks.progress_load --users 1 100 10000 --concurrency 32 --duration 10
+Пул соединений должен вмещать писателей: APP_DB_POOL_SIZE >= --concurrency.
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+
+from sqlalchemy import delete, insert
+
+from db.mongo import close_mongo, get_mongo_db
+from db.session import engine, AsyncSessionLocal
+from models.models import Skill, Theory, UserProgress
+from schemas.user_progress import ProgressItemIn
+from services.user_progress_service import user_progress_service
+
+# id тестовых пользователей — вне диапазона реальных
+USER_ID_BASE = 2_000_000_000
+
+
+async def seed(theories: int, users: int) -> tuple[int, List[int]]:
+    async with AsyncSessionLocal() as db:
+        skill = Skill(name="bench-progress", icon="bench")
+        db.add(skill)
+        await db.flush()
+        theory_ids = (
+            await db.execute(
+                insert(Theory).returning(Theory.id),
+                [
+                    {"title": f"t{i}", "content": "-", "order_index": i, "skill_id": skill.id}
+                    for i in range(theories)
+                ],
+            )
+        ).scalars().all()
+        await db.execute(
+            insert(UserProgress),
+            [{"id": USER_ID_BASE + i, "user_name": f"bench-{i}"} for i in range(users)],
+        )
+        await db.commit()
+        return skill.id, list(theory_ids)
+
+
+async def cleanup(skill_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        # строки прогресса уходят каскадом
+        await db.execute(delete(UserProgress).where(UserProgress.id >= USER_ID_BASE))
+        await db.execute(delete(Theory).where(Theory.skill_id == skill_id))
+        await db.execute(delete(Skill).where(Skill.id == skill_id))
+        await db.commit()
+
+
+async def run(users: int, theory_ids: List[int], concurrency: int, duration: float, batch: int, seed: int) -> None:
+    rnd = random.Random(seed)
+    # у теорий бенчмарка нет квестов: награды — один поиск связей в Postgres, Mongo не запрашивается
+    mongo_db = get_mongo_db()
+    deadline = time.perf_counter() + duration
+    timings: List[float] = []
+    added = 0
+    errors = 0
+
+    async def writer() -> None:
+        nonlocal added, errors
+        while time.perf_counter() < deadline:
+            user_id = USER_ID_BASE + rnd.randrange(users)
+            items = [ProgressItemIn(id=t) for t in rnd.sample(theory_ids, batch)]
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    delta = await user_progress_service.complete_theories(db, mongo_db, user_id, items)
+                added += len(delta.added)
+            except Exception:
+                errors += 1
+                continue
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    pct = lambda p: timings[min(len(timings) - 1, int(len(timings) * p))] * 1000 if timings else 0.0  # noqa: E731
+    print(
+        f"users={users:<7} ops={len(timings):<7} throughput={len(timings) / elapsed:8.1f} ops/s "
+        f"p50={pct(0.5):7.2f}ms p95={pct(0.95):7.2f}ms p99={pct(0.99):7.2f}ms "
+        f"rows_added={added} errors={errors}"
+    )
+
+
+async def main(users: List[int], theories: int, concurrency: int, duration: float, batch: int, seed_: int) -> None:
+    skill_id, theory_ids = await seed(theories, max(users))
+    try:
+        print(f"concurrency={concurrency} batch={batch} theories={theories} duration={duration}s")
+        for count in users:
+            await run(count, theory_ids, concurrency, duration, batch, seed_)
+    finally:
+        await cleanup(skill_id)
+        close_mongo()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--theories", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--batch", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.theories, args.concurrency, args.duration, args.batch, args.seed))
@@ -0,0 +1,108 @@
+# benchmarks/serialization.py
+"""
+Сравнение сериализации списков каталога:
+- legacy:  ORM-объекты -> response_model (TypeAdapter.validate_python(from_attributes)
+           -> dump_python(mode="json", by_alias) -> json.dumps), как делает FastAPI
+- payload: строки-проекции столбцов -> *_payload словари -> orjson.dumps
+
+БД не нужна: ORM-объекты создаются транзиентными, строки имитируются namedtuple
+с теми же атрибутами, что у Row из find_all_rows.
+
+Запуск:
+    python -m benchmarks.serialization --sizes 100 1000 10000
+"""
+import argparse
+import json
+import time
+from collections import namedtuple
+from typing import Callable, List
+
+import orjson
+from pydantic import TypeAdapter
+
+from models.models import Profession, Quest, Skill, Theory
+from schemas.profession import ProfessionOut, profession_payload
+from schemas.quest import QuestOut, quest_payload
+from schemas.skill import SkillOut, skill_payload
+from schemas.theory import TheoryOut, theory_payload
+
+
+def _profession(i: int):
+    return dict(id=i, name=f"profession {i}", icon="icon.svg")
+
+
+def _skill(i: int):
+    return dict(id=i, name=f"skill {i}", icon="icon.svg")
+
+
+def _theory(i: int):
+    return dict(
+        id=i,
+        title=f"theory {i}",
+        content="lorem ipsum " * 20,
+        difficulty_level=i % 5,
+        order_index=i,
+        skill_id=1,
+        parent_id=None,
+    )
+
+
+def _quest(i: int):
+    return dict(id=i, name=f"quest {i}", description="lorem ipsum " * 10, preview="preview.png")
+
+
+# (имя, ORM-модель, схема ответа, payload-функция, генератор значений столбцов)
+CASES = [
+    ("profession", Profession, ProfessionOut, profession_payload, _profession),
+    ("skill", Skill, SkillOut, skill_payload, _skill),
+    ("theory", Theory, TheoryOut, theory_payload, _theory),
+    ("quest", Quest, QuestOut, quest_payload, _quest),
+]
+
+
+def _median_ms(fn: Callable[[], bytes], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def main(sizes: List[int], repeat: int) -> None:
+    for name, model, schema, payload, values in CASES:
+        adapter = TypeAdapter(List[schema])
+        for size in sizes:
+            data = [values(i) for i in range(size)]
+            objs = [model(**v) for v in data]
+            Row = namedtuple(f"{name.title()}Row", data[0].keys())
+            rows = [Row(**v) for v in data]
+
+            def legacy() -> bytes:
+                validated = adapter.validate_python(objs, from_attributes=True)
+                content = adapter.dump_python(validated, mode="json", by_alias=True)
+                return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+            def fast() -> bytes:
+                return orjson.dumps([payload(row) for row in rows])
+
+            # Сверяем форму ответа (ключи); значения могут отличаться: legacy-путь для теорий
+            # отдаёт difficultyLevel/orderIndex = 0, т.к. схема не знает ORM-имён этих столбцов
+            assert json.loads(legacy())[0].keys() == json.loads(fast())[0].keys(), (
+                f"{name}: payload keys differ from {schema.__name__}"
+            )
+            legacy_ms = _median_ms(legacy, repeat)
+            fast_ms = _median_ms(fast, repeat)
+            print(
+                f"{name:<10} n={size:<6} legacy={legacy_ms:8.2f}ms payload={fast_ms:8.2f}ms "
+                f"speedup={legacy_ms / fast_ms:5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=9)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
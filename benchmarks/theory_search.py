@@ -0,0 +1,127 @@
+# benchmarks/theory_search.py
+"""
+Поиск теорий: полнотекстовый (GET /api/theories/search — search_vector, ix_theory_search_vector,
+ранжирование ts_rank_cd) против наивного ILIKE '%слово%' по title и content.
+
+На синтетическом корпусе (по умолчанию 100k теорий, слова с частотами по Zipf) для запросов
+разной селективности меряются:
+- ilike page:  первые --limit совпадений по id (без ранжирования);
+- ilike count: все совпадения (столько строк ранжировал бы клиент, фильтруя у себя);
+- fts page:    страница TheoryService.search — все совпадения ранжируются, отдаётся --limit.
+
+Запуск (нужна БД из APP_DB_URL с применёнными миграциями; данные создаются в транзакции и откатываются):
+    python -m benchmarks.theory_search --theories 100000
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+from sqlalchemy import and_, func, insert, or_, select, text
+
+from db.session import engine, AsyncSessionLocal
+from models.models import Skill, Theory
+from repositories.theory_repo import THEORY_COLUMNS
+from services.theory_service import theory_service
+
+SYLLABLES = ["ка", "ло", "ми", "ра", "ни", "то", "ве", "су", "да", "пе", "ко", "ли", "мо", "ры", "на", "те"]
+BATCH = 5000
+
+
+def vocabulary(rng: random.Random, size: int) -> List[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 5))))
+    return sorted(words, key=lambda _: rng.random())
+
+
+async def seed_corpus(conn, theories: int, words: List[str], rng: random.Random) -> None:
+    # Zipf: слово ранга r встречается пропорционально 1/r — есть и частые, и редкие термины
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    skill_ids = (
+        await conn.execute(
+            insert(Skill).returning(Skill.id),
+            [{"name": f"bench-search-{i}", "icon": "bench"} for i in range(20)],
+        )
+    ).scalars().all()
+    for start in range(0, theories, BATCH):
+        rows = []
+        for i in range(start, min(start + BATCH, theories)):
+            rows.append(
+                {
+                    "title": " ".join(rng.choices(words, weights, k=3)),
+                    "content": " ".join(rng.choices(words, weights, k=60)),
+                    "difficulty_level": 0,
+                    "order_index": i,
+                    "skill_id": skill_ids[i % len(skill_ids)],
+                    "parent_id": None,
+                }
+            )
+        await conn.execute(insert(Theory), rows)
+    await conn.execute(text("ANALYZE theory"))
+
+
+def ilike_filter(terms: List[str]):
+    return and_(*(or_(Theory.title.ilike(f"%{t}%"), Theory.content.ilike(f"%{t}%")) for t in terms))
+
+
+async def time_it(repeat: int, run: Callable[[], Awaitable[int]]) -> Tuple[float, int]:
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = await run()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings[len(timings) // 2], rows
+
+
+async def main(theories: int, vocab_size: int, limit: int, repeat: int) -> None:
+    rng = random.Random(42)
+    words = vocabulary(rng, vocab_size)
+    queries = [
+        ("frequent word", [words[0]]),
+        ("mid word", [words[50]]),
+        ("rare word", [words[vocab_size // 2]]),
+        ("two words", [words[10], words[200]]),
+        ("prefix", [words[100][:5]]),
+    ]
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            started = time.perf_counter()
+            await seed_corpus(conn, theories, words, rng)
+            print(f"corpus: {theories} theories, {vocab_size} words, seeded in {time.perf_counter() - started:.1f}s")
+            async with AsyncSessionLocal(bind=conn) as db:
+                for name, terms in queries:
+                    q = " ".join(terms)
+
+                    async def ilike_page() -> int:
+                        stmt = select(*THEORY_COLUMNS).where(ilike_filter(terms)).order_by(Theory.id).limit(limit)
+                        return len((await db.execute(stmt)).all())
+
+                    async def ilike_count() -> int:
+                        return (await db.execute(select(func.count()).where(ilike_filter(terms)))).scalar_one()
+
+                    async def fts_page() -> int:
+                        return len(await theory_service.search(db, q, limit=limit))
+
+                    print(f"{name} {q!r}:")
+                    for label, run in (("ilike page", ilike_page), ("ilike count", ilike_count), ("fts page", fts_page)):
+                        median, rows = await time_it(repeat, run)
+                        print(f"  {label:<12} rows={rows:<7} median={median * 1000:9.1f}ms")
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--theories", type=int, default=100_000)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.theories, args.vocabulary, args.limit, args.repeat))
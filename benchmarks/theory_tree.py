@@ -0,0 +1,149 @@
+# benchmarks/theory_tree.py
+"""
+Сравнение загрузки дерева теорий навыка:
+- legacy: обход уровнями (один SELECT ... WHERE parent_id IN (...) на каждую глубину, ORM-объекты)
+- path:   SkillService.get_theories_by_skill (один SELECT по материализованному пути, только столбцы)
+
+Запуск (нужна БД из APP_DB_URL, данные создаются в транзакции и откатываются):
+    python -m benchmarks.theory_tree --sizes 1000 10000 --fanout 5
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from sqlalchemy import event, insert, select, and_
+
+from db.session import engine, AsyncSessionLocal
+from models.models import Skill, Theory
+from schemas.theory import TheoryOut
+from services.skill_service import skill_service
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+async def seed_tree(db, size: int, fanout: int) -> int:
+    """Создаёт скилл и дерево из size теорий (каждый узел — до fanout детей)."""
+    skill = Skill(name=f"bench-{size}", icon="bench")
+    db.add(skill)
+    await db.flush()
+
+    created = 0
+    parents: List[int | None] = [None]
+    while created < size:
+        next_parents: List[int] = []
+        for parent_id in parents:
+            batch = min(fanout, size - created)
+            if batch <= 0:
+                break
+            res = await db.execute(
+                insert(Theory).returning(Theory.id),
+                [
+                    {
+                        "title": f"t{created + i}",
+                        "content": "lorem ipsum " * 20,
+                        "difficulty_level": 0,
+                        "order_index": i,
+                        "skill_id": skill.id,
+                        "parent_id": parent_id,
+                    }
+                    for i in range(batch)
+                ],
+            )
+            next_parents.extend(res.scalars().all())
+            created += batch
+        parents = next_parents
+    return skill.id
+
+
+async def legacy_tree(db, skill_id: int) -> List[TheoryOut]:
+    """Прежняя реализация: один запрос на уровень дерева + ORM-загрузка строк."""
+
+    def _to_out(obj: Theory) -> TheoryOut:
+        return TheoryOut(
+            id=obj.id,
+            title=obj.title,
+            content=obj.content,
+            difficultyLevel=obj.difficulty_level,
+            orderIndex=obj.order_index,
+            skill_id=obj.skill_id,
+            parent_id=obj.parent_id,
+            subTheories=[],
+        )
+
+    roots_orm = (
+        await db.scalars(
+            select(Theory)
+            .where(and_(Theory.skill_id == skill_id, Theory.parent_id.is_(None)))
+            .order_by(Theory.order_index)
+        )
+    ).all()
+    roots = [_to_out(o) for o in roots_orm]
+    index: Dict[int, TheoryOut] = {d.id: d for d in roots}
+    frontier = [d.id for d in roots]
+    while frontier:
+        children = (
+            await db.scalars(
+                select(Theory).where(Theory.parent_id.in_(frontier)).order_by(Theory.order_index)
+            )
+        ).all()
+        if not children:
+            break
+        frontier = []
+        for child in children:
+            dto = _to_out(child)
+            index[child.parent_id].subTheories.append(dto)
+            index[dto.id] = dto
+            frontier.append(dto.id)
+    return roots
+
+
+async def measure(conn, name: str, loader, skill_id: int, repeat: int, counter: StatementCounter) -> None:
+    timings = []
+    statements = 0
+    for _ in range(repeat):
+        async with AsyncSessionLocal(bind=conn) as db:
+            counter.count = 0
+            started = time.perf_counter()
+            await loader(db, skill_id)
+            timings.append(time.perf_counter() - started)
+            statements = counter.count
+    timings.sort()
+    print(
+        f"  {name:<7} statements={statements:<4} "
+        f"min={timings[0] * 1000:8.1f}ms median={timings[len(timings) // 2] * 1000:8.1f}ms"
+    )
+
+
+async def main(sizes: List[int], fanout: int, repeat: int) -> None:
+    counter = StatementCounter()
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            for size in sizes:
+                async with AsyncSessionLocal(bind=conn) as db:
+                    skill_id = await seed_tree(db, size, fanout)
+                    await db.flush()
+                event.listen(conn.sync_connection, "before_cursor_execute", counter)
+                print(f"tree of {size} nodes (fanout={fanout}):")
+                await measure(conn, "legacy", legacy_tree, skill_id, repeat, counter)
+                await measure(conn, "path", skill_service.get_theories_by_skill, skill_id, repeat, counter)
+                event.remove(conn.sync_connection, "before_cursor_execute", counter)
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--fanout", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.fanout, args.repeat))
@@ -0,0 +1,99 @@
+# cli.py
+"""
+Выгрузка и загрузка каталога без HTTP (формат GET /api/export/catalog):
+    python cli.py export > catalog.ndjson
+    python cli.py export --format json --no-scenarios -o catalog.json
+    python cli.py import < catalog.ndjson
+    python cli.py export | python cli.py import      # копия каталога (в другую БД — через APP_DB_URL)
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+import orjson
+from pymongo.errors import PyMongoError
+
+from db.mongo import close_mongo, get_mongo_db
+from db.session import AsyncSessionLocal, engine
+from schemas.bulk import CatalogRecord
+from services.export_service import encode_json_array, encode_ndjson, export_service
+from services.import_service import import_service, parse_records
+
+
+async def export_catalog(args) -> int:
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async with AsyncSessionLocal() as db:
+            records = export_service.stream_catalog(db, None if args.no_scenarios else get_mongo_db())
+            encode = encode_json_array if args.format == "json" else encode_ndjson
+            async for chunk in encode(records):
+                out.write(chunk)
+        out.flush()
+    except PyMongoError as e:
+        # сценарии не дочитались: обрезанную выгрузку не оставляем
+        if args.output:
+            out.close()
+            os.remove(args.output)
+        print(f"Mongo unavailable: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+async def import_catalog(args) -> int:
+    if args.input:
+        with open(args.input, "rb") as f:
+            body = f.read()
+    else:
+        body = sys.stdin.buffer.read()
+    try:
+        records, errors = parse_records(body, args.format == "ndjson", CatalogRecord)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if errors:
+        for error in errors:
+            print(orjson.dumps(error.model_dump()).decode(), file=sys.stderr)
+        print(f"Import rejected: {len(errors)} invalid record(s), nothing was written", file=sys.stderr)
+        return 1
+
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await import_service.import_catalog(db, get_mongo_db(), records)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+        except PyMongoError as e:
+            print(f"Mongo unavailable: {e}", file=sys.stderr)
+            return 1
+    print(result.model_dump_json())
+    return 0
+
+
+async def main(args) -> int:
+    try:
+        return await args.handler(args)
+    finally:
+        close_mongo()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = commands.add_parser("export", help="stream the catalog to stdout or a file")
+    export_cmd.add_argument("--format", choices=["ndjson", "json"], default="ndjson")
+    export_cmd.add_argument("--no-scenarios", action="store_true", help="skip quest scenarios from Mongo")
+    export_cmd.add_argument("-o", "--output", help="file to write (default: stdout)")
+    export_cmd.set_defaults(handler=export_catalog)
+
+    import_cmd = commands.add_parser("import", help="load an export from stdin or a file")
+    import_cmd.add_argument("--format", choices=["ndjson", "json"], default="ndjson")
+    import_cmd.add_argument("-i", "--input", help="file to read (default: stdin)")
+    import_cmd.set_defaults(handler=import_catalog)
+
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,112 @@
+# core/cache.py
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass
+class _Entry(Generic[V]):
+    value: V
+    size: int
+    expires_at: float
+
+
+class LruTtlCache(Generic[V]):
+    """
+    In-process LRU-кэш с TTL, ограниченный числом записей и суммарным размером.
+
+    get_or_load() выполняет single-flight: пока значение для ключа грузится,
+    остальные запросы ждут ту же загрузку, а не идут в хранилище сами.
+    Загрузка идёт отдельной задачей — отмена одного ожидающего её не прерывает.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_s: float,
+        sizeof: Callable[[V], int],
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, _Entry[V]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0  # промахи, присоединившиеся к уже идущей загрузке
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[V]]) -> V:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self._remove(key)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._on_loaded(k, t))
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Hashable) -> None:
+        # Идущая загрузка тоже «забывается»: её результат в кэш уже не попадёт
+        self._inflight.pop(key, None)
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._inflight.clear()
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+    # -------- Helpers --------
+
+    def _on_loaded(self, key: Hashable, task: asyncio.Task) -> None:
+        failed = task.cancelled() or task.exception() is not None
+        if self._inflight.get(key) is not task:
+            return  # ключ инвалидирован во время загрузки
+        del self._inflight[key]
+        if failed:
+            return  # ошибки не кэшируем
+
+        value = task.result()
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(value, size, time.monotonic() + self.ttl_s)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
@@ -1,4 +1,6 @@
 # app/core/settings.py
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
@@ -13,14 +15,112 @@ class Settings(BaseSettings):
     mongo_uri: str = Field(alias="APP_MONGO_URI")
     mongo_db: str = Field(alias="APP_MONGO_DB")
 
+    # ==== Mongo client ====
+    # false — без Mongo: квесты без scenario, очки прогресса без наград квестов, сценарии не импортируются
+    mongo_enabled: bool = Field(default=True, alias="APP_MONGO_ENABLED")
+    mongo_max_pool_size: int = Field(default=100, ge=1, alias="APP_MONGO_MAX_POOL_SIZE")
+    mongo_min_pool_size: int = Field(default=0, ge=0, alias="APP_MONGO_MIN_POOL_SIZE")
+    mongo_server_selection_timeout_ms: int = Field(default=5000, ge=1, alias="APP_MONGO_SERVER_SELECTION_TIMEOUT_MS")
+    mongo_connect_timeout_ms: int = Field(default=5000, ge=1, alias="APP_MONGO_CONNECT_TIMEOUT_MS")
+    mongo_socket_timeout_ms: int = Field(default=0, ge=0, alias="APP_MONGO_SOCKET_TIMEOUT_MS")  # 0 — без лимита
+    mongo_max_idle_time_ms: int = Field(default=0, ge=0, alias="APP_MONGO_MAX_IDLE_TIME_MS")  # 0 — без лимита
+    # Например "zstd,snappy,zlib" (zstd/snappy требуют пакетов zstandard/python-snappy)
+    mongo_compressors: str = Field(default="", alias="APP_MONGO_COMPRESSORS")
+
+    # ==== Postgres connection pool ====
+    db_pool_size: int = Field(default=10, ge=1, alias="APP_DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, ge=0, alias="APP_DB_MAX_OVERFLOW")
+    db_pool_timeout_s: float = Field(default=30.0, gt=0, alias="APP_DB_POOL_TIMEOUT_S")
+    db_pool_recycle_s: int = Field(default=1800, alias="APP_DB_POOL_RECYCLE_S")  # -1 — не пересоздавать
+    db_pool_pre_ping: bool = Field(default=True, alias="APP_DB_POOL_PRE_PING")
+    db_statement_timeout_ms: int = Field(default=0, ge=0, alias="APP_DB_STATEMENT_TIMEOUT_MS")  # 0 — без лимита
+    db_statement_cache_size: int = Field(default=100, ge=0, alias="APP_DB_STATEMENT_CACHE_SIZE")
+    # Совместимость с PgBouncer в transaction/statement режиме: без кэша prepared statements
+    db_pgbouncer_mode: bool = Field(default=False, alias="APP_DB_PGBOUNCER_MODE")
+
+    # ==== Quest detail fan-out (SQL + Mongo) ====
+    quest_sql_timeout_s: float = Field(default=5.0, gt=0, alias="APP_QUEST_SQL_TIMEOUT_S")
+    # Если Mongo не ответил за это время, квест отдаётся без scenario
+    quest_mongo_timeout_s: float = Field(default=0.5, gt=0, alias="APP_QUEST_MONGO_TIMEOUT_S")
+
+    # ==== Quest scenario cache (quest_meta) ====
+    quest_scenario_cache_max_entries: int = Field(default=1024, ge=1, alias="APP_QUEST_SCENARIO_CACHE_MAX_ENTRIES")
+    quest_scenario_cache_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0,
+                                                alias="APP_QUEST_SCENARIO_CACHE_MAX_BYTES")
+    quest_scenario_cache_ttl_s: float = Field(default=300.0, ge=0, alias="APP_QUEST_SCENARIO_CACHE_TTL_S")
+
     # ==== CORS ====
     cors_allowed_origins: list[str] = Field(default_factory=list, alias="APP_CORS_ALLOWED_ORIGINS")
     cors_allowed_methods: list[str] = Field(default_factory=lambda: ["GET", "POST", "PUT", "DELETE"],
                                             alias="APP_CORS_ALLOWED_METHODS")
     cors_allowed_headers: list[str] = Field(default_factory=lambda: ["*"], alias="APP_CORS_ALLOWED_HEADERS")
+    cors_expose_headers: list[str] = Field(default_factory=lambda: ["X-Next-After-Id", "X-Next-Cursor",
+                                                                     "X-Catalog-Generation", "ETag", "Server-Timing"],
+                                           alias="APP_CORS_EXPOSE_HEADERS")
     cors_allow_credentials: bool = Field(default=True, alias="APP_CORS_ALLOW_CREDENTIALS")
     cors_max_age: int = Field(default=3600, alias="APP_CORS_MAX_AGE")
 
+    # ==== Theory ordering ====
+    # dense: соседи нумеруются 0..N-1, любое перемещение перенумеровывает список;
+    # sparse: индексы с шагом theory_order_gap, перемещение обычно меняет одну строку
+    theory_order_mode: Literal["dense", "sparse"] = Field(default="dense", alias="APP_THEORY_ORDER_MODE")
+    theory_order_gap: int = Field(default=1024, ge=2, alias="APP_THEORY_ORDER_GAP")
+
+    # ==== Catalog HTTP caching (ETag / Cache-Control) ====
+    catalog_cache_max_age_s: int = Field(default=0, ge=0, alias="APP_CATALOG_CACHE_MAX_AGE_S")
+    catalog_cache_s_maxage_s: int = Field(default=0, ge=0, alias="APP_CATALOG_CACHE_S_MAXAGE_S")  # для CDN
+    # Версии каталога (строка catalog_version) кэшируются в процессе на столько секунд:
+    # изменения, сделанные другими воркерами, доходят до ETag не позже; 0 — читать на каждый запрос
+    catalog_versions_ttl_s: float = Field(default=1.0, ge=0, alias="APP_CATALOG_VERSIONS_TTL_S")
+
+    # ==== Pagination / streaming ====
+    page_max_limit: int = Field(default=1000, alias="APP_PAGE_MAX_LIMIT")
+    stream_batch_size: int = Field(default=500, alias="APP_STREAM_BATCH_SIZE")
+
+    # ==== User progress ====
+    # /api/user-progress берёт пользователя из заголовка X-User-Id (выставляет шлюз после аутентификации).
+    # 0 — заголовок обязателен (400); id > 0 — явно включённый запасной пользователь для запросов без
+    # заголовка (совместимость с прежним единственным прогрессом; все такие запросы пишут в одну строку)
+    default_user_id: int = Field(default=0, ge=0, alias="APP_DEFAULT_USER_ID")
+
+    # ==== Request metrics ====
+    # SQL/Mongo счётчики и время на запрос: Server-Timing, гистограммы GET /metrics, лог learner.requests
+    metrics_enabled: bool = Field(default=True, alias="APP_METRICS_ENABLED")
+    server_timing: bool = Field(default=True, alias="APP_SERVER_TIMING")
+    request_log: bool = Field(default=False, alias="APP_REQUEST_LOG")  # JSON-строка на каждый запрос
+
+    # ==== Response compression ====
+    # Кодировки в порядке предпочтения (br и zstd — при установленных brotli / zstandard);
+    # ответы короче порога отдаются как есть
+    compression_enabled: bool = Field(default=True, alias="APP_COMPRESSION_ENABLED")
+    compression_encodings: list[str] = Field(default_factory=lambda: ["zstd", "br", "gzip"],
+                                             alias="APP_COMPRESSION_ENCODINGS")
+    compression_minimum_size: int = Field(default=1024, ge=0, alias="APP_COMPRESSION_MINIMUM_SIZE")
+
+    # ==== Catalog response cache ====
+    # Готовые (и сжатые) ответы GET-эндпоинтов каталога по URL, пока не сменился их ETag
+    response_cache_enabled: bool = Field(default=True, alias="APP_RESPONSE_CACHE_ENABLED")
+    response_cache_max_entries: int = Field(default=512, ge=1, alias="APP_RESPONSE_CACHE_MAX_ENTRIES")
+    response_cache_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0, alias="APP_RESPONSE_CACHE_MAX_BYTES")
+    # Предельный возраст записи (изменения каталога в обход catalog_version); 0 — без лимита
+    response_cache_ttl_s: float = Field(default=60.0, ge=0, alias="APP_RESPONSE_CACHE_TTL_S")
+
+    # ==== Catalog snapshot ====
+    # Профессии, скиллы, их связи и деревья теорий (без content) — неизменяемым снимком в памяти процесса;
+    # пересборка после изменений каталога (catalog_version) и когда снимок старше max_staleness
+    # (изменения в обход catalog_version; 0 — без лимита)
+    catalog_snapshot_enabled: bool = Field(default=True, alias="APP_CATALOG_SNAPSHOT_ENABLED")
+    catalog_snapshot_max_staleness_s: float = Field(default=30.0, ge=0, alias="APP_CATALOG_SNAPSHOT_MAX_STALENESS_S")
+
+    # ==== Startup warm-up ====
+    # В lifespan: мапперы ORM, OpenAPI-схема, соединения Postgres (не больше db_pool_size) и Mongo,
+    # горячие запросы по разу на каждом соединении
+    warmup_enabled: bool = Field(default=True, alias="APP_WARMUP_ENABLED")
+    warmup_db_connections: int = Field(default=4, ge=0, alias="APP_WARMUP_DB_CONNECTIONS")
+    warmup_mongo_connections: int = Field(default=2, ge=0, alias="APP_WARMUP_MONGO_CONNECTIONS")
+    # Бюджет медианы `python -X importtime -c "import main"` (tests/test_import_time.py)
+    import_time_budget_ms: float = Field(default=2000.0, gt=0, alias="APP_IMPORT_TIME_BUDGET_MS")
+
     # Поведение загрузки .env
     model_config = SettingsConfigDict(
         env_file=".env",
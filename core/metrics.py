@@ -0,0 +1,270 @@
+# core/metrics.py
+"""
+Метрики запросов: сколько SQL-операторов и Mongo-команд выполнил каждый HTTP-запрос,
+сколько времени ушло на БД и сериализацию.
+
+RequestStats текущего запроса лежит в contextvar: его видят хуки SQLAlchemy
+(greenlet наследует контекст задачи) и слушатель команд pymongo (Motor копирует
+контекст в поток executor'а). Middleware по итогам запроса пишет Server-Timing,
+структурный лог и гистограммы по шаблону маршрута — их отдаёт GET /metrics
+в текстовом формате Prometheus.
+"""
+import logging
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import orjson
+from pymongo import monitoring
+from starlette.datastructures import MutableHeaders
+
+from core.config import settings
+
+logger = logging.getLogger("learner.requests")
+
+
+class RequestStats:
+    __slots__ = ("sql_count", "sql_s", "mongo_count", "mongo_s", "serialize_s")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_s = 0.0
+        self.mongo_count = 0
+        self.mongo_s = 0.0
+        self.serialize_s = 0.0
+
+    def server_timing(self, total_s: float) -> str:
+        return (
+            f'db;dur={self.sql_s * 1000:.2f};desc="{self.sql_count} queries", '
+            f'mongo;dur={self.mongo_s * 1000:.2f};desc="{self.mongo_count} calls", '
+            f"serialize;dur={self.serialize_s * 1000:.2f}, "
+            f"total;dur={total_s * 1000:.2f}"
+        )
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@contextmanager
+def timed_serialization() -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current.get()
+        if stats is not None:
+            stats.serialize_s += time.perf_counter() - started
+
+
+# -------- SQLAlchemy: события курсора (engine.sync_engine) --------
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and _current.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = getattr(context, "_metrics_started", None)
+    if stats is not None and started is not None:
+        stats.sql_count += 1
+        stats.sql_s += time.perf_counter() - started
+
+
+# -------- Mongo: слушатель команд pymongo (event_listeners клиента) --------
+
+class MongoCommandListener(monitoring.CommandListener):
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        self._record(event.duration_micros)
+
+    def failed(self, event) -> None:
+        self._record(event.duration_micros)
+
+    @staticmethod
+    def _record(duration_micros: int) -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.mongo_count += 1
+            stats.mongo_s += duration_micros / 1_000_000
+
+
+mongo_command_listener = MongoCommandListener()
+
+
+# -------- Гистограммы по маршрутам и экспозиция в формате Prometheus --------
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # последняя ячейка — +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Метрики процесса; наблюдения пишутся из event loop, блокировки не нужны."""
+
+    def __init__(self):
+        # name -> (help, buckets, {labels: Histogram})
+        self._histograms: Dict[str, Tuple[str, Sequence[float], Dict[Labels, Histogram]]] = {}
+        self._counters: Dict[str, Tuple[str, Dict[Labels, int]]] = {}
+        # функции, возвращающие {имя метрики: значение} на момент экспозиции
+        self._gauges: List[Tuple[str, Callable[[], Dict[str, float]]]] = []
+
+    def histogram(self, name: str, help_: str, buckets: Sequence[float]) -> None:
+        self._histograms[name] = (help_, buckets, {})
+
+    def counter(self, name: str, help_: str) -> None:
+        self._counters[name] = (help_, {})
+
+    def gauges(self, prefix: str, collect: Callable[[], Dict[str, float]]) -> None:
+        self._gauges.append((prefix, collect))
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        _, buckets, series = self._histograms[name]
+        hist = series.get(labels)
+        if hist is None:
+            hist = series[labels] = Histogram(buckets)
+        hist.observe(value)
+
+    def inc(self, name: str, labels: Labels) -> None:
+        series = self._counters[name][1]
+        series[labels] = series.get(labels, 0) + 1
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, (help_, series) in self._counters.items():
+            lines += [f"# HELP {name} {help_}", f"# TYPE {name} counter"]
+            for labels, value in series.items():
+                lines.append(f"{name}{_labels(labels)} {value}")
+        for name, (help_, buckets, series) in self._histograms.items():
+            lines += [f"# HELP {name} {help_}", f"# TYPE {name} histogram"]
+            for labels, hist in series.items():
+                cumulative = 0
+                for bound, count in zip((*buckets, "+Inf"), hist.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {hist.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+        for prefix, collect in self._gauges:
+            for key, value in collect().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines += [f"# TYPE {prefix}_{key} gauge", f"{prefix}_{key} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+registry.counter("learner_http_requests_total", "HTTP requests by route and status")
+registry.histogram("learner_http_request_duration_seconds", "Request latency", DURATION_BUCKETS)
+registry.histogram("learner_http_request_sql_statements", "SQL statements per request", COUNT_BUCKETS)
+registry.histogram("learner_http_request_sql_duration_seconds", "SQL time per request", DURATION_BUCKETS)
+registry.histogram("learner_http_request_mongo_calls", "Mongo commands per request", COUNT_BUCKETS)
+registry.histogram("learner_http_request_mongo_duration_seconds", "Mongo time per request", DURATION_BUCKETS)
+registry.histogram(
+    "learner_http_request_serialize_duration_seconds", "JSON rendering time per request", DURATION_BUCKETS
+)
+
+
+# -------- ASGI middleware --------
+
+class RequestMetricsMiddleware:
+    """
+    Считает метрики каждого HTTP-запроса. Server-Timing ставится в начале ответа
+    (для потоковых ответов — без времени отдачи тела); гистограммы и лог — после
+    отправки тела целиком.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.server_timing:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", stats.server_timing(time.perf_counter() - started)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._record(scope, stats, status_code, time.perf_counter() - started)
+
+    @staticmethod
+    def _record(scope, stats: RequestStats, status_code: int, elapsed_s: float) -> None:
+        route = scope.get("route")
+        # шаблон пути, а не сам путь: /api/skills/{id}, иначе число рядов метрик не ограничено
+        path = getattr(route, "path", None) or "<unmatched>"
+        labels: Labels = (("method", scope["method"]), ("route", path))
+        registry.inc("learner_http_requests_total", labels + (("status", str(status_code)),))
+        registry.observe("learner_http_request_duration_seconds", labels, elapsed_s)
+        registry.observe("learner_http_request_sql_statements", labels, stats.sql_count)
+        registry.observe("learner_http_request_sql_duration_seconds", labels, stats.sql_s)
+        registry.observe("learner_http_request_mongo_calls", labels, stats.mongo_count)
+        registry.observe("learner_http_request_mongo_duration_seconds", labels, stats.mongo_s)
+        registry.observe("learner_http_request_serialize_duration_seconds", labels, stats.serialize_s)
+
+        if settings.request_log:
+            logger.info(
+                orjson.dumps(
+                    {
+                        "method": scope["method"],
+                        "route": path,
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": round(elapsed_s * 1000, 2),
+                        "sql_count": stats.sql_count,
+                        "sql_ms": round(stats.sql_s * 1000, 2),
+                        "mongo_count": stats.mongo_count,
+                        "mongo_ms": round(stats.mongo_s * 1000, 2),
+                        "serialize_ms": round(stats.serialize_s * 1000, 2),
+                    }
+                ).decode()
+            )
@@ -1,12 +1,68 @@
 # core/mongo.py
-from functools import lru_cache
+import logging
+from typing import Any, Dict, Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
 from core.config import settings
+from core.metrics import mongo_command_listener
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[AsyncIOMotorClient] = None
+
+
+def _client_options() -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        # число и время Mongo-команд текущего HTTP-запроса (core/metrics.py)
+        "event_listeners": [mongo_command_listener],
+    }
+    if settings.mongo_socket_timeout_ms:
+        options["socketTimeoutMS"] = settings.mongo_socket_timeout_ms
+    if settings.mongo_max_idle_time_ms:
+        options["maxIdleTimeMS"] = settings.mongo_max_idle_time_ms
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+    return options
+
+
+def _get_client() -> AsyncIOMotorClient:
+    # Обычно клиент создаётся в lifespan (init_mongo); лениво — для скриптов и CLI
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(settings.mongo_uri, **_client_options())
+    return _client
 
-@lru_cache
-def _client() -> AsyncIOMotorClient:
-    return AsyncIOMotorClient(settings.mongo_uri)
 
 def get_mongo_db():
-    db = _client()[settings.mongo_db]
+    # None — Mongo выключен (APP_MONGO_ENABLED=false): потребители обходятся без него
+    if not settings.mongo_enabled:
+        return None
+    db = _get_client()[settings.mongo_db]
     return db
+
+
+async def init_mongo() -> None:
+    """Создаёт клиент, прогревает соединение и гарантирует индексы. Вызывается на старте приложения."""
+    if not settings.mongo_enabled:
+        return
+    client = _get_client()
+    try:
+        await client.admin.command("ping")
+        await get_mongo_db()["quest_meta"].create_index(
+            "quest_id", unique=True, name="ux_quest_meta_quest_id"
+        )
+    except PyMongoError as e:
+        # Квесты умеют отдаваться без scenario — не валим старт, если Mongo недоступен
+        logger.warning("Mongo warm-up failed, continuing without it: %r", e)
+
+
+def close_mongo() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -1,10 +1,110 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util.queue import AsyncAdaptedQueue, Empty
 from core.config import settings
+from core.metrics import after_cursor_execute, before_cursor_execute
+
+
+class PoolWaitStats:
+    """Сколько раз и как долго запросы ждали свободное соединение в пуле."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def record(self, elapsed_s: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_s += elapsed_s
+            self.max_s = max(self.max_s, elapsed_s)
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class _TimedAsyncAdaptedQueue(AsyncAdaptedQueue):
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        # пул блокирует выдачу только когда пул и overflow исчерпаны (block=True);
+        # ждать пришлось, лишь если свободного соединения не оказалось сразу
+        if not block:
+            return super().get(False)
+        try:
+            return super().get(False)
+        except Empty:
+            pass
+        started = time.perf_counter()
+        try:
+            return super().get(True, timeout)
+        finally:
+            pool_wait_stats.record(time.perf_counter() - started)
+
+
+class _TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    _queue_class = _TimedAsyncAdaptedQueue
+
+
+def _connect_args() -> Dict[str, Any]:
+    if make_url(settings.db_url).get_backend_name() != "postgresql":
+        return {}
+
+    args: Dict[str, Any] = {}
+    if settings.db_pgbouncer_mode:
+        # PgBouncer (transaction/statement pooling) не держит prepared statements
+        # между транзакциями: отключаем оба кэша и делаем имена уникальными
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    else:
+        args["statement_cache_size"] = settings.db_statement_cache_size
+        args["prepared_statement_cache_size"] = settings.db_statement_cache_size
+    if settings.db_statement_timeout_ms:
+        args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+    return args
+
+
+engine = create_async_engine(
+    settings.db_url,
+    future=True,
+    echo=False,
+    poolclass=_TimedAsyncAdaptedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_s,
+    pool_recycle=settings.db_pool_recycle_s,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    connect_args=_connect_args(),
+)
+# счётчик SQL и время БД текущего HTTP-запроса (core/metrics.py)
+event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
 
-engine = create_async_engine(settings.db_url, future=True, echo=False)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def pool_metrics() -> Dict[str, Any]:
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "opened": pool.size() + pool.overflow(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "wait_count": pool_wait_stats.count,
+        "wait_total_s": round(pool_wait_stats.total_s, 6),
+        "wait_max_s": round(pool_wait_stats.max_s, 6),
+    }
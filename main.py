@@ -1,17 +1,51 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import settings
+from core.metrics import RequestMetricsMiddleware
+from db.mongo import init_mongo, close_mongo
+from db.session import engine
 from api import api_router
+from api.compression import CompressionMiddleware, response_cache
+from api.metrics import prometheus_router
+from services.warmup import warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_mongo()
+    if settings.warmup_enabled:
+        await warm_up(app)
+    yield
+    close_mongo()
+    await engine.dispose()
 
-app = FastAPI(title="Education Learner API", version="1.0.0")
+
+app = FastAPI(title="Education Learner API", version="1.0.0", lifespan=lifespan)
+
+# внутри CORS: ответ из кэша проходит через CORSMiddleware с заголовками текущего Origin.
+# Кэш ответов не зависит от сжатия: без APP_COMPRESSION_ENABLED middleware только кэширует
+if settings.compression_enabled or settings.response_cache_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        cache=response_cache if settings.response_cache_enabled else None,
+        compress=settings.compression_enabled,
+    )
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_allowed_origins,
     allow_methods=settings.cors_allowed_methods,
     allow_headers=settings.cors_allowed_headers,
+    expose_headers=settings.cors_expose_headers,
     allow_credentials=settings.cors_allow_credentials,
     max_age=settings.cors_max_age,
 )
 
+# последним — самый внешний: метрики покрывают и CORS-ответы
+if settings.metrics_enabled:
+    app.add_middleware(RequestMetricsMiddleware)
+
 app.include_router(api_router, prefix="/api")
+app.include_router(prometheus_router)
@@ -0,0 +1,77 @@
+"""partition user progress junction tables by user
+
+Revision ID: 5c2e9d41a7f3
+Revises: 7b16a5dbd595
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "5c2e9d41a7f3"
+down_revision: Union[str, Sequence[str], None] = "7b16a5dbd595"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PARTITIONS = 16
+
+TABLES = [
+    # (table, item column, referenced table)
+    ("user_completed_theories", "theory_id", "theory"),
+    ("user_completed_quests", "quest_id", "quest"),
+    ("user_selected_professions", "profession_id", "profession"),
+]
+
+
+def _rebuild(table: str, item: str, ref: str, partitioned: bool) -> None:
+    """
+    Пересоздаёт таблицу связей (секционированной или обычной) с теми же именами
+    ограничений и индексов и переносит строки. Запись в таблицу на время переноса
+    блокируется — выполнять в окно обслуживания.
+    """
+    old = f"{table}_old"
+    reverse_index = f"ix_{table}_{item}_user_progress_id"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey")
+    op.execute(f"ALTER INDEX IF EXISTS {reverse_index} RENAME TO {reverse_index}_old")
+
+    partition_by = " PARTITION BY HASH (user_progress_id)" if partitioned else ""
+    op.execute(
+        f"""
+        CREATE TABLE {table} (
+            user_progress_id INTEGER NOT NULL,
+            {item} INTEGER NOT NULL,
+            CONSTRAINT {table}_pkey PRIMARY KEY (user_progress_id, {item}),
+            CONSTRAINT {table}_user_progress_id_fkey FOREIGN KEY (user_progress_id)
+                REFERENCES user_progress (id) ON DELETE CASCADE,
+            CONSTRAINT {table}_{item}_fkey FOREIGN KEY ({item})
+                REFERENCES {ref} (id) ON DELETE CASCADE
+        ){partition_by}
+        """
+    )
+    if partitioned:
+        for remainder in range(PARTITIONS):
+            op.execute(
+                f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+                f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+            )
+    # на секционированной таблице индекс создаётся в каждой секции (ON DELETE CASCADE со стороны каталога)
+    op.execute(f"CREATE INDEX {reverse_index} ON {table} ({item}, user_progress_id)")
+
+    op.execute(f"INSERT INTO {table} (user_progress_id, {item}) SELECT user_progress_id, {item} FROM {old}")
+    op.execute(f"DROP TABLE {old}")
+    op.execute(f"ANALYZE {table}")
+
+
+def upgrade() -> None:
+    for table, item, ref in TABLES:
+        _rebuild(table, item, ref, partitioned=True)
+
+
+def downgrade() -> None:
+    for table, item, ref in TABLES:
+        _rebuild(table, item, ref, partitioned=False)
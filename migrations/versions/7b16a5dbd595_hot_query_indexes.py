@@ -0,0 +1,81 @@
+"""hot query indexes
+
+Revision ID: 7b16a5dbd595
+Revises: 30fbfbba5626
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "7b16a5dbd595"
+down_revision: Union[str, Sequence[str], None] = "30fbfbba5626"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    # (name, table, columns)
+    (
+        "ix_theory_skill_id_parent_id_order_index",
+        "theory",
+        ["skill_id", "parent_id", "order_index"],
+    ),
+    (
+        "ix_theory_parent_id_order_index",
+        "theory",
+        ["parent_id", "order_index"],
+    ),
+    (
+        "ix_profession_skill_profession_id_skill_id",
+        "profession_skill",
+        ["profession_id", "skill_id"],
+    ),
+    (
+        "ix_theory_quest_quest_id_theory_id",
+        "theory_quest",
+        ["quest_id", "theory_id"],
+    ),
+    (
+        "ix_user_completed_theories_theory_id_user_progress_id",
+        "user_completed_theories",
+        ["theory_id", "user_progress_id"],
+    ),
+    (
+        "ix_user_completed_quests_quest_id_user_progress_id",
+        "user_completed_quests",
+        ["quest_id", "user_progress_id"],
+    ),
+    (
+        "ix_user_selected_professions_profession_id_user_progress_id",
+        "user_selected_professions",
+        ["profession_id", "user_progress_id"],
+    ),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY не блокирует запись в таблицы, но не работает в транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,244 @@
+"""progress counters per skill and per user
+
+Revision ID: 9d3f6b2a8c14
+Revises: 5c2e9d41a7f3
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "9d3f6b2a8c14"
+down_revision: Union[str, Sequence[str], None] = "5c2e9d41a7f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PARTITIONS = 16
+
+# Счётчики ведут триггеры:
+#   skill_theory_count.theory_count         — число теорий скилла (theory: INSERT/DELETE/смена skill_id);
+#   user_skill_progress.completed_count     — число пройденных пользователем теорий скилла
+#                                             (user_completed_theories: INSERT/DELETE, theory: DELETE/смена skill_id).
+# Пакетные INSERT/UPDATE/DELETE обрабатываются триггерами уровня оператора (таблицы переходов) —
+# одно обновление счётчика на скилл/пользователя, а не на строку. Уменьшение — только UPDATE:
+# строку удалённого скилла или пользователя нельзя создавать заново.
+# Вставки в счётчики идут в порядке ключа (ORDER BY) — пересекающиеся пакеты блокируют строки одинаково.
+FUNCTIONS = [
+    # полный пересчёт: начальное заполнение и ремонт после ручных правок
+    """
+    CREATE FUNCTION rebuild_progress_counters() RETURNS void LANGUAGE plpgsql AS $$
+    BEGIN
+        DELETE FROM skill_theory_count;
+        INSERT INTO skill_theory_count (skill_id, theory_count)
+        SELECT skill_id, count(*) FROM theory WHERE skill_id IS NOT NULL GROUP BY skill_id;
+
+        DELETE FROM user_skill_progress;
+        INSERT INTO user_skill_progress (user_progress_id, skill_id, completed_count)
+        SELECT uct.user_progress_id, t.skill_id, count(*)
+        FROM user_completed_theories uct JOIN theory t ON t.id = uct.theory_id
+        WHERE t.skill_id IS NOT NULL
+        GROUP BY uct.user_progress_id, t.skill_id;
+    END $$
+    """,
+    """
+    CREATE FUNCTION theory_counters_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO skill_theory_count AS c (skill_id, theory_count)
+        SELECT skill_id, count(*) FROM new_rows WHERE skill_id IS NOT NULL
+        GROUP BY skill_id ORDER BY skill_id
+        ON CONFLICT (skill_id) DO UPDATE SET theory_count = c.theory_count + EXCLUDED.theory_count;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE FUNCTION theory_counters_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE skill_theory_count c SET theory_count = c.theory_count - d.cnt
+        FROM (
+            SELECT skill_id, count(*) AS cnt FROM old_rows WHERE skill_id IS NOT NULL
+            GROUP BY skill_id ORDER BY skill_id
+        ) d
+        WHERE c.skill_id = d.skill_id;
+        RETURN NULL;
+    END $$
+    """,
+    # строковый BEFORE DELETE: после удаления теории её отметки уходят каскадом,
+    # и триггер таблицы отметок уже не найдёт скилл (строки theory нет) — списываем здесь
+    """
+    CREATE FUNCTION theory_progress_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF OLD.skill_id IS NOT NULL THEN
+            UPDATE user_skill_progress p SET completed_count = p.completed_count - 1
+            FROM user_completed_theories uct
+            WHERE uct.theory_id = OLD.id
+              AND p.user_progress_id = uct.user_progress_id
+              AND p.skill_id = OLD.skill_id;
+        END IF;
+        RETURN OLD;
+    END $$
+    """,
+    # перенос теории в другой скилл (в т.ч. SET NULL при удалении скилла); move_theory skill_id не меняет
+    """
+    CREATE FUNCTION theory_counters_update() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE o.skill_id IS DISTINCT FROM n.skill_id
+        ) THEN
+            RETURN NULL;
+        END IF;
+
+        UPDATE skill_theory_count c SET theory_count = c.theory_count - d.cnt
+        FROM (
+            SELECT o.skill_id, count(*) AS cnt
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE o.skill_id IS DISTINCT FROM n.skill_id AND o.skill_id IS NOT NULL
+            GROUP BY o.skill_id ORDER BY o.skill_id
+        ) d
+        WHERE c.skill_id = d.skill_id;
+
+        INSERT INTO skill_theory_count AS c (skill_id, theory_count)
+        SELECT n.skill_id, count(*)
+        FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE o.skill_id IS DISTINCT FROM n.skill_id AND n.skill_id IS NOT NULL
+        GROUP BY n.skill_id ORDER BY n.skill_id
+        ON CONFLICT (skill_id) DO UPDATE SET theory_count = c.theory_count + EXCLUDED.theory_count;
+
+        UPDATE user_skill_progress p SET completed_count = p.completed_count - d.cnt
+        FROM (
+            SELECT uct.user_progress_id, o.skill_id, count(*) AS cnt
+            FROM old_rows o
+            JOIN new_rows n ON n.id = o.id
+            JOIN user_completed_theories uct ON uct.theory_id = o.id
+            WHERE o.skill_id IS DISTINCT FROM n.skill_id AND o.skill_id IS NOT NULL
+            GROUP BY uct.user_progress_id, o.skill_id ORDER BY 1, 2
+        ) d
+        WHERE p.user_progress_id = d.user_progress_id AND p.skill_id = d.skill_id;
+
+        INSERT INTO user_skill_progress AS p (user_progress_id, skill_id, completed_count)
+        SELECT uct.user_progress_id, n.skill_id, count(*)
+        FROM old_rows o
+        JOIN new_rows n ON n.id = o.id
+        JOIN user_completed_theories uct ON uct.theory_id = n.id
+        WHERE o.skill_id IS DISTINCT FROM n.skill_id AND n.skill_id IS NOT NULL
+        GROUP BY uct.user_progress_id, n.skill_id ORDER BY 1, 2
+        ON CONFLICT (user_progress_id, skill_id)
+        DO UPDATE SET completed_count = p.completed_count + EXCLUDED.completed_count;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE FUNCTION completed_theories_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO user_skill_progress AS p (user_progress_id, skill_id, completed_count)
+        SELECT n.user_progress_id, t.skill_id, count(*)
+        FROM new_rows n JOIN theory t ON t.id = n.theory_id
+        WHERE t.skill_id IS NOT NULL
+        GROUP BY n.user_progress_id, t.skill_id ORDER BY 1, 2
+        ON CONFLICT (user_progress_id, skill_id)
+        DO UPDATE SET completed_count = p.completed_count + EXCLUDED.completed_count;
+        RETURN NULL;
+    END $$
+    """,
+    # отметки удалённых теорий сюда не попадают: JOIN theory их не находит (см. theory_progress_delete)
+    """
+    CREATE FUNCTION completed_theories_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE user_skill_progress p SET completed_count = p.completed_count - d.cnt
+        FROM (
+            SELECT o.user_progress_id, t.skill_id, count(*) AS cnt
+            FROM old_rows o JOIN theory t ON t.id = o.theory_id
+            WHERE t.skill_id IS NOT NULL
+            GROUP BY o.user_progress_id, t.skill_id ORDER BY 1, 2
+        ) d
+        WHERE p.user_progress_id = d.user_progress_id AND p.skill_id = d.skill_id;
+        RETURN NULL;
+    END $$
+    """,
+]
+
+TRIGGERS = [
+    # (name, table, definition)
+    ("trg_theory_counters_insert", "theory",
+     "AFTER INSERT ON theory REFERENCING NEW TABLE AS new_rows "
+     "FOR EACH STATEMENT EXECUTE FUNCTION theory_counters_insert()"),
+    ("trg_theory_counters_delete", "theory",
+     "AFTER DELETE ON theory REFERENCING OLD TABLE AS old_rows "
+     "FOR EACH STATEMENT EXECUTE FUNCTION theory_counters_delete()"),
+    ("trg_theory_progress_delete", "theory",
+     "BEFORE DELETE ON theory FOR EACH ROW EXECUTE FUNCTION theory_progress_delete()"),
+    ("trg_theory_counters_update", "theory",
+     "AFTER UPDATE ON theory REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+     "FOR EACH STATEMENT EXECUTE FUNCTION theory_counters_update()"),
+    ("trg_completed_theories_insert", "user_completed_theories",
+     "AFTER INSERT ON user_completed_theories REFERENCING NEW TABLE AS new_rows "
+     "FOR EACH STATEMENT EXECUTE FUNCTION completed_theories_insert()"),
+    ("trg_completed_theories_delete", "user_completed_theories",
+     "AFTER DELETE ON user_completed_theories REFERENCING OLD TABLE AS old_rows "
+     "FOR EACH STATEMENT EXECUTE FUNCTION completed_theories_delete()"),
+]
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE skill_theory_count (
+            skill_id INTEGER NOT NULL,
+            theory_count INTEGER NOT NULL DEFAULT 0,
+            CONSTRAINT skill_theory_count_pkey PRIMARY KEY (skill_id),
+            CONSTRAINT skill_theory_count_skill_id_fkey FOREIGN KEY (skill_id)
+                REFERENCES skill (id) ON DELETE CASCADE
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE user_skill_progress (
+            user_progress_id INTEGER NOT NULL,
+            skill_id INTEGER NOT NULL,
+            completed_count INTEGER NOT NULL DEFAULT 0,
+            CONSTRAINT user_skill_progress_pkey PRIMARY KEY (user_progress_id, skill_id),
+            CONSTRAINT user_skill_progress_user_progress_id_fkey FOREIGN KEY (user_progress_id)
+                REFERENCES user_progress (id) ON DELETE CASCADE,
+            CONSTRAINT user_skill_progress_skill_id_fkey FOREIGN KEY (skill_id)
+                REFERENCES skill (id) ON DELETE CASCADE
+        ) PARTITION BY HASH (user_progress_id)
+        """
+    )
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE user_skill_progress_p{remainder} PARTITION OF user_skill_progress "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+    # ON DELETE CASCADE со стороны скилла
+    op.execute("CREATE INDEX ix_user_skill_progress_skill_id ON user_skill_progress (skill_id)")
+
+    for ddl in FUNCTIONS:
+        op.execute(ddl)
+    for name, _, definition in TRIGGERS:
+        op.execute(f"CREATE TRIGGER {name} {definition}")
+
+    op.execute("SELECT rebuild_progress_counters()")
+    op.execute("ANALYZE skill_theory_count")
+    op.execute("ANALYZE user_skill_progress")
+
+
+def downgrade() -> None:
+    for name, table, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+    for function in (
+        "completed_theories_delete",
+        "completed_theories_insert",
+        "theory_counters_update",
+        "theory_progress_delete",
+        "theory_counters_delete",
+        "theory_counters_insert",
+        "rebuild_progress_counters",
+    ):
+        op.execute(f"DROP FUNCTION IF EXISTS {function}()")
+    op.execute("DROP TABLE user_skill_progress")
+    op.execute("DROP TABLE skill_theory_count")
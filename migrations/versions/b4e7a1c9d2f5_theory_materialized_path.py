@@ -0,0 +1,120 @@
+"""materialized path and depth for the theory hierarchy
+
+Revision ID: b4e7a1c9d2f5
+Revises: 9d3f6b2a8c14
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "b4e7a1c9d2f5"
+down_revision: Union[str, Sequence[str], None] = "9d3f6b2a8c14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# theory.path — id от корня до узла через точку с точкой в конце: "1.5.9.".
+# Потомки X — строки с префиксом X.path, т.е. диапазон [X.path, X.path || '~') по btree
+# в порядке байт (COLLATE "C"; '~' больше цифр и точки). Предки — id из самого пути.
+# path/depth проставляет триггер при INSERT и смене parent_id (в т.ч. ON DELETE SET NULL
+# у детей удалённой теории) и переписывает пути потомков; цикл (перенос под собственного
+# потомка) отклоняется с SQLSTATE 23514.
+FUNCTIONS = [
+    """
+    CREATE FUNCTION theory_set_path() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        parent_path TEXT;
+        parent_depth INTEGER;
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.parent_id IS NOT DISTINCT FROM OLD.parent_id THEN
+            RETURN NEW;
+        END IF;
+        IF NEW.parent_id IS NULL THEN
+            NEW.path := NEW.id || '.';
+            NEW.depth := 0;
+            RETURN NEW;
+        END IF;
+
+        IF TG_OP = 'UPDATE' THEN
+            -- FOR SHARE: встречные переносы (A под B и B под A) не пройдут оба — один дождётся
+            -- другого или получит deadlock, но цикла не будет
+            SELECT path, depth INTO parent_path, parent_depth FROM theory WHERE id = NEW.parent_id FOR SHARE;
+        ELSE
+            SELECT path, depth INTO parent_path, parent_depth FROM theory WHERE id = NEW.parent_id;
+        END IF;
+        IF parent_path IS NULL THEN
+            -- родителя нет: INSERT/UPDATE всё равно отклонит внешний ключ
+            NEW.path := NEW.id || '.';
+            NEW.depth := 0;
+            RETURN NEW;
+        END IF;
+        IF TG_OP = 'UPDATE' AND starts_with(parent_path, OLD.path) THEN
+            RAISE EXCEPTION 'theory % cannot be moved under its own descendant %', NEW.id, NEW.parent_id
+                USING ERRCODE = 'check_violation';
+        END IF;
+        NEW.path := parent_path || NEW.id || '.';
+        NEW.depth := parent_depth + 1;
+        RETURN NEW;
+    END $$
+    """,
+    """
+    CREATE FUNCTION theory_move_subtree() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE theory
+        SET path = NEW.path || substr(path, length(OLD.path) + 1),
+            depth = depth + (NEW.depth - OLD.depth)
+        WHERE path > OLD.path AND path < OLD.path || '~';
+        RETURN NULL;
+    END $$
+    """,
+]
+
+TRIGGERS = [
+    ("trg_theory_set_path",
+     "BEFORE INSERT OR UPDATE OF parent_id ON theory FOR EACH ROW EXECUTE FUNCTION theory_set_path()"),
+    ("trg_theory_move_subtree",
+     "AFTER UPDATE OF parent_id ON theory FOR EACH ROW "
+     "WHEN (OLD.path IS DISTINCT FROM NEW.path) EXECUTE FUNCTION theory_move_subtree()"),
+]
+
+
+def upgrade() -> None:
+    op.execute('ALTER TABLE theory ADD COLUMN path TEXT COLLATE "C"')
+    op.execute("ALTER TABLE theory ADD COLUMN depth INTEGER")
+    op.execute(
+        """
+        WITH RECURSIVE tree AS (
+            SELECT id, id || '.' AS path, 0 AS depth FROM theory WHERE parent_id IS NULL
+            UNION ALL
+            SELECT t.id, tree.path || t.id || '.', tree.depth + 1
+            FROM theory t JOIN tree ON t.parent_id = tree.id
+        )
+        UPDATE theory SET path = tree.path, depth = tree.depth FROM tree WHERE theory.id = tree.id
+        """
+    )
+    # узлы, не достижимые от корней (циклы по parent_id, которые раньше не проверялись):
+    # отрываем от родителя и делаем корнями
+    op.execute("UPDATE theory SET parent_id = NULL, path = id || '.', depth = 0 WHERE path IS NULL")
+    op.execute("ALTER TABLE theory ALTER COLUMN path SET NOT NULL")
+    op.execute("ALTER TABLE theory ALTER COLUMN depth SET NOT NULL")
+    op.execute("CREATE INDEX ix_theory_path ON theory (path)")
+
+    for ddl in FUNCTIONS:
+        op.execute(ddl)
+    for name, definition in TRIGGERS:
+        op.execute(f"CREATE TRIGGER {name} {definition}")
+    op.execute("ANALYZE theory")
+
+
+def downgrade() -> None:
+    for name, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON theory")
+    op.execute("DROP FUNCTION IF EXISTS theory_move_subtree()")
+    op.execute("DROP FUNCTION IF EXISTS theory_set_path()")
+    op.execute("DROP INDEX IF EXISTS ix_theory_path")
+    op.execute("ALTER TABLE theory DROP COLUMN depth")
+    op.execute("ALTER TABLE theory DROP COLUMN path")
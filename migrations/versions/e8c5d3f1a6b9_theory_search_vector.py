@@ -0,0 +1,38 @@
+"""full-text search vector for theories
+
+Revision ID: e8c5d3f1a6b9
+Revises: b4e7a1c9d2f5
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "e8c5d3f1a6b9"
+down_revision: Union[str, Sequence[str], None] = "b4e7a1c9d2f5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Конфигурация 'russian': русские слова — русский стеммер, латиница — английский.
+# Заголовок весит больше текста (A против B) — это учитывает ts_rank_cd.
+# Выражение должно совпадать с Computed у Theory.search_vector.
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(content, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # STORED: вектор пересчитывается при INSERT/UPDATE title/content, запрос его только читает
+    op.execute(f"ALTER TABLE theory ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED")
+    op.execute("CREATE INDEX ix_theory_search_vector ON theory USING gin (search_vector)")
+    op.execute("ANALYZE theory")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_theory_search_vector")
+    op.execute("ALTER TABLE theory DROP COLUMN search_vector")
@@ -0,0 +1,42 @@
+"""shared catalog versions for ETags
+
+Revision ID: f2a9c4d7e3b1
+Revises: e8c5d3f1a6b9
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "f2a9c4d7e3b1"
+down_revision: Union[str, Sequence[str], None] = "e8c5d3f1a6b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Одна строка (id = 1) с версиями ресурсов каталога: её увеличивают сервисы в транзакции
+# изменения (services/versions.py), все воркеры строят из неё одинаковый ETag.
+# epoch задаётся при создании строки: пересозданная база не выдаст старый ETag.
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE catalog_version (
+            id SMALLINT NOT NULL,
+            epoch TEXT NOT NULL DEFAULT substr(md5(random()::text || clock_timestamp()::text), 1, 8),
+            professions BIGINT NOT NULL DEFAULT 0,
+            skills BIGINT NOT NULL DEFAULT 0,
+            theories BIGINT NOT NULL DEFAULT 0,
+            quests BIGINT NOT NULL DEFAULT 0,
+            CONSTRAINT catalog_version_pkey PRIMARY KEY (id),
+            CONSTRAINT ck_catalog_version_single_row CHECK (id = 1)
+        )
+        """
+    )
+    op.execute("INSERT INTO catalog_version (id) VALUES (1)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE catalog_version")
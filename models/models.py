@@ -3,14 +3,23 @@ from __future__ import annotations
 from typing import List, Optional
 
 from sqlalchemy import (
+    DDL,
+    BigInteger,
+    SmallInteger,
+    event,
     String,
     Integer,
     ForeignKey,
     Table,
     Text,
     CheckConstraint,
-    Column
+    Column,
+    Computed,
+    FetchedValue,
+    Index,
+    text,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -28,6 +37,8 @@ profession_skill = Table(
     Base.metadata,
     Column("skill_id", ForeignKey("skill.id", ondelete="CASCADE"), primary_key=True),
     Column("profession_id", ForeignKey("profession.id", ondelete="CASCADE"), primary_key=True),
+    # PK начинается с skill_id — для выборки скиллов профессии нужен обратный индекс
+    Index("ix_profession_skill_profession_id_skill_id", "profession_id", "skill_id"),
 )
 
 theory_quest = Table(
@@ -35,31 +46,97 @@ theory_quest = Table(
     Base.metadata,
     Column("theory_id", ForeignKey("theory.id", ondelete="CASCADE"), primary_key=True),
     Column("quest_id", ForeignKey("quest.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_theory_quest_quest_id_theory_id", "quest_id", "theory_id"),
 )
 
-user_completed_theories = Table(
+# Прогресс пользователей: таблицы связей секционированы HASH(user_progress_id) —
+# все строки одного пользователя лежат в одной секции, чтение прогресса не зависит
+# от общего числа учащихся. Секции создаёт миграция 5c2e9d41a7f3; при create_all
+# (dev/тесты на PostgreSQL) — DDL ниже.
+USER_PROGRESS_PARTITIONS = 16
+
+
+def _hash_partitioned(table: Table) -> Table:
+    for remainder in range(USER_PROGRESS_PARTITIONS):
+        event.listen(
+            table,
+            "after_create",
+            DDL(
+                f"CREATE TABLE {table.name}_p{remainder} PARTITION OF {table.name} "
+                f"FOR VALUES WITH (MODULUS {USER_PROGRESS_PARTITIONS}, REMAINDER {remainder})"
+            ).execute_if(dialect="postgresql"),
+        )
+    return table
+
+
+user_completed_theories = _hash_partitioned(Table(
     "user_completed_theories",
     Base.metadata,
     Column("user_progress_id", ForeignKey("user_progress.id", ondelete="CASCADE"), primary_key=True),
     Column("theory_id", ForeignKey("theory.id", ondelete="CASCADE"), primary_key=True),
-)
+    Index("ix_user_completed_theories_theory_id_user_progress_id", "theory_id", "user_progress_id"),
+    postgresql_partition_by="HASH (user_progress_id)",
+))
 
-user_completed_quests = Table(
+user_completed_quests = _hash_partitioned(Table(
     "user_completed_quests",
     Base.metadata,
     Column("user_progress_id", ForeignKey("user_progress.id", ondelete="CASCADE"), primary_key=True),
     Column("quest_id", ForeignKey("quest.id", ondelete="CASCADE"), primary_key=True),
-)
+    Index("ix_user_completed_quests_quest_id_user_progress_id", "quest_id", "user_progress_id"),
+    postgresql_partition_by="HASH (user_progress_id)",
+))
 
-user_selected_professions = Table(
+user_selected_professions = _hash_partitioned(Table(
     "user_selected_professions",
     Base.metadata,
     Column("user_progress_id", ForeignKey("user_progress.id", ondelete="CASCADE"), primary_key=True),
     Column("profession_id", ForeignKey("profession.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_user_selected_professions_profession_id_user_progress_id", "profession_id", "user_progress_id"),
+    postgresql_partition_by="HASH (user_progress_id)",
+))
+
+
+# Счётчики для сводок прогресса (GET .../summary/*). Их ведут триггеры миграции 9d3f6b2a8c14
+# на theory и user_completed_theories; приложение в эти таблицы не пишет, только читает.
+skill_theory_count = Table(
+    "skill_theory_count",
+    Base.metadata,
+    Column("skill_id", ForeignKey("skill.id", ondelete="CASCADE"), primary_key=True),
+    Column("theory_count", Integer, nullable=False, server_default="0"),
+)
+
+user_skill_progress = _hash_partitioned(Table(
+    "user_skill_progress",
+    Base.metadata,
+    Column("user_progress_id", ForeignKey("user_progress.id", ondelete="CASCADE"), primary_key=True),
+    Column("skill_id", ForeignKey("skill.id", ondelete="CASCADE"), primary_key=True),
+    Column("completed_count", Integer, nullable=False, server_default="0"),
+    Index("ix_user_skill_progress_skill_id", "skill_id"),
+    postgresql_partition_by="HASH (user_progress_id)",
+))
+
+
+# Версии каталога для ETag (services/versions.py): одна строка id = 1, её увеличивают
+# сервисы в транзакции изменения, читают все воркеры (миграция f2a9c4d7e3b1).
+catalog_version = Table(
+    "catalog_version",
+    Base.metadata,
+    Column("id", SmallInteger, primary_key=True),
+    Column("epoch", Text, nullable=False,
+           server_default=text("substr(md5(random()::text || clock_timestamp()::text), 1, 8)")),
+    Column("professions", BigInteger, nullable=False, server_default="0"),
+    Column("skills", BigInteger, nullable=False, server_default="0"),
+    Column("theories", BigInteger, nullable=False, server_default="0"),
+    Column("quests", BigInteger, nullable=False, server_default="0"),
+    CheckConstraint("id = 1", name="ck_catalog_version_single_row"),
 )
 
 
 # -------- Модели (имена как в БД) --------
+# Все отношения lazy="raise_on_sql": что загружать, решает репозиторий через профиль
+# (repositories/load_profiles.py). Для M2M passive_deletes=True — строки связей
+# удаляет ON DELETE CASCADE, ORM не подгружает коллекции перед удалением.
 class Profession(Base):
     __tablename__ = "profession"
 
@@ -70,7 +147,8 @@ class Profession(Base):
     skills: Mapped[List["Skill"]] = relationship(
         secondary=profession_skill,
         back_populates="professions",
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
 
     __table_args__ = (
@@ -89,13 +167,14 @@ class Skill(Base):
     professions: Mapped[List[Profession]] = relationship(
         secondary=profession_skill,
         back_populates="skills",
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
 
     theories: Mapped[List["Theory"]] = relationship(
         back_populates="skill",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise_on_sql",
     )
 
     __table_args__ = (
@@ -118,28 +197,59 @@ class Theory(Base):
     parent: Mapped[Optional["Theory"]] = relationship(
         remote_side="Theory.id",
         back_populates="sub_theories",
-        lazy="raise",
+        lazy="raise_on_sql",
     )
 
     sub_theories: Mapped[List["Theory"]] = relationship(
         back_populates="parent",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise_on_sql",
         order_by="Theory.order_index",
     )
 
     skill_id: Mapped[Optional[int]] = mapped_column(ForeignKey("skill.id", ondelete="SET NULL"))
-    skill: Mapped[Optional[Skill]] = relationship(back_populates="theories", lazy="selectin")
+    skill: Mapped[Optional[Skill]] = relationship(back_populates="theories", lazy="raise_on_sql")
+
+    # Материализованный путь "1.5.9." (id от корня, COLLATE "C") и глубина (корень — 0).
+    # Проставляет триггер миграции b4e7a1c9d2f5 при INSERT и смене parent_id — приложение их не пишет
+    path: Mapped[str] = mapped_column(
+        Text(collation="C"), nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue()
+    )
+    depth: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue()
+    )
+
+    # Полнотекстовый вектор title (вес A) + content (вес B), генерируемый столбец миграции e8c5d3f1a6b9.
+    # Только для WHERE/ORDER BY поиска: в ORM-объекты не загружается
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian'::regconfig, coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('russian'::regconfig, coalesce(content, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+        deferred_raiseload=True,
+    )
 
     quests: Mapped[List["Quest"]] = relationship(
         secondary=theory_quest,
         back_populates="theories",
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
 
     __table_args__ = (
         CheckConstraint("title <> ''", name="ck_theory_title_not_blank"),
         CheckConstraint("content <> ''", name="ck_theory_content_not_blank"),
+        # корни скилла: skill_id = ? AND parent_id IS NULL ORDER BY order_index
+        Index("ix_theory_skill_id_parent_id_order_index", "skill_id", "parent_id", "order_index"),
+        # дети узла: parent_id = ? ORDER BY order_index
+        Index("ix_theory_parent_id_order_index", "parent_id", "order_index"),
+        # поддерево: path >= X.path AND path < X.path || '~'
+        Index("ix_theory_path", "path"),
+        # полнотекстовый поиск: search_vector @@ tsquery
+        Index("ix_theory_search_vector", "search_vector", postgresql_using="gin"),
     )
 
 
@@ -162,7 +272,8 @@ class Quest(Base):
     theories: Mapped[List[Theory]] = relationship(
         secondary=theory_quest,
         back_populates="quests",
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
 
     __table_args__ = (CheckConstraint("name <> ''", name="ck_quest_name_not_blank"),)
@@ -179,15 +290,18 @@ class UserProgress(Base):
 
     completed_theories: Mapped[List[Theory]] = relationship(
         secondary=user_completed_theories,
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
     completed_quests: Mapped[List[Quest]] = relationship(
         secondary=user_completed_quests,
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
     selected_professions: Mapped[List[Profession]] = relationship(
         secondary=user_selected_professions,
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
 
     __table_args__ = (CheckConstraint("user_name <> ''", name="ck_userprogress_username_not_blank"),)
@@ -0,0 +1,61 @@
+# repositories/load_profiles.py
+"""
+Именованные профили загрузки отношений.
+
+Все отношения в models.models объявлены с lazy="raise_on_sql": по умолчанию запрос
+грузит только столбцы сущности, а любое обращение к незагруженной связи падает
+сразу, а не тянет граф целиком. Репозиторий явно выбирает профиль:
+
+- LIST   — только столбцы (списки, ответы *Out без вложенных объектов);
+- DETAIL — сущность с её непосредственными коллекциями;
+- TREE   — сущность со всем поддеревом теорий (нужно ORM-каскаду удаления).
+"""
+from typing import Dict, Tuple, Type
+
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.base import ExecutableOption
+
+from models.models import Profession, Quest, Skill, Theory, UserProgress
+
+LIST = "list"
+DETAIL = "detail"
+TREE = "tree"
+
+_PROFILES: Dict[Type, Dict[str, Tuple[ExecutableOption, ...]]] = {
+    Profession: {
+        LIST: (),
+        DETAIL: (selectinload(Profession.skills),),
+    },
+    Skill: {
+        LIST: (),
+        DETAIL: (selectinload(Skill.professions),),
+        TREE: (
+            selectinload(Skill.professions),
+            selectinload(Skill.theories).selectinload(Theory.sub_theories, recursion_depth=-1),
+        ),
+    },
+    Theory: {
+        LIST: (),
+        DETAIL: (selectinload(Theory.quests),),
+        TREE: (selectinload(Theory.sub_theories, recursion_depth=-1),),
+    },
+    Quest: {
+        LIST: (),
+        DETAIL: (selectinload(Quest.theories),),
+    },
+    UserProgress: {
+        LIST: (),
+        DETAIL: (
+            selectinload(UserProgress.completed_theories),
+            selectinload(UserProgress.completed_quests),
+            selectinload(UserProgress.selected_professions),
+        ),
+    },
+}
+
+
+def load_options(model: Type, profile: str) -> Tuple[ExecutableOption, ...]:
+    try:
+        return _PROFILES[model][profile]
+    except KeyError:
+        raise ValueError(f"Unknown loading profile {profile!r} for {model.__name__}") from None
@@ -1,18 +1,72 @@
 # repositories/profession_repo.py
-from typing import Sequence, Optional
+from typing import List, Sequence, Optional, AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert, Row
+from core.config import settings
 from models.models import Profession
+from repositories.load_profiles import LIST, load_options
+
+# Столбцы для быстрых проекций (без ORM-объектов)
+PROFESSION_COLUMNS = (Profession.id, Profession.name, Profession.icon)
+
 
 class ProfessionRepository:
-    async def find_all(self, db: AsyncSession) -> Sequence[Profession]:
-        res = await db.execute(select(Profession).order_by(Profession.id))
+    async def find_all(
+        self,
+        db: AsyncSession,
+        profile: str = LIST,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Sequence[Profession]:
+        stmt = select(Profession).options(*load_options(Profession, profile)).order_by(Profession.id)
+        if after_id is not None:
+            stmt = stmt.where(Profession.id > after_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        res = await db.execute(stmt)
         return res.scalars().all()
 
-    async def find_by_id(self, db: AsyncSession, id_: int) -> Optional[Profession]:
-        res = await db.execute(select(Profession).where(Profession.id == id_))
+    async def find_all_rows(
+        self, db: AsyncSession, after_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> Sequence[Row]:
+        stmt = select(*PROFESSION_COLUMNS).order_by(Profession.id)
+        if after_id is not None:
+            stmt = stmt.where(Profession.id > after_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        res = await db.execute(stmt)
+        return res.all()
+
+    async def stream_all(
+        self, db: AsyncSession, after_id: Optional[int] = None
+    ) -> AsyncIterator[Row]:
+        # Серверный курсор: строки приходят пачками по stream_batch_size
+        stmt = (
+            select(*PROFESSION_COLUMNS)
+            .order_by(Profession.id)
+            .execution_options(yield_per=settings.stream_batch_size)
+        )
+        if after_id is not None:
+            stmt = stmt.where(Profession.id > after_id)
+        res = await db.stream(stmt)
+        async for row in res:
+            yield row
+
+    async def find_by_id(
+        self, db: AsyncSession, id_: int, profile: str = LIST
+    ) -> Optional[Profession]:
+        res = await db.execute(
+            select(Profession).options(*load_options(Profession, profile)).where(Profession.id == id_)
+        )
         return res.scalar_one_or_none()
 
+    async def insert_many(self, db: AsyncSession, rows: List[dict]) -> List[int]:
+        """Многострочный INSERT ... RETURNING id; id возвращаются в порядке rows."""
+        if not rows:
+            return []
+        res = await db.execute(insert(Profession).returning(Profession.id, sort_by_parameter_order=True), rows)
+        return list(res.scalars().all())
+
     async def save(self, db: AsyncSession, obj: Profession) -> Profession:
         if obj.id is None:
             # Новая запись
@@ -1,18 +1,101 @@
 # repositories/quest_repo.py
-from typing import Sequence, Optional
+from typing import List, Sequence, Optional, AsyncIterator, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
-from models.models import Quest
+from sqlalchemy import select, delete, insert, Row
+from core.config import settings
+from models.models import Quest, theory_quest
+from repositories.load_profiles import LIST, load_options
+
+# Столбцы для быстрых проекций (без ORM-объектов)
+QUEST_COLUMNS = (Quest.id, Quest.name, Quest.description, Quest.preview)
+
 
 class QuestRepository:
-    async def find_all(self, db: AsyncSession) -> Sequence[Quest]:
-        res = await db.execute(select(Quest).order_by(Quest.id))
+    async def find_all(
+        self,
+        db: AsyncSession,
+        profile: str = LIST,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Sequence[Quest]:
+        stmt = select(Quest).options(*load_options(Quest, profile)).order_by(Quest.id)
+        if after_id is not None:
+            stmt = stmt.where(Quest.id > after_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        res = await db.execute(stmt)
         return res.scalars().all()
 
-    async def find_by_id(self, db: AsyncSession, id_: int) -> Optional[Quest]:
-        res = await db.execute(select(Quest).where(Quest.id == id_))
+    async def find_all_rows(
+        self, db: AsyncSession, after_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> Sequence[Row]:
+        stmt = select(*QUEST_COLUMNS).order_by(Quest.id)
+        if after_id is not None:
+            stmt = stmt.where(Quest.id > after_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        res = await db.execute(stmt)
+        return res.all()
+
+    async def stream_all(
+        self, db: AsyncSession, after_id: Optional[int] = None
+    ) -> AsyncIterator[Row]:
+        # Серверный курсор: строки приходят пачками по stream_batch_size
+        stmt = (
+            select(*QUEST_COLUMNS)
+            .order_by(Quest.id)
+            .execution_options(yield_per=settings.stream_batch_size)
+        )
+        if after_id is not None:
+            stmt = stmt.where(Quest.id > after_id)
+        res = await db.stream(stmt)
+        async for row in res:
+            yield row
+
+    async def find_by_id(
+        self, db: AsyncSession, id_: int, profile: str = LIST
+    ) -> Optional[Quest]:
+        res = await db.execute(
+            select(Quest).options(*load_options(Quest, profile)).where(Quest.id == id_)
+        )
         return res.scalar_one_or_none()
 
+    async def insert_many(self, db: AsyncSession, rows: List[dict]) -> List[int]:
+        """Многострочный INSERT ... RETURNING id; id возвращаются в порядке rows."""
+        if not rows:
+            return []
+        res = await db.execute(insert(Quest).returning(Quest.id, sort_by_parameter_order=True), rows)
+        return list(res.scalars().all())
+
+    async def link_theories(self, db: AsyncSession, pairs: List[Tuple[int, int]]) -> None:
+        """Связи (quest_id, theory_id) одним многострочным INSERT."""
+        if pairs:
+            await db.execute(
+                insert(theory_quest), [{"quest_id": q, "theory_id": t} for q, t in pairs]
+            )
+
+    async def stream_theory_links(self, db: AsyncSession) -> AsyncIterator[Row]:
+        """Пары (quest_id, theory_id) серверным курсором."""
+        stmt = (
+            select(theory_quest.c.quest_id, theory_quest.c.theory_id)
+            .order_by(theory_quest.c.quest_id, theory_quest.c.theory_id)
+            .execution_options(yield_per=settings.stream_batch_size)
+        )
+        res = await db.stream(stmt)
+        async for row in res:
+            yield row
+
+    async def find_theory_links(self, db: AsyncSession, theory_ids: Sequence[int]) -> Sequence[Row]:
+        """Пары (quest_id, theory_id) для теорий theory_ids (индекс theory_quest по theory_id)."""
+        if not theory_ids:
+            return []
+        res = await db.execute(
+            select(theory_quest.c.quest_id, theory_quest.c.theory_id).where(
+                theory_quest.c.theory_id.in_(theory_ids)
+            )
+        )
+        return res.all()
+
     async def save(self, db: AsyncSession, obj: Quest) -> Quest:
         db.add(obj)
         await db.flush()
@@ -1,19 +1,100 @@
 # repositories/skill_repo.py
-from typing import Optional
+from typing import List, Optional, Sequence, AsyncIterator, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, Sequence
-from models.models import Skill
+from sqlalchemy import select, insert, Row
+from core.config import settings
+from models.models import Skill, profession_skill
+from repositories.load_profiles import LIST, TREE, load_options
+
+# Столбцы для быстрых проекций (без ORM-объектов)
+SKILL_COLUMNS = (Skill.id, Skill.name, Skill.icon)
+
 
 class SkillRepository:
 
-    async def find_all(self, db: AsyncSession) -> Sequence[Skill]:
-        res = await db.execute(select(Skill).order_by(Skill.id))
+    async def find_all(
+        self,
+        db: AsyncSession,
+        profile: str = LIST,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Sequence[Skill]:
+        stmt = select(Skill).options(*load_options(Skill, profile)).order_by(Skill.id)
+        if after_id is not None:
+            stmt = stmt.where(Skill.id > after_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        res = await db.execute(stmt)
         return res.scalars().all()
 
-    async def find_by_id(self, db: AsyncSession, id_: int) -> Optional[Skill]:
-        res = await db.execute(select(Skill).where(Skill.id == id_))
+    async def find_all_rows(
+        self, db: AsyncSession, after_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> Sequence[Row]:
+        stmt = select(*SKILL_COLUMNS).order_by(Skill.id)
+        if after_id is not None:
+            stmt = stmt.where(Skill.id > after_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        res = await db.execute(stmt)
+        return res.all()
+
+    async def stream_all(
+        self, db: AsyncSession, after_id: Optional[int] = None
+    ) -> AsyncIterator[Row]:
+        # Серверный курсор: строки приходят пачками по stream_batch_size
+        stmt = (
+            select(*SKILL_COLUMNS)
+            .order_by(Skill.id)
+            .execution_options(yield_per=settings.stream_batch_size)
+        )
+        if after_id is not None:
+            stmt = stmt.where(Skill.id > after_id)
+        res = await db.stream(stmt)
+        async for row in res:
+            yield row
+
+    async def find_rows_by_profession(self, db: AsyncSession, profession_id: int) -> Sequence[Row]:
+        res = await db.execute(
+            select(*SKILL_COLUMNS)
+            .join(profession_skill, profession_skill.c.skill_id == Skill.id)
+            .where(profession_skill.c.profession_id == profession_id)
+            .order_by(Skill.id)
+        )
+        return res.all()
+
+    async def find_by_id(
+        self, db: AsyncSession, id_: int, profile: str = LIST
+    ) -> Optional[Skill]:
+        res = await db.execute(
+            select(Skill).options(*load_options(Skill, profile)).where(Skill.id == id_)
+        )
         return res.scalar_one_or_none()
 
+    async def insert_many(self, db: AsyncSession, rows: List[dict]) -> List[int]:
+        """Многострочный INSERT ... RETURNING id; id возвращаются в порядке rows."""
+        if not rows:
+            return []
+        res = await db.execute(insert(Skill).returning(Skill.id, sort_by_parameter_order=True), rows)
+        return list(res.scalars().all())
+
+    async def link_professions(self, db: AsyncSession, pairs: List[Tuple[int, int]]) -> None:
+        """Связи (skill_id, profession_id) одним многострочным INSERT."""
+        if pairs:
+            await db.execute(
+                insert(profession_skill), [{"skill_id": s, "profession_id": p} for s, p in pairs]
+            )
+
+    async def stream_profession_links(self, db: AsyncSession) -> AsyncIterator[Row]:
+        """Пары (profession_id, skill_id) серверным курсором."""
+        stmt = (
+            select(profession_skill.c.profession_id, profession_skill.c.skill_id)
+            .order_by(profession_skill.c.profession_id, profession_skill.c.skill_id)
+            .execution_options(yield_per=settings.stream_batch_size)
+        )
+        res = await db.stream(stmt)
+        async for row in res:
+            yield row
+
     async def save(self, db: AsyncSession, obj: Skill) -> Skill:
         db.add(obj)
         await db.flush()
@@ -21,6 +102,15 @@ class SkillRepository:
         return obj
 
     async def delete(self, db: AsyncSession, obj: Skill) -> None:
+        # obj должен быть загружен с профилем TREE: ORM-каскад удаляет дерево теорий
         await db.delete(obj)
 
+    async def delete_by_id(self, db: AsyncSession, id_: int) -> int:
+        obj = await self.find_by_id(db, id_, TREE)
+        if obj is None:
+            return 0
+        await self.delete(db, obj)
+        await db.flush()
+        return 1
+
 skill_repo = SkillRepository()
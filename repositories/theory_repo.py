@@ -1,17 +1,99 @@
-from typing import Sequence, Optional
+from typing import Dict, List, Sequence, Optional, AsyncIterator, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
-from models.models import Theory
+from sqlalchemy import and_, any_, cast, func, or_, select, delete, insert, update, values, column, ColumnElement, Integer, Row, Select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import aliased
+from core.config import settings
+from models.models import Theory, profession_skill
+from repositories.load_profiles import LIST, load_options
+
+# Столбцы для быстрых проекций (без ORM-объектов)
+THEORY_COLUMNS = (
+    Theory.id,
+    Theory.title,
+    Theory.content,
+    Theory.difficulty_level,
+    Theory.order_index,
+    Theory.skill_id,
+    Theory.parent_id,
+)
+# Без content: тело теории (Text без ограничения, обычно в TOAST) не читается вовсе
+THEORY_SUMMARY_COLUMNS = tuple(c for c in THEORY_COLUMNS if c is not Theory.content)
+THEORY_FIELD_COLUMNS = {"full": THEORY_COLUMNS, "summary": THEORY_SUMMARY_COLUMNS}
+
+# Конфигурация полнотекстового поиска — та же, что в выражении Theory.search_vector
+SEARCH_CONFIG = "russian"
+SNIPPET_OPTIONS = "MaxFragments=1, MaxWords=30, MinWords=10"
+
 
 class TheoryRepository:
-    async def find_all(self, db: AsyncSession) -> Sequence[Theory]:
-        res = await db.execute(select(Theory).order_by(Theory.id))
+    async def find_all(
+        self,
+        db: AsyncSession,
+        profile: str = LIST,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Sequence[Theory]:
+        stmt = select(Theory).options(*load_options(Theory, profile)).order_by(Theory.id)
+        if after_id is not None:
+            stmt = stmt.where(Theory.id > after_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        res = await db.execute(stmt)
         return res.scalars().all()
 
-    async def find_by_id(self, db: AsyncSession, id_: int) -> Optional[Theory]:
-        res = await db.execute(select(Theory).where(Theory.id == id_))
+    async def find_all_rows(
+        self,
+        db: AsyncSession,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        columns: Sequence = THEORY_COLUMNS,
+    ) -> Sequence[Row]:
+        stmt = select(*columns).order_by(Theory.id)
+        if after_id is not None:
+            stmt = stmt.where(Theory.id > after_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        res = await db.execute(stmt)
+        return res.all()
+
+    async def stream_all(
+        self, db: AsyncSession, after_id: Optional[int] = None, columns: Sequence = THEORY_COLUMNS
+    ) -> AsyncIterator[Row]:
+        # Серверный курсор: строки приходят пачками по stream_batch_size
+        stmt = (
+            select(*columns)
+            .order_by(Theory.id)
+            .execution_options(yield_per=settings.stream_batch_size)
+        )
+        if after_id is not None:
+            stmt = stmt.where(Theory.id > after_id)
+        res = await db.stream(stmt)
+        async for row in res:
+            yield row
+
+    async def find_by_id(
+        self, db: AsyncSession, id_: int, profile: str = LIST
+    ) -> Optional[Theory]:
+        res = await db.execute(
+            select(Theory).options(*load_options(Theory, profile)).where(Theory.id == id_)
+        )
         return res.scalar_one_or_none()
 
+    async def find_rows_by_ids(self, db: AsyncSession, ids: Sequence[int]) -> Sequence[Row]:
+        """Полные строки (с content) по списку id, по возрастанию id; несуществующие id пропускаются."""
+        if not ids:
+            return []
+        res = await db.execute(select(*THEORY_COLUMNS).where(Theory.id.in_(ids)).order_by(Theory.id))
+        return res.all()
+
+    async def insert_many(self, db: AsyncSession, rows: List[dict]) -> List[int]:
+        """Многострочный INSERT ... RETURNING id; id возвращаются в порядке rows."""
+        if not rows:
+            return []
+        res = await db.execute(insert(Theory).returning(Theory.id, sort_by_parameter_order=True), rows)
+        return list(res.scalars().all())
+
     async def save(self, db: AsyncSession, obj: Theory) -> Theory:
         db.add(obj)
         await db.flush()
@@ -25,4 +107,161 @@ class TheoryRepository:
         res = await db.execute(delete(Theory).where(Theory.id == id_))
         return res.rowcount or 0
 
+    async def reorder(
+        self, db: AsyncSession, parent_id: Optional[int], new_order: Dict[int, int]
+    ) -> None:
+        """
+        Массово проставляет order_index (и общий parent_id) одним
+        UPDATE theory ... FROM (VALUES (id, order_index), ...).
+        """
+        if not new_order:
+            return
+        new_values = values(
+            column("id", Integer), column("order_index", Integer), name="new_order"
+        ).data(list(new_order.items()))
+        await db.execute(
+            update(Theory)
+            .where(Theory.id == new_values.c.id)
+            .values(order_index=new_values.c.order_index, parent_id=parent_id),
+            execution_options={"synchronize_session": False},
+        )
+
+    async def find_tree_rows_by_skill(
+        self,
+        db: AsyncSession,
+        skill_id: int,
+        max_depth: Optional[int] = None,
+        columns: Sequence = THEORY_COLUMNS,
+    ) -> Sequence[Row]:
+        """
+        Всё поддерево теорий скилла одним запросом: корни скилла и их потомки
+        по диапазонам материализованного пути (ix_theory_path), без рекурсии.
+        Возвращает только столбцы (без ORM-объектов и их отношений),
+        отсортированные по (depth, order_index): родитель всегда идёт раньше детей.
+        max_depth=0 — только корни.
+        """
+        res = await db.execute(self.tree_rows_statement(skill_id, max_depth, columns))
+        return res.all()
+
+    def tree_rows_statement(
+        self, skill_id: int, max_depth: Optional[int] = None, columns: Sequence = THEORY_COLUMNS
+    ) -> Select:
+        root = aliased(Theory, name="root")
+        stmt = (
+            select(*columns, Theory.depth)
+            .join(root, self._in_subtree_of(root))
+            .where(root.skill_id == skill_id, root.parent_id.is_(None))
+        )
+        if max_depth is not None:
+            stmt = stmt.where(Theory.depth <= max_depth)
+        return stmt.order_by(Theory.depth, Theory.order_index, Theory.id)
+
+    async def stream_forest_rows(
+        self, db: AsyncSession, columns: Sequence = THEORY_COLUMNS
+    ) -> AsyncIterator[Row]:
+        """
+        Все теории (от всех корней) серверным курсором, отсортированные по глубине:
+        родитель всегда раньше детей — так их можно вставлять обратно уровнями.
+        """
+        stmt = (
+            select(*columns, Theory.depth)
+            .order_by(Theory.depth, Theory.order_index, Theory.id)
+            .execution_options(yield_per=settings.stream_batch_size)
+        )
+        res = await db.stream(stmt)
+        async for row in res:
+            yield row
+
+    async def find_subtree_rows(
+        self, db: AsyncSession, theory_id: int, columns: Sequence = THEORY_COLUMNS
+    ) -> Sequence[Row]:
+        """
+        Теория и все её потомки одним запросом по ix_theory_path (диапазон префикса пути),
+        без рекурсии. depth — относительно theory_id; порядок как у find_tree_rows_by_skill.
+        """
+        root = aliased(Theory, name="root")
+        stmt = (
+            select(*columns, (Theory.depth - root.depth).label("depth"))
+            .join(root, self._in_subtree_of(root))
+            .where(root.id == theory_id)
+            .order_by(Theory.depth, Theory.order_index, Theory.id)
+        )
+        res = await db.execute(stmt)
+        return res.all()
+
+    async def find_ancestor_rows(
+        self, db: AsyncSession, theory_id: int, columns: Sequence = THEORY_COLUMNS
+    ) -> Sequence[Row]:
+        """Предки теории от корня к родителю: id берутся из её пути, строки — по первичному ключу."""
+        target = aliased(Theory, name="target")
+        ancestor_ids = cast(func.string_to_array(func.rtrim(target.path, "."), "."), ARRAY(Integer))
+        stmt = (
+            select(*columns)
+            .join(target, and_(Theory.id == any_(ancestor_ids), Theory.id != target.id))
+            .where(target.id == theory_id)
+            .order_by(Theory.depth)
+        )
+        res = await db.execute(stmt)
+        return res.all()
+
+    async def search_rows(
+        self,
+        db: AsyncSession,
+        tsquery: str,
+        skill_id: Optional[int] = None,
+        profession_id: Optional[int] = None,
+        after: Optional[Tuple[float, int]] = None,
+        limit: int = 20,
+    ) -> Sequence[Row]:
+        """
+        Страница результатов полнотекстового поиска по ix_theory_search_vector,
+        по убыванию ts_rank_cd, при равном ранге — по id. after = (rank, id) последней
+        строки предыдущей страницы (keyset, без OFFSET). Без content: вместо него snippet —
+        фрагмент с подсвеченными (<b>) совпадениями, считается только для строк страницы.
+        """
+        query = func.to_tsquery(SEARCH_CONFIG, tsquery)
+        matches = select(
+            Theory.id, func.ts_rank_cd(Theory.search_vector, query).label("rank")
+        ).where(Theory.search_vector.bool_op("@@")(query))
+        if skill_id is not None:
+            matches = matches.where(Theory.skill_id == skill_id)
+        if profession_id is not None:
+            matches = matches.where(
+                Theory.skill_id.in_(
+                    select(profession_skill.c.skill_id).where(profession_skill.c.profession_id == profession_id)
+                )
+            )
+        matches = matches.subquery("matches")
+
+        page = select(matches)
+        if after is not None:
+            after_rank, after_id = after
+            page = page.where(
+                or_(matches.c.rank < after_rank, and_(matches.c.rank == after_rank, matches.c.id > after_id))
+            )
+        page = page.order_by(matches.c.rank.desc(), matches.c.id).limit(limit).subquery("page")
+
+        stmt = (
+            select(
+                Theory.id,
+                Theory.title,
+                Theory.difficulty_level,
+                Theory.order_index,
+                Theory.skill_id,
+                Theory.parent_id,
+                page.c.rank,
+                func.ts_headline(SEARCH_CONFIG, Theory.content, query, SNIPPET_OPTIONS).label("snippet"),
+            )
+            .join(page, page.c.id == Theory.id)
+            .order_by(page.c.rank.desc(), page.c.id)
+        )
+        res = await db.execute(stmt)
+        return res.all()
+
+    @staticmethod
+    def _in_subtree_of(root) -> ColumnElement[bool]:
+        # потомки root (и он сам) — пути с префиксом root.path: диапазон по ix_theory_path
+        return and_(Theory.path >= root.path, Theory.path < root.path + "~")
+
+
 theory_repo = TheoryRepository()
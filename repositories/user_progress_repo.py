@@ -1,19 +1,213 @@
-from typing import Optional, Sequence
+from typing import List, Optional, Sequence, AsyncIterator, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import and_, select, delete, update, func, literal, values, column, Integer, Row, Table
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
 
-from models.models import UserProgress
+from core.config import settings
+from models.models import (
+    Skill,
+    Theory,
+    UserProgress,
+    profession_skill,
+    skill_theory_count,
+    user_completed_quests,
+    user_completed_theories,
+    user_selected_professions,
+    user_skill_progress,
+)
+from repositories.load_profiles import LIST, load_options
 
 
 class UserProgressRepository:
-    async def find_all(self, db: AsyncSession) -> Sequence[UserProgress]:
-        res = await db.execute(select(UserProgress).order_by(UserProgress.id))
+    async def find_all(
+        self,
+        db: AsyncSession,
+        profile: str = LIST,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Sequence[UserProgress]:
+        stmt = select(UserProgress).options(*load_options(UserProgress, profile)).order_by(UserProgress.id)
+        if after_id is not None:
+            stmt = stmt.where(UserProgress.id > after_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        res = await db.execute(stmt)
         return res.scalars().all()
 
-    async def find_by_id(self, db: AsyncSession, id_: int) -> Optional[UserProgress]:
-        res = await db.execute(select(UserProgress).where(UserProgress.id == id_))
+    async def stream_all(
+        self, db: AsyncSession, after_id: Optional[int] = None
+    ) -> AsyncIterator[UserProgress]:
+        # Серверный курсор: строки приходят пачками по stream_batch_size
+        stmt = (
+            select(UserProgress)
+            .order_by(UserProgress.id)
+            .execution_options(yield_per=settings.stream_batch_size)
+        )
+        if after_id is not None:
+            stmt = stmt.where(UserProgress.id > after_id)
+        res = await db.stream(stmt)
+        async for obj in res.scalars():
+            yield obj
+
+    async def find_by_id(
+        self, db: AsyncSession, id_: int, profile: str = LIST
+    ) -> Optional[UserProgress]:
+        res = await db.execute(
+            select(UserProgress).options(*load_options(UserProgress, profile)).where(UserProgress.id == id_)
+        )
         return res.scalar_one_or_none()
 
+    async def find_row_with_ids(self, db: AsyncSession, id_: int) -> Optional[Row]:
+        """
+        Прогресс и отсортированные списки id из таблиц связей одним запросом:
+        ARRAY(SELECT item_id ... ORDER BY item_id) по первичному ключу секции пользователя,
+        без загрузки Theory/Quest/Profession. Строка с полями UserProgressOut или None.
+        """
+
+        def ids(junction: Table, item_column: str):
+            item_id = junction.c[item_column]
+            return func.array(
+                select(item_id)
+                .where(junction.c.user_progress_id == UserProgress.id)
+                .order_by(item_id)
+                .scalar_subquery()
+            )
+
+        stmt = select(
+            UserProgress.id,
+            UserProgress.user_name,
+            UserProgress.total_experience_points,
+            UserProgress.total_gold_points,
+            ids(user_completed_theories, "theory_id").label("completed_theories"),
+            ids(user_completed_quests, "quest_id").label("completed_quests"),
+            ids(user_selected_professions, "profession_id").label("selected_professions"),
+        ).where(UserProgress.id == id_)
+        res = await db.execute(stmt)
+        return res.one_or_none()
+
+    async def add_items(
+        self,
+        db: AsyncSession,
+        up_id: int,
+        junction: Table,
+        item_column: str,
+        items: List[Tuple[int, int, int]],
+    ) -> Optional[Row]:
+        """
+        Добавляет элементы (item_id, опыт, золото) в таблицу связей прогресса и
+        начисляет очки только за реально добавленные — одним запросом:
+
+            WITH input AS (VALUES ...),
+                 added AS (INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING item_id),
+                 progress AS (UPDATE user_progress SET total_* = total_* + sum по added ... RETURNING ...)
+            SELECT totals, (SELECT array_agg(item_id) FROM added)
+
+        Коллекции прогресса не загружаются; повторная отметка ничего не меняет.
+        Строка (total_experience_points, total_gold_points, added) или None, если прогресса нет.
+        """
+        item_id = junction.c[item_column]
+        inp = (
+            select(
+                values(
+                    column("item_id", Integer),
+                    column("xp", Integer),
+                    column("gold", Integer),
+                    name="input_values",
+                ).data(items)
+            ).cte("input")
+        )
+        added = (
+            pg_insert(junction)
+            .from_select(["user_progress_id", item_column], select(literal(up_id), inp.c.item_id))
+            .on_conflict_do_nothing()
+            .returning(item_id.label("item_id"))
+            .cte("added")
+        )
+        gained = (
+            select(
+                func.coalesce(func.sum(inp.c.xp), 0).label("xp"),
+                func.coalesce(func.sum(inp.c.gold), 0).label("gold"),
+            )
+            .join_from(added, inp, added.c.item_id == inp.c.item_id)
+            .cte("gained")
+        )
+        progress = (
+            update(UserProgress)
+            .where(UserProgress.id == up_id)
+            .values(
+                total_experience_points=UserProgress.total_experience_points
+                + select(gained.c.xp).scalar_subquery(),
+                total_gold_points=UserProgress.total_gold_points + select(gained.c.gold).scalar_subquery(),
+            )
+            .returning(UserProgress.total_experience_points, UserProgress.total_gold_points)
+            .cte("progress")
+        )
+        stmt = select(
+            progress.c.total_experience_points,
+            progress.c.total_gold_points,
+            select(func.array_agg(added.c.item_id)).scalar_subquery().label("added"),
+        )
+        res = await db.execute(stmt)
+        return res.one_or_none()
+
+    # -------- Сводки прогресса (счётчики ведут триггеры, см. models.skill_theory_count) --------
+
+    async def skill_summary_rows(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        skill_ids: Optional[List[int]] = None,
+        profession_id: Optional[int] = None,
+    ) -> Sequence[Row]:
+        """
+        (skill_id, total, completed) для скиллов из skill_ids или скиллов профессии —
+        по строке счётчика на скилл, без обхода теорий и отметок.
+        """
+        stmt = (
+            select(
+                Skill.id.label("skill_id"),
+                func.coalesce(skill_theory_count.c.theory_count, 0).label("total"),
+                func.coalesce(user_skill_progress.c.completed_count, 0).label("completed"),
+            )
+            .outerjoin(skill_theory_count, skill_theory_count.c.skill_id == Skill.id)
+            .outerjoin(
+                user_skill_progress,
+                (user_skill_progress.c.skill_id == Skill.id)
+                & (user_skill_progress.c.user_progress_id == user_id),
+            )
+            .order_by(Skill.id)
+        )
+        if skill_ids is not None:
+            stmt = stmt.where(Skill.id.in_(skill_ids))
+        if profession_id is not None:
+            stmt = stmt.join(profession_skill, profession_skill.c.skill_id == Skill.id).where(
+                profession_skill.c.profession_id == profession_id
+            )
+        res = await db.execute(stmt)
+        return res.all()
+
+    async def theory_subtree_summary(self, db: AsyncSession, user_id: int, theory_id: int) -> Row:
+        """
+        (total, completed) по поддереву теории (включая её саму): потомки — диапазон
+        материализованного пути по ix_theory_path, отметки — точечные проверки по первичному
+        ключу секции пользователя. Для несуществующей теории total = 0.
+        """
+        root = aliased(Theory, name="root")
+        uct = user_completed_theories
+        stmt = (
+            select(
+                func.count().label("total"),
+                func.count(uct.c.theory_id).label("completed"),
+            )
+            .select_from(Theory)
+            .join(root, and_(Theory.path >= root.path, Theory.path < root.path + "~"))
+            .outerjoin(uct, (uct.c.theory_id == Theory.id) & (uct.c.user_progress_id == user_id))
+            .where(root.id == theory_id)
+        )
+        res = await db.execute(stmt)
+        return res.one()
+
     async def save(self, db: AsyncSession, obj: UserProgress) -> UserProgress:
         db.add(obj)
         await db.flush()
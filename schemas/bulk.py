@@ -0,0 +1,189 @@
+# schemas/bulk.py
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
+from pydantic import BaseModel, Field
+
+from schemas.quest import QuestRewards
+
+
+# --- входные записи массового импорта (одна запись = один элемент массива / строка NDJSON) ---
+
+class TheoryImport(BaseModel):
+    title: str = Field(..., min_length=1, max_length=255)
+    content: str = Field(..., min_length=1)
+    difficultyLevel: int = 0
+    # None — порядок берётся из позиции в списке соседей
+    orderIndex: Optional[int] = None
+    subTheories: List["TheoryImport"] = Field(default_factory=list)
+
+
+TheoryImport.model_rebuild()
+
+
+class SkillTreeImport(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    icon: str = Field(..., min_length=1, max_length=255)
+    theories: List[TheoryImport] = Field(default_factory=list)
+
+
+class SkillImport(SkillTreeImport):
+    # привязка к уже существующим профессиям
+    professionIds: List[int] = Field(default_factory=list)
+
+
+class ProfessionImport(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    icon: str = Field(..., min_length=1, max_length=255)
+    skills: List[SkillTreeImport] = Field(default_factory=list)
+
+
+class QuestImport(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=255)
+    description: Optional[str] = None
+    preview: Optional[str] = Field(None, max_length=255)
+    # привязка к уже существующим теориям
+    theoryIds: List[int] = Field(default_factory=list)
+
+
+# --- результат импорта ---
+
+class RowError(BaseModel):
+    index: int  # номер записи во входных данных (с 0)
+    line: Optional[int] = None  # номер строки для NDJSON (с 1)
+    loc: str
+    message: str
+
+
+class ImportCounts(BaseModel):
+    professions: int = 0
+    skills: int = 0
+    theories: int = 0
+    quests: int = 0
+    scenarios: int = 0
+
+
+class ImportResult(BaseModel):
+    created: ImportCounts = Field(default_factory=ImportCounts)
+    # id созданных записей верхнего уровня — в порядке входных записей
+    ids: List[int] = Field(default_factory=list)
+    # пропущенные записи (только при skipInvalid=true)
+    errors: List[RowError] = Field(default_factory=list)
+
+
+# --- плоские записи выгрузки каталога (GET /api/export/catalog -> POST /api/import/catalog) ---
+# id — исходные id выгрузки; при импорте создаются новые строки, ссылки переназначаются.
+# Порядок записей: профессии, скиллы, связи, теории (родитель раньше детей), квесты, связи, сценарии.
+
+class ProfessionRecord(BaseModel):
+    type: Literal["profession"]
+    id: int
+    name: str = Field(..., min_length=1, max_length=255)
+    icon: str = Field(..., min_length=1, max_length=255)
+
+
+class SkillRecord(BaseModel):
+    type: Literal["skill"]
+    id: int
+    name: str = Field(..., min_length=1, max_length=255)
+    icon: str = Field(..., min_length=1, max_length=255)
+
+
+class ProfessionSkillRecord(BaseModel):
+    type: Literal["professionSkill"]
+    professionId: int
+    skillId: int
+
+
+class TheoryRecord(BaseModel):
+    type: Literal["theory"]
+    id: int
+    skillId: Optional[int] = None
+    parentId: Optional[int] = None
+    title: str = Field(..., min_length=1, max_length=255)
+    content: str = Field(..., min_length=1)
+    difficultyLevel: int = 0
+    orderIndex: int = 0
+
+
+class QuestRecord(BaseModel):
+    type: Literal["quest"]
+    id: int
+    name: Optional[str] = Field(None, min_length=1, max_length=255)
+    description: Optional[str] = None
+    preview: Optional[str] = Field(None, max_length=255)
+
+
+class TheoryQuestRecord(BaseModel):
+    type: Literal["theoryQuest"]
+    questId: int
+    theoryId: int
+
+
+class QuestScenarioRecord(BaseModel):
+    type: Literal["questScenario"]
+    questId: int
+    scenario: Optional[Dict[str, Any]] = None
+    rewards: Optional[QuestRewards] = None
+
+
+CatalogRecord = Annotated[
+    Union[
+        ProfessionRecord,
+        SkillRecord,
+        ProfessionSkillRecord,
+        TheoryRecord,
+        QuestRecord,
+        TheoryQuestRecord,
+        QuestScenarioRecord,
+    ],
+    Field(discriminator="type"),
+]
+
+
+# --- быстрые проекции строк в записи выгрузки без валидации ---
+
+def profession_record(row) -> dict:
+    return {"type": "profession", "id": row.id, "name": row.name, "icon": row.icon}
+
+
+def skill_record(row) -> dict:
+    return {"type": "skill", "id": row.id, "name": row.name, "icon": row.icon}
+
+
+def profession_skill_record(row) -> dict:
+    return {"type": "professionSkill", "professionId": row.profession_id, "skillId": row.skill_id}
+
+
+def theory_record(row) -> dict:
+    return {
+        "type": "theory",
+        "id": row.id,
+        "skillId": row.skill_id,
+        "parentId": row.parent_id,
+        "title": row.title,
+        "content": row.content,
+        "difficultyLevel": row.difficulty_level,
+        "orderIndex": row.order_index,
+    }
+
+
+def quest_record(row) -> dict:
+    return {
+        "type": "quest",
+        "id": row.id,
+        "name": row.name,
+        "description": row.description,
+        "preview": row.preview,
+    }
+
+
+def theory_quest_record(row) -> dict:
+    return {"type": "theoryQuest", "questId": row.quest_id, "theoryId": row.theory_id}
+
+
+def quest_scenario_record(doc: dict) -> dict:
+    return {
+        "type": "questScenario",
+        "questId": doc["quest_id"],
+        "scenario": doc.get("scenario"),
+        "rewards": doc.get("rewards"),
+    }
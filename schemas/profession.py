@@ -22,3 +22,9 @@ class ProfessionOut(ProfessionBase):
 
     class Config:
         from_attributes = True  # pydantic v2: ORM mode
+
+
+# --- быстрая проекция строки в JSON-ответ ProfessionOut без валидации ---
+
+def profession_payload(row) -> dict:
+    return {"name": row.name, "icon": row.icon, "id": row.id}
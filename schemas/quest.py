@@ -1,6 +1,6 @@
 # schemas/quest.py
 from typing import Optional, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class QuestBase(BaseModel):
     name: Optional[str] = None
@@ -16,4 +16,23 @@ class QuestOut(QuestBase):
         from_attributes = True
 
 class QuestDetailedOut(QuestOut):
-    scenario: Optional[Dict[str, Any]] = None
\ No newline at end of file
+    scenario: Optional[Dict[str, Any]] = None
+
+
+class QuestRewards(BaseModel):
+    # поле rewards документа quest_meta: очки за квест и за каждую пройденную теорию квеста
+    experiencePoints: int = Field(0, ge=0)
+    goldPoints: int = Field(0, ge=0)
+    theoryExperiencePoints: int = Field(0, ge=0)
+    theoryGoldPoints: int = Field(0, ge=0)
+
+
+# --- быстрая проекция строки в JSON-ответ QuestOut без валидации ---
+
+def quest_payload(row) -> dict:
+    return {
+        "name": row.name,
+        "description": row.description,
+        "preview": row.preview,
+        "id": row.id,
+    }
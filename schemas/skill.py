@@ -22,3 +22,9 @@ class SkillOut(SkillBase):
 
     class Config:
         from_attributes = True
+
+
+# --- быстрая проекция строки в JSON-ответ SkillOut без валидации ---
+
+def skill_payload(row) -> dict:
+    return {"name": row.name, "icon": row.icon, "id": row.id}
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Literal, Optional, List
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -19,4 +19,90 @@ class TheoryOut(TheoryBase):
     subTheories: List["TheoryOut"] = Field(default_factory=list)
     model_config = ConfigDict(from_attributes=True)
 
-TheoryOut.model_rebuild()
\ No newline at end of file
+TheoryOut.model_rebuild()
+
+# full — TheoryOut с content; summary — TheorySummaryOut (дерево/списки для навигации, без тел)
+TheoryFields = Literal["full", "summary"]
+
+
+class TheorySummaryOut(BaseModel):
+    title: str
+    difficultyLevel: int = 0
+    orderIndex: int = 0
+    skill: Optional[int] = None
+    parent: Optional[int] = None
+    id: int
+    subTheories: List["TheorySummaryOut"] = Field(default_factory=list)
+
+TheorySummaryOut.model_rebuild()
+
+
+class TheorySearchHitOut(BaseModel):
+    id: int
+    title: str
+    difficultyLevel: int
+    orderIndex: int
+    skill: Optional[int]
+    parent: Optional[int]
+    rank: float
+    snippet: str
+
+
+# --- быстрые проекции строк (Row/ORM с теми же атрибутами) в JSON-ответ TheoryOut без валидации ---
+
+def theory_payload(row) -> dict:
+    return {
+        "title": row.title,
+        "content": row.content,
+        "difficultyLevel": row.difficulty_level,
+        "orderIndex": row.order_index,
+        "skill": row.skill_id,
+        "parent": row.parent_id,
+        "id": row.id,
+        "subTheories": [],
+    }
+
+
+def theory_summary_payload(row) -> dict:
+    return {
+        "title": row.title,
+        "difficultyLevel": row.difficulty_level,
+        "orderIndex": row.order_index,
+        "skill": row.skill_id,
+        "parent": row.parent_id,
+        "id": row.id,
+        "subTheories": [],
+    }
+
+
+THEORY_FIELD_PAYLOADS = {"full": theory_payload, "summary": theory_summary_payload}
+
+
+def theory_tree_payload(rows, payload=theory_payload) -> list:
+    """
+    Сборка дерева за O(n) из строк с depth, отсортированных по (depth, order_index):
+    родитель всегда уже в индексе, дети добавляются в нужном порядке. Возвращает корни (depth = 0).
+    """
+    roots: list = []
+    node_index: dict = {}
+    for row in rows:
+        node = payload(row)
+        node_index[row.id] = node
+        if row.depth == 0:
+            roots.append(node)
+        else:
+            node_index[row.parent_id]["subTheories"].append(node)
+    return roots
+
+
+def theory_search_payload(row) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "difficultyLevel": row.difficulty_level,
+        "orderIndex": row.order_index,
+        "skill": row.skill_id,
+        "parent": row.parent_id,
+        "rank": row.rank,
+        "snippet": row.snippet,
+    }
@@ -1,5 +1,5 @@
-from typing import List
-from pydantic import BaseModel, field_serializer, Field
+from typing import List, Literal, Sequence, Tuple, Union
+from pydantic import BaseModel, Field
 
 
 class UserProgressOut(BaseModel):
@@ -15,19 +15,104 @@ class UserProgressOut(BaseModel):
     class Config:
         from_attributes = True  # ORM mode (Pydantic v2)
 
-    # --- сериализаторы: ORM-объекты -> списки id ---
 
-    @field_serializer("completed_theories")
-    def _ser_completed_theories(self, value):
-        # value приходит как list[Theory] из ORM; вернём list[int]
-        return [t.id for t in (value or [])]
+# --- компактные списки id для длинной истории (?encoding=) ---
+#   ids    — как есть: [3, 4, 5, 9]
+#   delta  — разности отсортированных id: [3, 1, 1, 4]
+#   ranges — отрезки подряд идущих id: [[3, 5], [9, 9]]
 
-    @field_serializer("completed_quests")
-    def _ser_completed_quests(self, value):
-        # value: list[Quest] -> list[int]
-        return [q.id for q in (value or [])]
+IdEncoding = Literal["ids", "delta", "ranges"]
 
-    @field_serializer("selected_professions")
-    def _ser_selected_professions(self, value):
-        # value: list[Profession] -> list[int]
-        return [p.id for p in (value or [])]
+
+class UserProgressCompactOut(BaseModel):
+    id: int
+    userName: str
+    totalExperiencePoints: int
+    totalGoldPoints: int
+    encoding: Literal["delta", "ranges"]
+    completedTheories: Union[List[int], List[Tuple[int, int]]]
+    completedQuests: Union[List[int], List[Tuple[int, int]]]
+    selectedProfessions: Union[List[int], List[Tuple[int, int]]]
+
+
+def delta_encode(ids: Sequence[int]) -> List[int]:
+    out, prev = [], 0
+    for id_ in ids:
+        out.append(id_ - prev)
+        prev = id_
+    return out
+
+
+def range_encode(ids: Sequence[int]) -> List[List[int]]:
+    out: List[List[int]] = []
+    for id_ in ids:
+        if out and out[-1][1] + 1 == id_:
+            out[-1][1] = id_
+        else:
+            out.append([id_, id_])
+    return out
+
+
+_ENCODERS = {"ids": list, "delta": delta_encode, "ranges": range_encode}
+
+
+def user_progress_payload(row, encoding: IdEncoding = "ids") -> dict:
+    """Строка find_row_with_ids (id уже отсортированы) -> JSON UserProgressOut / UserProgressCompactOut."""
+    encode = _ENCODERS[encoding]
+    payload = {
+        "id": row.id,
+        "userName": row.user_name,
+        "totalExperiencePoints": row.total_experience_points,
+        "totalGoldPoints": row.total_gold_points,
+    }
+    if encoding != "ids":
+        payload["encoding"] = encoding
+    payload["completedTheories"] = encode(row.completed_theories or [])
+    payload["completedQuests"] = encode(row.completed_quests or [])
+    payload["selectedProfessions"] = encode(row.selected_professions or [])
+    return payload
+
+
+# --- инкрементальные изменения прогресса ---
+
+class ProgressItemIn(BaseModel):
+    # очки считает сервер по rewards квестов в quest_meta (services/user_progress_service.py)
+    id: int
+
+
+class CompleteItemsIn(BaseModel):
+    items: List[ProgressItemIn] = Field(..., min_length=1)
+
+
+class SelectProfessionsIn(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+
+
+class ProgressDeltaOut(BaseModel):
+    # id, которых ещё не было в прогрессе (повторы игнорируются и очков не дают)
+    added: List[int] = Field(default_factory=list)
+    totalExperiencePoints: int
+    totalGoldPoints: int
+
+
+# --- сводки прогресса ---
+
+class ProgressSummaryOut(BaseModel):
+    total: int
+    completed: int
+    # доля пройденного, 0..100 с одним знаком после запятой
+    percent: float
+
+
+class SkillProgressOut(ProgressSummaryOut):
+    skillId: int
+
+
+class ProfessionProgressOut(ProgressSummaryOut):
+    professionId: int
+    skills: List[SkillProgressOut] = Field(default_factory=list)
+
+
+class TheoryProgressOut(ProgressSummaryOut):
+    # total/completed — по всему поддереву, включая саму теорию
+    theoryId: int
@@ -0,0 +1,232 @@
+# services/catalog_snapshot.py
+import asyncio
+import hashlib
+import logging
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy import Row
+
+from core.config import settings
+from db.session import AsyncSessionLocal
+from repositories.profession_repo import profession_repo
+from repositories.skill_repo import skill_repo
+from repositories.theory_repo import THEORY_SUMMARY_COLUMNS, theory_repo
+from schemas.profession import profession_payload
+from schemas.skill import skill_payload
+from schemas.theory import theory_summary_payload, theory_tree_payload
+from services.versions import catalog_versions, PROFESSIONS, SKILLS, THEORIES
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_RESOURCES = (PROFESSIONS, SKILLS, THEORIES)
+
+
+def _page(ids: Sequence[int], items: Sequence[dict], after_id: Optional[int], limit: Optional[int]) -> List[dict]:
+    # keyset по отсортированным id — те же страницы, что WHERE id > after_id ORDER BY id LIMIT limit
+    start = bisect_right(ids, after_id) if after_id is not None else 0
+    end = start + limit if limit is not None else None
+    return list(items[start:end])
+
+
+def _generation(*parts: Sequence[Row]) -> int:
+    # хэш прочитанных строк: одни и те же данные дают одно поколение во всех процессах
+    digest = hashlib.blake2b(digest_size=6)  # 48 бит — точно представимы во float метрик
+    for rows in parts:
+        digest.update(orjson.dumps([tuple(row) for row in rows]))
+    return int.from_bytes(digest.digest(), "big")
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Неизменяемый снимок каталога для чтения без Postgres: профессии, скиллы, связи
+    профессия↔скилл и деревья теорий скиллов без content.
+
+    Списки — готовые JSON-словари (*_payload) по возрастанию id; их не изменяют,
+    отдаются только копии списков. Деревья теорий собираются на запрос из строк,
+    как у TheoryRepository.find_tree_rows_by_skill.
+
+    generation — хэш содержимого: входит в ETag ответов из снимка (api.conditional),
+    поэтому он меняется с данными, даже изменёнными в обход catalog_version.
+    """
+
+    generation: int
+    built_at: float  # time.monotonic() начала чтения из БД
+    versions: Tuple[int, ...]  # версии SNAPSHOT_RESOURCES, с которыми начиналась сборка
+    profession_ids: Tuple[int, ...]
+    professions: Tuple[dict, ...]
+    skill_ids: Tuple[int, ...]
+    skills: Tuple[dict, ...]
+    profession_skills: Mapping[int, Tuple[dict, ...]]  # есть у каждой профессии, в т.ч. без скиллов
+    skill_theories: Mapping[int, Tuple[Row, ...]]  # есть у каждого скилла; строки по (depth, order_index, id)
+
+    def find_professions(self, after_id: Optional[int] = None, limit: Optional[int] = None) -> List[dict]:
+        return _page(self.profession_ids, self.professions, after_id, limit)
+
+    def find_skills(self, after_id: Optional[int] = None, limit: Optional[int] = None) -> List[dict]:
+        return _page(self.skill_ids, self.skills, after_id, limit)
+
+    def get_skills_by_profession(self, profession_id: int) -> Optional[List[dict]]:
+        """Скиллы профессии по возрастанию id; None — профессии нет."""
+        skills = self.profession_skills.get(profession_id)
+        return None if skills is None else list(skills)
+
+    def has_skill(self, skill_id: int) -> bool:
+        return skill_id in self.skill_theories
+
+    def get_theory_tree(self, skill_id: int, max_depth: Optional[int] = None) -> Optional[list]:
+        """Дерево теорий скилла в формате TheorySummaryOut; None — скилла нет."""
+        rows = self.skill_theories.get(skill_id)
+        if rows is None:
+            return None
+        if max_depth is not None:
+            # строки отсортированы по depth — отрезаем хвост глубже max_depth
+            rows = rows[: bisect_right([row.depth for row in rows], max_depth)]
+        return theory_tree_payload(rows, theory_summary_payload)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "generation": self.generation,
+            "age_s": round(time.monotonic() - self.built_at, 3),
+            "professions": len(self.professions),
+            "skills": len(self.skills),
+            "theories": sum(len(rows) for rows in self.skill_theories.values()),
+        }
+
+
+class CatalogSnapshotStore:
+    """
+    Держит текущий CatalogSnapshot и подменяет его целиком (одно присваивание ссылки):
+    читатели всегда видят согласованный снимок, без блокировок.
+
+    Снимок устаревает, когда:
+    - каталог изменился (catalog_versions.bump в транзакции изменения; изменения других
+      процессов видны через APP_CATALOG_VERSIONS_TTL_S) — версии снимка отстают;
+      пересборка — при первом чтении после изменения,
+      так что серия изменений даёт одну пересборку, а запись её не ждёт;
+    - он старше max_staleness_s — страховка для изменений в обход catalog_version
+      (ручной SQL; 0 — без лимита). Новое содержимое меняет generation, а с ним ETag
+      и записи кэша готовых ответов: клиенты видят его сразу после пересборки.
+
+    Пересборка single-flight: одновременные читатели ждут одну загрузку. Если каталог
+    изменился во время загрузки, снимок получает версии начала сборки и следующий читатель
+    запускает новую; более старая сборка, закончившая позже, не заменяет более новую.
+    """
+
+    def __init__(self, max_staleness_s: float):
+        self.max_staleness_s = max_staleness_s
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._building: Optional[asyncio.Task] = None
+        self._building_versions: Optional[Tuple[int, ...]] = None
+        self.hits = 0
+        self.rebuilds = 0
+        self.coalesced = 0  # устаревшие чтения, присоединившиеся к уже идущей сборке
+        self.failures = 0
+        self.last_build_s = 0.0
+
+    @property
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    def is_fresh(self, snapshot: CatalogSnapshot) -> bool:
+        if snapshot.versions != self._current_versions():
+            return False
+        return not self.max_staleness_s or time.monotonic() - snapshot.built_at < self.max_staleness_s
+
+    async def get(self) -> CatalogSnapshot:
+        await catalog_versions.refresh()
+        snapshot = self._snapshot
+        if snapshot is not None and self.is_fresh(snapshot):
+            self.hits += 1
+            return snapshot
+        return await self.refresh()
+
+    async def refresh(self) -> CatalogSnapshot:
+        """Пересобирает снимок (или присоединяется к идущей сборке с теми же версиями)."""
+        versions = self._current_versions()
+        task = self._building
+        if task is not None and self._building_versions == versions:
+            self.coalesced += 1
+        else:
+            # отдельная задача: отмена одного ожидающего запроса не прерывает сборку
+            task = asyncio.ensure_future(self._build(versions))
+            self._building, self._building_versions = task, versions
+            task.add_done_callback(self._on_built)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        current = self._snapshot.stats() if self._snapshot is not None else {}
+        return {
+            **current,
+            "hits": self.hits,
+            "rebuilds": self.rebuilds,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "last_build_ms": round(self.last_build_s * 1000, 1),
+        }
+
+    # -------- Helpers --------
+
+    def _current_versions(self) -> Tuple[int, ...]:
+        return tuple(catalog_versions.get(resource) for resource in SNAPSHOT_RESOURCES)
+
+    def _on_built(self, task: asyncio.Task) -> None:
+        if self._building is task:
+            self._building = self._building_versions = None
+        if task.cancelled() or task.exception() is not None:
+            self.failures += 1
+            logger.warning("Catalog snapshot rebuild failed: %r", None if task.cancelled() else task.exception())
+
+    async def _build(self, versions: Tuple[int, ...]) -> CatalogSnapshot:
+        started = time.perf_counter()
+        built_at = time.monotonic()
+        async with AsyncSessionLocal() as db:
+            if db.bind.dialect.name == "postgresql":
+                # один снимок на все таблицы: связи и деревья ссылаются только на прочитанные строки
+                await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            professions = await profession_repo.find_all_rows(db)
+            skills = await skill_repo.find_all_rows(db)
+            links = [row async for row in skill_repo.stream_profession_links(db)]
+            theories = [row async for row in theory_repo.stream_forest_rows(db, THEORY_SUMMARY_COLUMNS)]
+
+        skill_index = {row.id: skill_payload(row) for row in skills}
+        profession_skills: Dict[int, List[dict]] = {row.id: [] for row in professions}
+        for link in links:  # по (profession_id, skill_id) — скиллы профессии уже по возрастанию id
+            profession_skills[link.profession_id].append(skill_index[link.skill_id])
+
+        # строки по depth: корень скилла раньше потомков, потомок наследует скилл корня
+        skill_theories: Dict[int, List[Row]] = {row.id: [] for row in skills}
+        owner: Dict[int, Optional[int]] = {}
+        for row in theories:
+            skill_id = row.skill_id if row.depth == 0 else owner[row.parent_id]
+            owner[row.id] = skill_id
+            if skill_id in skill_theories:  # корни без скилла ни в одно дерево не входят
+                skill_theories[skill_id].append(row)
+
+        current = self._snapshot
+        if current is not None and current.built_at > built_at:
+            return current  # пока шла загрузка, подменили снимком, начатым позже
+        # между проверкой и присваиванием нет await — подмена атомарна для остальных задач
+        snapshot = CatalogSnapshot(
+            generation=_generation(professions, skills, links, theories),
+            built_at=built_at,
+            versions=versions,
+            profession_ids=tuple(row.id for row in professions),
+            professions=tuple(profession_payload(row) for row in professions),
+            skill_ids=tuple(skill_index),
+            skills=tuple(skill_index.values()),
+            profession_skills=MappingProxyType({k: tuple(v) for k, v in profession_skills.items()}),
+            skill_theories=MappingProxyType({k: tuple(v) for k, v in skill_theories.items()}),
+        )
+        self._snapshot = snapshot
+        self.rebuilds += 1
+        self.last_build_s = time.perf_counter() - started
+        return snapshot
+
+
+catalog_snapshot = CatalogSnapshotStore(settings.catalog_snapshot_max_staleness_s)
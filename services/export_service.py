@@ -0,0 +1,95 @@
+# services/export_service.py
+from typing import AsyncIterator, Optional
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from repositories.profession_repo import profession_repo
+from repositories.quest_repo import quest_repo
+from repositories.skill_repo import skill_repo
+from repositories.theory_repo import theory_repo
+from schemas.bulk import (
+    profession_record,
+    profession_skill_record,
+    quest_record,
+    quest_scenario_record,
+    skill_record,
+    theory_quest_record,
+    theory_record,
+)
+
+# Записи копятся в буфер и уходят клиенту кусками примерно такого размера
+_CHUNK_BYTES = 64 * 1024
+
+
+def _dumps(record: dict) -> bytes:
+    # default=str — BSON-типы из сценариев (ObjectId, Decimal128), которых нет в JSON
+    return orjson.dumps(record, default=str)
+
+
+async def encode_ndjson(records: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    buf = bytearray()
+    async for record in records:
+        buf += _dumps(record)
+        buf += b"\n"
+        if len(buf) >= _CHUNK_BYTES:
+            yield bytes(buf)
+            buf.clear()
+    if buf:
+        yield bytes(buf)
+
+
+async def encode_json_array(records: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    buf = bytearray(b"[")
+    first = True
+    async for record in records:
+        if not first:
+            buf += b","
+        first = False
+        buf += _dumps(record)
+        if len(buf) >= _CHUNK_BYTES:
+            yield bytes(buf)
+            buf.clear()
+    buf += b"]"
+    yield bytes(buf)
+
+
+class ExportService:
+    async def stream_catalog(self, db: AsyncSession, mongo_db: Optional[object] = None) -> AsyncIterator[dict]:
+        """
+        Весь каталог плоскими записями (формат POST /api/import/catalog):
+        профессии, скиллы, связи, теории (родитель раньше детей), квесты, связи,
+        сценарии и награды из quest_meta. Postgres читается серверными курсорами (yield_per),
+        Mongo — курсором пачками по stream_batch_size: память не зависит от размера каталога.
+        mongo_db=None — без сценариев.
+        """
+        if db.bind.dialect.name == "postgresql":
+            # один снимок на все таблицы: связи ссылаются только на выгруженные строки
+            await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        async for row in profession_repo.stream_all(db):
+            yield profession_record(row)
+        async for row in skill_repo.stream_all(db):
+            yield skill_record(row)
+        async for row in skill_repo.stream_profession_links(db):
+            yield profession_skill_record(row)
+        async for row in theory_repo.stream_forest_rows(db):
+            yield theory_record(row)
+        async for row in quest_repo.stream_all(db):
+            yield quest_record(row)
+        async for row in quest_repo.stream_theory_links(db):
+            yield theory_quest_record(row)
+
+        if mongo_db is not None:
+            cursor = (
+                mongo_db["quest_meta"]
+                .find({}, {"_id": 0, "quest_id": 1, "scenario": 1, "rewards": 1})
+                .sort("quest_id", 1)
+                .batch_size(settings.stream_batch_size)
+            )
+            async for doc in cursor:
+                yield quest_scenario_record(doc)
+
+
+export_service = ExportService()
@@ -0,0 +1,303 @@
+# services/import_service.py
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from pymongo import UpdateOne
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from repositories.profession_repo import profession_repo
+from repositories.quest_repo import quest_repo
+from repositories.skill_repo import skill_repo
+from repositories.theory_repo import theory_repo
+from schemas.bulk import (
+    CatalogRecord,
+    ImportResult,
+    ProfessionImport,
+    QuestImport,
+    RowError,
+    SkillImport,
+    SkillTreeImport,
+    TheoryImport,
+)
+from services.exceptions import NotFoundError
+from services.quest_service import quest_scenario_cache
+from services.skill_service import skill_service
+from services.versions import catalog_versions, PROFESSIONS, SKILLS, THEORIES, QUESTS
+
+# (skill_id, parent_id, узел, order_index) — одна строка очередного уровня дерева теорий
+_TheoryNode = Tuple[int, Optional[int], TheoryImport, int]
+
+
+@lru_cache
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def parse_records(body: bytes, ndjson: bool, schema: Any) -> Tuple[List[Any], List[RowError]]:
+    """
+    Разбирает JSON-массив или NDJSON (одна запись на строку) и валидирует каждую
+    запись отдельно. Возвращает валидные записи и ошибки по невалидным.
+    ValueError — тело целиком не является JSON-массивом.
+    """
+    adapter = _adapter(schema)
+    errors: List[RowError] = []
+    raw: List[Tuple[int, Optional[int], Any]] = []
+
+    if ndjson:
+        index = 0
+        for line_no, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                raw.append((index, line_no, orjson.loads(line)))
+            except orjson.JSONDecodeError as e:
+                errors.append(RowError(index=index, line=line_no, loc="$", message=str(e)))
+            index += 1
+    else:
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if not isinstance(data, list):
+            raise ValueError("Expected a JSON array of records")
+        raw = [(index, None, record) for index, record in enumerate(data)]
+
+    items: List[Any] = []
+    for index, line_no, record in raw:
+        try:
+            items.append(adapter.validate_python(record))
+        except ValidationError as e:
+            for err in e.errors():
+                loc = ".".join(str(part) for part in err["loc"]) or "$"
+                errors.append(RowError(index=index, line=line_no, loc=loc, message=err["msg"]))
+
+    errors.sort(key=lambda e: e.index)
+    return items, errors
+
+
+class ImportService:
+    """
+    Массовый импорт каталога. Всё дерево пишется в одной транзакции уровнями:
+    профессии -> скиллы (+ связи) -> теории по глубинам -> квесты. На каждый уровень —
+    один многострочный INSERT ... RETURNING id (SQLAlchemy бьёт его на страницы),
+    id родителей сразу подставляются в строки детей.
+    """
+
+    async def import_professions(self, db: AsyncSession, items: List[ProfessionImport]) -> ImportResult:
+        result = ImportResult()
+        profession_ids = await profession_repo.insert_many(
+            db, [{"name": p.name, "icon": p.icon} for p in items]
+        )
+        owners = [(pid, s) for pid, p in zip(profession_ids, items) for s in p.skills]
+        skill_ids = await self._insert_skills(db, [s for _, s in owners], result)
+        await skill_repo.link_professions(db, [(sid, pid) for sid, (pid, _) in zip(skill_ids, owners)])
+
+        await catalog_versions.bump(db, PROFESSIONS, SKILLS, THEORIES)
+        await db.commit()
+        result.created.professions = len(profession_ids)
+        result.ids = profession_ids
+        return result
+
+    async def import_skills(self, db: AsyncSession, items: List[SkillImport]) -> ImportResult:
+        result = ImportResult()
+        skill_ids = await self._insert_skills(db, items, result)
+        links = [(sid, pid) for sid, s in zip(skill_ids, items) for pid in dict.fromkeys(s.professionIds)]
+        await skill_repo.link_professions(db, links)
+
+        await catalog_versions.bump(db, *((PROFESSIONS, SKILLS, THEORIES) if links else (SKILLS, THEORIES)))
+        await db.commit()
+        result.ids = skill_ids
+        return result
+
+    async def import_theories(self, db: AsyncSession, skill_id: int, items: List[TheoryImport]) -> ImportResult:
+        if not await skill_repo.find_by_id(db, skill_id):
+            raise NotFoundError("Skill not found")
+        result = ImportResult()
+        # новые корни встают после уже существующих корней скилла
+        max_idx = await skill_service._max_order_index_among_root_theories(db, skill_id)
+        roots = [
+            (skill_id, None, node, self._order_index(node, i, max_idx)) for i, node in enumerate(items)
+        ]
+        result.ids = await self._insert_theory_levels(db, roots, result)
+
+        await catalog_versions.bump(db, THEORIES)
+        await db.commit()
+        return result
+
+    async def import_quests(self, db: AsyncSession, items: List[QuestImport]) -> ImportResult:
+        result = ImportResult()
+        quest_ids = await quest_repo.insert_many(
+            db, [{"name": q.name, "description": q.description, "preview": q.preview} for q in items]
+        )
+        await quest_repo.link_theories(
+            db, [(qid, tid) for qid, q in zip(quest_ids, items) for tid in dict.fromkeys(q.theoryIds)]
+        )
+
+        await catalog_versions.bump(db, QUESTS)
+        await db.commit()
+        result.created.quests = len(quest_ids)
+        result.ids = quest_ids
+        return result
+
+    async def import_catalog(self, db: AsyncSession, mongo_db, records: List[CatalogRecord]) -> ImportResult:
+        """
+        Импорт плоской выгрузки (GET /api/export/catalog): создаёт новые строки и
+        переназначает ссылки со старых id на новые. Ссылки на записи, которых нет
+        в выгрузке, — ValueError до любой записи в БД; сценарии квестов вне выгрузки
+        пропускаются (Mongo не входит в снимок Postgres). Сценарии пишутся в Mongo
+        до COMMIT: если Mongo недоступен, Postgres-часть откатывается;
+        mongo_db=None (Mongo выключен) и есть записи questScenario — ValueError.
+        """
+        by_type: Dict[str, list] = defaultdict(list)
+        for record in records:
+            by_type[record.type].append(record)
+        self._check_references(by_type)
+        result = ImportResult()
+
+        profession_ids = await self._insert_mapped(
+            db, profession_repo, by_type["profession"], lambda r: {"name": r.name, "icon": r.icon}
+        )
+        skill_ids = await self._insert_mapped(
+            db, skill_repo, by_type["skill"], lambda r: {"name": r.name, "icon": r.icon}
+        )
+        await skill_repo.link_professions(
+            db, [(skill_ids[r.skillId], profession_ids[r.professionId]) for r in by_type["professionSkill"]]
+        )
+
+        # теории — уровнями: в каждый INSERT идут записи, чей родитель уже создан
+        theory_ids: Dict[int, int] = {}
+        pending = by_type["theory"]
+        while pending:
+            ready = [r for r in pending if r.parentId is None or r.parentId in theory_ids]
+            if not ready:
+                raise ValueError("Theory records form a cycle through parentId")
+            rows = [
+                {
+                    "title": r.title,
+                    "content": r.content,
+                    "difficulty_level": r.difficultyLevel,
+                    "order_index": r.orderIndex,
+                    "skill_id": skill_ids[r.skillId] if r.skillId is not None else None,
+                    "parent_id": theory_ids[r.parentId] if r.parentId is not None else None,
+                }
+                for r in ready
+            ]
+            theory_ids.update(zip((r.id for r in ready), await theory_repo.insert_many(db, rows)))
+            pending = [r for r in pending if r.id not in theory_ids]
+
+        quest_ids = await self._insert_mapped(
+            db,
+            quest_repo,
+            by_type["quest"],
+            lambda r: {"name": r.name, "description": r.description, "preview": r.preview},
+        )
+        await quest_repo.link_theories(
+            db, [(quest_ids[r.questId], theory_ids[r.theoryId]) for r in by_type["theoryQuest"]]
+        )
+
+        scenarios = [
+            UpdateOne(
+                {"quest_id": quest_ids[r.questId]},
+                {"$set": {"scenario": r.scenario, "rewards": r.rewards.model_dump() if r.rewards else None}},
+                upsert=True,
+            )
+            for r in by_type["questScenario"]
+            if r.questId in quest_ids
+        ]
+        if scenarios:
+            if mongo_db is None:
+                raise ValueError("questScenario records need Mongo, which is disabled (APP_MONGO_ENABLED=false)")
+            await mongo_db["quest_meta"].bulk_write(scenarios, ordered=False)
+
+        await catalog_versions.bump(db, PROFESSIONS, SKILLS, THEORIES, QUESTS)
+        await db.commit()
+        for quest_id in quest_ids.values():
+            quest_scenario_cache.invalidate(quest_id)
+        result.created.professions = len(profession_ids)
+        result.created.skills = len(skill_ids)
+        result.created.theories = len(theory_ids)
+        result.created.quests = len(quest_ids)
+        result.created.scenarios = len(scenarios)
+        return result
+
+    # -------- Helpers --------
+
+    def _check_references(self, by_type: Dict[str, list]) -> None:
+        known = {kind: {r.id for r in by_type[kind]} for kind in ("profession", "skill", "theory", "quest")}
+        refs = [
+            ("professionSkill", "professionId", "profession"),
+            ("professionSkill", "skillId", "skill"),
+            ("theory", "skillId", "skill"),
+            ("theory", "parentId", "theory"),
+            ("theoryQuest", "questId", "quest"),
+            ("theoryQuest", "theoryId", "theory"),
+        ]
+        for kind, field, target in refs:
+            for record in by_type[kind]:
+                ref = getattr(record, field)
+                if ref is not None and ref not in known[target]:
+                    raise ValueError(f"{kind} record references unknown {target} {field}={ref}")
+
+    async def _insert_mapped(self, db: AsyncSession, repo, records: list, to_row) -> Dict[int, int]:
+        """Вставляет записи одним многострочным INSERT и возвращает {старый id: новый id}."""
+        new_ids = await repo.insert_many(db, [to_row(r) for r in records])
+        return dict(zip((r.id for r in records), new_ids))
+
+    async def _insert_skills(
+        self, db: AsyncSession, skills: List[SkillTreeImport], result: ImportResult
+    ) -> List[int]:
+        skill_ids = await skill_repo.insert_many(db, [{"name": s.name, "icon": s.icon} for s in skills])
+        roots = [
+            (sid, None, node, self._order_index(node, i))
+            for sid, s in zip(skill_ids, skills)
+            for i, node in enumerate(s.theories)
+        ]
+        await self._insert_theory_levels(db, roots, result)
+        result.created.skills += len(skill_ids)
+        return skill_ids
+
+    async def _insert_theory_levels(
+        self, db: AsyncSession, level: List[_TheoryNode], result: ImportResult
+    ) -> List[int]:
+        """Вставляет лес теорий по глубинам: один INSERT на уровень. Возвращает id корней."""
+        root_ids: Optional[List[int]] = None
+        while level:
+            ids = await theory_repo.insert_many(
+                db,
+                [
+                    {
+                        "title": node.title,
+                        "content": node.content,
+                        "difficulty_level": node.difficultyLevel,
+                        "order_index": order_index,
+                        "skill_id": skill_id,
+                        "parent_id": parent_id,
+                    }
+                    for skill_id, parent_id, node, order_index in level
+                ],
+            )
+            result.created.theories += len(ids)
+            if root_ids is None:
+                root_ids = ids
+            level = list(self._children(level, ids))
+        return root_ids or []
+
+    def _children(self, level: List[_TheoryNode], ids: List[int]) -> Iterable[_TheoryNode]:
+        for (skill_id, _, node, _), theory_id in zip(level, ids):
+            for i, child in enumerate(node.subTheories):
+                yield skill_id, theory_id, child, self._order_index(child, i)
+
+    def _order_index(self, node: TheoryImport, position: int, max_idx: Optional[int] = None) -> int:
+        """Явный orderIndex из записи или нумерация соседей по правилам theory_order_mode."""
+        if node.orderIndex is not None:
+            return node.orderIndex
+        step, first = skill_service._order_step()
+        if max_idx is None:
+            return first + position * step
+        return max_idx + (position + 1) * step
+
+
+import_service = ImportService()
@@ -1,44 +1,55 @@
 # services/profession_service.py
-from typing import List
+from typing import AsyncIterator, List, Optional
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from repositories.load_profiles import DETAIL, TREE
 from repositories.profession_repo import profession_repo
 from repositories.skill_repo import skill_repo
-from schemas.profession import ProfessionCreate
-from schemas.skill import SkillCreate
+from schemas.profession import ProfessionCreate, profession_payload
+from schemas.skill import SkillCreate, skill_payload
 from models.models import Profession, Skill
+from services.catalog_snapshot import CatalogSnapshot
 from services.exceptions import NotFoundError
+from services.versions import catalog_versions, PROFESSIONS, SKILLS, THEORIES
 
 
 class ProfessionService:
-    async def find_all(self, db: AsyncSession) -> List[Profession]:
-        return await profession_repo.find_all(db)
-
-    async def get_skills_by_profession(self, db: AsyncSession, profession_id: int) -> List[Skill]:
-        # Явно загружаем skills (в async-режиме избегаем ленивой загрузки)
-        res = await db.execute(
-            select(Profession)
-            .options(selectinload(Profession.skills))
-            .where(Profession.id == profession_id)
-        )
-        profession = res.scalar_one_or_none()
-        if not profession:
+    async def find_all(
+        self,
+        db: AsyncSession,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        snapshot: Optional[CatalogSnapshot] = None,
+    ) -> List[dict]:
+        if snapshot is not None:
+            return snapshot.find_professions(after_id, limit)
+        rows = await profession_repo.find_all_rows(db, after_id=after_id, limit=limit)
+        return [profession_payload(row) for row in rows]
+
+    async def stream_all(self, db: AsyncSession, after_id: Optional[int] = None) -> AsyncIterator[dict]:
+        async for row in profession_repo.stream_all(db, after_id):
+            yield profession_payload(row)
+
+    async def get_skills_by_profession(
+        self, db: AsyncSession, profession_id: int, snapshot: Optional[CatalogSnapshot] = None
+    ) -> List[dict]:
+        if snapshot is not None:
+            skills = snapshot.get_skills_by_profession(profession_id)
+            if skills is None:
+                raise NotFoundError("Profession not found")
+            return skills
+        if not await profession_repo.find_by_id(db, profession_id):
             raise NotFoundError("Profession not found")
-        return profession.skills
+        # Только столбцы скиллов через profession_skill — без загрузки ORM-коллекций
+        rows = await skill_repo.find_rows_by_profession(db, profession_id)
+        return [skill_payload(row) for row in rows]
 
     async def add_new_skill_to_profession(
         self, db: AsyncSession, profession_id: int, payload: SkillCreate
     ) -> Skill:
         # Найдём профессию
-        res = await db.execute(
-            select(Profession)
-            .options(selectinload(Profession.skills))
-            .where(Profession.id == profession_id)
-        )
-        profession = res.scalar_one_or_none()
+        profession = await profession_repo.find_by_id(db, profession_id, DETAIL)
         if not profession:
             raise NotFoundError("Profession not found")
 
@@ -49,6 +60,7 @@ class ProfessionService:
 
         # Сохраняем
         await skill_repo.save(db, skill)
+        await catalog_versions.bump(db, PROFESSIONS, SKILLS)
         await db.commit()
         # обновим объект перед возвратом
         await db.refresh(skill)
@@ -58,12 +70,7 @@ class ProfessionService:
         self, db: AsyncSession, profession_id: int, skill_id: int
     ) -> Skill:
         # Профессию грузим со скиллами
-        res = await db.execute(
-            select(Profession)
-            .options(selectinload(Profession.skills))
-            .where(Profession.id == profession_id)
-        )
-        profession = res.scalar_one_or_none()
+        profession = await profession_repo.find_by_id(db, profession_id, DETAIL)
         if not profession:
             raise NotFoundError(f"Profession with ID {profession_id} not found")
 
@@ -81,6 +88,7 @@ class ProfessionService:
         profession.skills.append(skill)
         # Сохраняем именно профессию — хватит, т.к. это M2M через secondary
         await profession_repo.save(db, profession)
+        await catalog_versions.bump(db, PROFESSIONS)
         await db.commit()
         await db.refresh(skill)
         return skill
@@ -89,22 +97,13 @@ class ProfessionService:
         self, db: AsyncSession, profession_id: int, skill_id: int
     ) -> None:
         # Загрузим профессию с её скиллами
-        res_prof = await db.execute(
-            select(Profession)
-            .options(selectinload(Profession.skills))
-            .where(Profession.id == profession_id)
-        )
-        profession = res_prof.scalar_one_or_none()
+        profession = await profession_repo.find_by_id(db, profession_id, DETAIL)
         if not profession:
             raise NotFoundError("Profession not found")
 
         # Загрузим скилл с его профессиями (чтобы понять, остались ли связи)
-        res_skill = await db.execute(
-            select(Skill)
-            .options(selectinload(Skill.professions))
-            .where(Skill.id == skill_id)
-        )
-        skill = res_skill.scalar_one_or_none()
+        # и деревом теорий (на случай каскадного удаления самого скилла)
+        skill = await skill_repo.find_by_id(db, skill_id, TREE)
         if not skill:
             raise NotFoundError("Skill not found")
 
@@ -122,11 +121,13 @@ class ProfessionService:
         if not skill.professions or len(skill.professions) == 0:
             await skill_repo.delete(db, skill)
 
+        await catalog_versions.bump(db, PROFESSIONS, SKILLS, THEORIES)
         await db.commit()
 
     async def save(self, db: AsyncSession, payload: ProfessionCreate) -> Profession:
         obj = Profession(**payload.model_dump())
         await profession_repo.save(db, obj)
+        await catalog_versions.bump(db, PROFESSIONS)
         await db.commit()
         return obj
 
@@ -134,6 +135,7 @@ class ProfessionService:
         deleted = await profession_repo.delete_by_id(db, id_)
         if not deleted:
             raise NotFoundError(f"Position not found with id: {id_}")
+        await catalog_versions.bump(db, PROFESSIONS)
         await db.commit()
 
 
@@ -1,22 +1,66 @@
 # services/quest_service.py
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import bson
+from pymongo.errors import PyMongoError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import LruTtlCache
+from core.config import settings
 from repositories.quest_repo import quest_repo
-from schemas.quest import QuestCreate
+from schemas.quest import QuestCreate, quest_payload
 from models.models import Quest
 from services.exceptions import NotFoundError
+from services.versions import catalog_versions, QUESTS
+
+logger = logging.getLogger(__name__)
+
+# Сценарии из quest_meta большие и почти не меняются — держим их в памяти процесса
+quest_scenario_cache: LruTtlCache[Optional[Dict[str, Any]]] = LruTtlCache(
+    max_entries=settings.quest_scenario_cache_max_entries,
+    max_bytes=settings.quest_scenario_cache_max_bytes,
+    ttl_s=settings.quest_scenario_cache_ttl_s,
+    sizeof=lambda scenario: len(bson.encode({"scenario": scenario})),
+)
 
 
 class QuestService:
-    async def find_all(self, db: AsyncSession):
-        return await quest_repo.find_all(db)
+    async def find_all(
+        self, db: AsyncSession, after_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> List[dict]:
+        rows = await quest_repo.find_all_rows(db, after_id=after_id, limit=limit)
+        return [quest_payload(row) for row in rows]
+
+    async def stream_all(self, db: AsyncSession, after_id: Optional[int] = None) -> AsyncIterator[dict]:
+        async for row in quest_repo.stream_all(db, after_id):
+            yield quest_payload(row)
 
     async def find_by_id(self, id: int, db: AsyncSession):
         return await quest_repo.find_by_id(db, id)
 
+    async def get_detailed(self, db: AsyncSession, mongo_db, id_: int) -> dict:
+        """
+        Квест из Postgres + сценарий из Mongo, оба запроса идут параллельно.
+        Ошибка/таймаут SQL отменяет запрос в Mongo и пробрасывается наружу;
+        медленный или недоступный Mongo даёт деградированный ответ без scenario.
+        """
+        try:
+            async with asyncio.TaskGroup() as tg:
+                quest_task = tg.create_task(self._find_quest(db, id_))
+                scenario_task = tg.create_task(self._find_scenario(mongo_db, id_))
+        except BaseExceptionGroup as eg:
+            # _find_scenario ошибок не бросает — в группе только ошибка SQL-ветки
+            raise eg.exceptions[0] from None
+
+        # Готовый JSON формата QuestDetailedOut, без model_validate -> model_dump -> конструктора
+        return {**quest_payload(quest_task.result()), "scenario": scenario_task.result()}
+
     async def save(self, db: AsyncSession, payload: QuestCreate) -> Quest:
         obj = Quest(**payload.model_dump())
         await quest_repo.save(db, obj)
+        await catalog_versions.bump(db, QUESTS)
         await db.commit()
         await db.refresh(obj)
         return obj
@@ -25,7 +69,34 @@ class QuestService:
         deleted = await quest_repo.delete_by_id(db, id_)
         if not deleted:
             raise NotFoundError(f"Position not found with id: {id_}")
+        await catalog_versions.bump(db, QUESTS)
         await db.commit()
+        quest_scenario_cache.invalidate(id_)
+
+    # -------- Helpers --------
+
+    async def _find_quest(self, db: AsyncSession, id_: int) -> Quest:
+        async with asyncio.timeout(settings.quest_sql_timeout_s):
+            quest = await quest_repo.find_by_id(db, id_)
+        if not quest:
+            raise NotFoundError(f"Quest not found with id: {id_}")
+        return quest
+
+    async def _find_scenario(self, mongo_db, id_: int) -> Optional[Dict[str, Any]]:
+        if mongo_db is None:
+            return None  # Mongo выключен
+
+        async def _load() -> Optional[Dict[str, Any]]:
+            doc = await mongo_db["quest_meta"].find_one({"quest_id": id_}, {"_id": 0, "scenario": 1})
+            return (doc or {}).get("scenario")
+
+        try:
+            # Таймаут ограничивает только ожидание: начатая загрузка доиграет и заполнит кэш
+            async with asyncio.timeout(settings.quest_mongo_timeout_s):
+                return await quest_scenario_cache.get_or_load(id_, _load)
+        except (TimeoutError, PyMongoError) as e:
+            logger.warning("Quest %s: scenario omitted, quest_meta lookup failed: %r", id_, e)
+            return None
 
 
 quest_service = QuestService()
@@ -1,28 +1,46 @@
 # services/skill_service.py
 from __future__ import annotations
 
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict, Tuple
 
-from sqlalchemy import select, update, and_
+from sqlalchemy import select, and_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from repositories.skill_repo import skill_repo
-from repositories.theory_repo import theory_repo
-from schemas.skill import SkillCreate, SkillUpdate
-from schemas.theory import TheoryCreate, TheoryOut
+from repositories.theory_repo import THEORY_FIELD_COLUMNS, theory_repo
+from schemas.skill import SkillCreate, SkillUpdate, skill_payload
+from schemas.theory import THEORY_FIELD_PAYLOADS, TheoryCreate, TheoryFields, theory_tree_payload
 from models.models import Skill, Theory
+from services.catalog_snapshot import CatalogSnapshot
 from services.exceptions import NotFoundError
+from services.versions import catalog_versions, PROFESSIONS, SKILLS, THEORIES
 
 
 class SkillService:
     # -------- BASIC CRUD --------
 
-    async def find_all(self, db: AsyncSession) -> List[Skill]:
-        return await skill_repo.find_all(db)
+    async def find_all(
+        self,
+        db: AsyncSession,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        snapshot: Optional[CatalogSnapshot] = None,
+    ) -> List[dict]:
+        if snapshot is not None:
+            return snapshot.find_skills(after_id, limit)
+        rows = await skill_repo.find_all_rows(db, after_id=after_id, limit=limit)
+        return [skill_payload(row) for row in rows]
+
+    async def stream_all(self, db: AsyncSession, after_id: Optional[int] = None) -> AsyncIterator[dict]:
+        async for row in skill_repo.stream_all(db, after_id):
+            yield skill_payload(row)
 
     async def save(self, db: AsyncSession, payload: SkillCreate) -> Skill:
         obj = Skill(**payload.model_dump())
         await skill_repo.save(db, obj)
+        await catalog_versions.bump(db, SKILLS)
         await db.commit()
         await db.refresh(obj)
         return obj
@@ -38,6 +56,7 @@ class SkillService:
                 setattr(existing, field, data[field])
 
         await skill_repo.save(db, existing)
+        await catalog_versions.bump(db, SKILLS)
         await db.commit()
         await db.refresh(existing)
         return existing
@@ -46,74 +65,35 @@ class SkillService:
         deleted = await skill_repo.delete_by_id(db, id_)
         if not deleted:
             raise NotFoundError(f"Position not found with id: {id_}")
+        await catalog_versions.bump(db, PROFESSIONS, SKILLS, THEORIES)
         await db.commit()
 
     # -------- QUERIES / BUSINESS --------
 
-    async def get_theories_by_skill(self, db: AsyncSession, skill_id: int) -> List[TheoryOut]:
-
-        def _to_out(obj: Theory) -> TheoryOut:
-            """Быстрая проекция ORM -> DTO без доступа к отношениям (только столбцы)."""
-            return TheoryOut(
-                id=obj.id,
-                title=obj.title,
-                content=obj.content,
-                difficultyLevel=obj.difficulty_level,
-                orderIndex=obj.order_index,
-                skill_id=obj.skill_id,
-                parent_id=obj.parent_id,
-                subTheories=[],
-            )
-
-        if not await skill_repo.find_by_id(db, skill_id):
+    async def get_theories_by_skill(
+        self,
+        db: AsyncSession,
+        skill_id: int,
+        max_depth: Optional[int] = None,
+        fields: TheoryFields = "full",
+        snapshot: Optional[CatalogSnapshot] = None,
+    ) -> List[dict]:
+        if snapshot is not None:
+            # в снимке деревья без content: summary целиком из памяти, для full — только проверка скилла
+            if not snapshot.has_skill(skill_id):
+                raise NotFoundError("Skill not found")
+            if fields == "summary":
+                return snapshot.get_theory_tree(skill_id, max_depth)
+        elif not await skill_repo.find_by_id(db, skill_id):
             raise NotFoundError("Skill not found")
 
-        # 1) Берём корни (parent_id IS NULL) отсортированные по order_index
-        res_roots = await db.scalars(
-            select(Theory)
-            .where(and_(Theory.skill_id == skill_id, Theory.parent_id.is_(None)))
-            .order_by(Theory.order_index)
-        )
-        root_orms: List[Theory] = res_roots.all()
-        if not root_orms:
-            return []
-
-        # DTO для корней
-        roots: List[TheoryOut] = [_to_out(o) for o in root_orms]
-
-        # Индекс: id -> DTO (чтобы быстро подвешивать детей к родителю)
-        dto_index: Dict[int, TheoryOut] = {dto.id: dto for dto in roots}
-
-        # Текущая «граница» — id узлов, для которых ищем детей
-        frontier_ids: List[int] = [dto.id for dto in roots]
-
-        # 2) Идём уровнями вниз, пока есть дети
-        while frontier_ids:
-            res_children = await db.scalars(
-                select(Theory)
-                .where(Theory.parent_id.in_(frontier_ids))
-                .order_by(Theory.order_index)
-            )
-            children_orms: List[Theory] = res_children.all()
-            if not children_orms:
-                break  # дальше детей нет — все sub_theories уже []
-
-            next_frontier: List[int] = []
-
-            for child in children_orms:
-                child_dto = _to_out(child)
-                # Подвешиваем к родителю (он уже есть в индексе)
-                parent_dto = dto_index.get(child.parent_id)
-                if parent_dto is not None:
-                    parent_dto.subTheories.append(child_dto)
-                # Регистрируем текущего ребёнка как потенциального родителя следующего уровня
-                dto_index[child_dto.id] = child_dto
-                next_frontier.append(child_dto.id)
-
-            frontier_ids = next_frontier
-
-        # На этом этапе у всех листьев sub_theories == []
-        return roots
+        # 1) Всё поддерево одним запросом по материализованному пути (только столбцы, без ORM-отношений;
+        #    для summary — и без content)
+        rows = await theory_repo.find_tree_rows_by_skill(db, skill_id, max_depth, THEORY_FIELD_COLUMNS[fields])
+
+        # 2) Сборка дерева за O(n); узлы — готовые JSON-словари формата TheoryOut/TheorySummaryOut,
+        #    без pydantic-валидации
+        return theory_tree_payload(rows, THEORY_FIELD_PAYLOADS[fields])
 
     async def add_new_theory_to_skill(self, db: AsyncSession, skill_id: int, payload: TheoryCreate) -> Theory:
         # (1) Найти скилл
@@ -134,10 +114,10 @@ class SkillService:
                 raise RuntimeError("Parent theory belongs to another skill")
 
             max_idx = await self._max_order_index_among_children(db, parent_id)
-            next_index = (max_idx or 0) + 1
+            next_index = self._next_order_index(max_idx)
         else:
             max_idx = await self._max_order_index_among_root_theories(db, skill_id)
-            next_index = (max_idx or 0) + 1
+            next_index = self._next_order_index(max_idx)
 
         # (3) Создать Theory и задать поля
         new_theory = Theory()
@@ -153,6 +133,7 @@ class SkillService:
             self._set_parent_and_skill_in_subtheories(new_theory, skill_id)
 
         await theory_repo.save(db, new_theory)
+        await catalog_versions.bump(db, THEORIES)
         await db.commit()
         await db.refresh(new_theory)
         return new_theory
@@ -180,39 +161,48 @@ class SkillService:
                 raise NotFoundError("Parent theory not found")
             if new_parent.skill_id != skill_id:
                 raise RuntimeError("Parent theory belongs to another skill")
+            # путь родителя начинается с пути target — родитель внутри поддерева target (или он сам)
+            if new_parent.path.startswith(target.path):
+                raise RuntimeError("Theory cannot be moved under itself or its descendant")
 
-        # 3) Получить список «детей» для нового родителя (или корневой список)
+        # 3) Текущий порядок «соседей» у нового родителя (или корневой список) — только (id, order_index)
         if new_parent is not None:
-            children = await self._get_children_of_parent(db, new_parent.id)
+            siblings = await self._get_children_order(db, new_parent.id)
         else:
-            children = await self._get_theories_by_skill(db, skill_id)  # корневые
-
-        # 4) Обновить у target теории parent_id и временно order_index
-        target.parent_id = new_parent.id if new_parent else None
-        target.order_index = int(new_index_position)
-        await theory_repo.save(db, target)
-        await db.flush()
-
-        # 5) Пересобрать порядок: исключаем target из текущего children списка и вставляем на новую позицию
-        children_wo_target = [t for t in children if t.id != target_theory_id]
-        # границы позиции
-        pos = max(0, min(int(new_index_position), len(children_wo_target)))
-        children_reordered = list(children_wo_target)
-        children_reordered.insert(pos, target)
-
-        # 6) Пронумеровать 0..N-1 и закоммитить
-        for i, t in enumerate(children_reordered):
-            # обновляем in-memory и БД
-            t.order_index = i
-
-        # Эффективная массовая запись — единым UPDATE (опционально):
-        for t in children_reordered:
-            await db.execute(
-                update(Theory)
-                .where(Theory.id == t.id)
-                .values(order_index=t.order_index, parent_id=t.parent_id)
-            )
-
+            siblings = await self._get_root_theories_order(db, skill_id)  # корневые
+        siblings = [(id_, idx) for id_, idx in siblings if id_ != target_theory_id]
+
+        # 4) Новая позиция target среди соседей (с границами)
+        pos = max(0, min(int(new_index_position), len(siblings)))
+
+        # 5) В sparse-режиме сначала пробуем встать в «зазор» между соседями — меняется одна строка
+        new_order: Optional[Dict[int, int]] = None
+        if settings.theory_order_mode == "sparse":
+            gap_index = self._gap_order_index(siblings, pos)
+            if gap_index is not None:
+                new_order = {target_theory_id: gap_index}
+
+        # 6) Иначе перенумеровать: 0..N-1 (dense) или с шагом theory_order_gap (sparse),
+        #    в UPDATE попадают только target и строки, чей order_index действительно меняется
+        if new_order is None:
+            ids = [id_ for id_, _ in siblings]
+            ids.insert(pos, target_theory_id)
+            current = dict(siblings)
+            step, offset = self._order_step()
+            new_order = {
+                id_: offset + i * step
+                for i, id_ in enumerate(ids)
+                if id_ == target_theory_id or current.get(id_) != offset + i * step
+            }
+
+        # 7) Одним UPDATE ... FROM (VALUES ...) и коммит; пути поддерева переписывает триггер
+        try:
+            await theory_repo.reorder(db, new_parent_id, new_order)
+        except IntegrityError:
+            # параллельный перенос успел сделать нового родителя потомком target
+            await db.rollback()
+            raise RuntimeError("Theory cannot be moved under itself or its descendant")
+        await catalog_versions.bump(db, THEORIES)
         await db.commit()
 
     # -------- Helpers --------
@@ -235,21 +225,47 @@ class SkillService:
         )
         return res.scalar_one_or_none()
 
-    async def _get_children_of_parent(self, db: AsyncSession, parent_id: int) -> List[Theory]:
+    async def _get_children_order(self, db: AsyncSession, parent_id: int) -> List[Tuple[int, int]]:
         res = await db.execute(
-            select(Theory)
+            select(Theory.id, Theory.order_index)
             .where(Theory.parent_id == parent_id)
-            .order_by(Theory.order_index)
+            .order_by(Theory.order_index, Theory.id)
         )
-        return list(res.scalars())
+        return [tuple(row) for row in res.all()]
 
-    async def _get_theories_by_skill(self, db: AsyncSession, skill_id: int) -> List[Theory]:
-        res_roots = await db.scalars(
-            select(Theory)
+    async def _get_root_theories_order(self, db: AsyncSession, skill_id: int) -> List[Tuple[int, int]]:
+        res = await db.execute(
+            select(Theory.id, Theory.order_index)
             .where(and_(Theory.skill_id == skill_id, Theory.parent_id.is_(None)))
-            .order_by(Theory.order_index)
+            .order_by(Theory.order_index, Theory.id)
         )
-        return list(res_roots)
+        return [tuple(row) for row in res.all()]
+
+    def _order_step(self) -> Tuple[int, int]:
+        """(шаг, первый индекс) нумерации соседей: dense — 0, 1, 2...; sparse — gap, 2*gap..."""
+        if settings.theory_order_mode == "sparse":
+            return settings.theory_order_gap, settings.theory_order_gap
+        return 1, 0
+
+    def _next_order_index(self, max_idx: Optional[int]) -> int:
+        if settings.theory_order_mode == "sparse":
+            return (max_idx or 0) + settings.theory_order_gap
+        return (max_idx or 0) + 1
+
+    def _gap_order_index(self, siblings: List[Tuple[int, int]], pos: int) -> Optional[int]:
+        """
+        order_index для вставки на позицию pos без перенумерации соседей
+        или None, если свободного зазора нет.
+        """
+        if not siblings:
+            return settings.theory_order_gap
+        lower = siblings[pos - 1][1] if pos > 0 else 0
+        if pos == len(siblings):
+            return lower + settings.theory_order_gap
+        upper = siblings[pos][1]
+        if upper - lower >= 2:
+            return (lower + upper) // 2
+        return None
 
     def _set_parent_and_skill_in_subtheories(self, parent: Theory, skill_id: int) -> None:
         """
@@ -1,17 +1,104 @@
 # app/services/theory_service.py
+import re
+from typing import AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from repositories.theory_repo import theory_repo
-from schemas.theory import TheoryCreate, TheoryUpdate
+from repositories.theory_repo import THEORY_FIELD_COLUMNS, theory_repo
+from schemas.theory import (
+    THEORY_FIELD_PAYLOADS,
+    TheoryCreate,
+    TheoryFields,
+    TheoryUpdate,
+    theory_payload,
+    theory_search_payload,
+    theory_tree_payload,
+)
 from models.models import Theory
 from services.exceptions import NotFoundError
+from services.versions import catalog_versions, THEORIES
+
+_WORD = re.compile(r"\w+")
+
+
+def search_tsquery(text: str) -> str:
+    """
+    Строка поиска -> текст для to_tsquery: все слова обязательны (&), последнее — как префикс
+    (поиск по мере набора). Пунктуация и операторы tsquery из ввода отбрасываются.
+    ValueError, если слов нет.
+    """
+    words = _WORD.findall(text)
+    if not words:
+        raise ValueError("Search query has no words")
+    return " & ".join(f"'{word}'" for word in words) + ":*"
+
 
 class TheoryService:
-    async def find_all(self, db: AsyncSession):
-        return await theory_repo.find_all(db)
+    async def find_all(
+        self,
+        db: AsyncSession,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        fields: TheoryFields = "full",
+    ) -> List[dict]:
+        rows = await theory_repo.find_all_rows(
+            db, after_id=after_id, limit=limit, columns=THEORY_FIELD_COLUMNS[fields]
+        )
+        payload = THEORY_FIELD_PAYLOADS[fields]
+        return [payload(row) for row in rows]
+
+    async def stream_all(
+        self, db: AsyncSession, after_id: Optional[int] = None, fields: TheoryFields = "full"
+    ) -> AsyncIterator[dict]:
+        payload = THEORY_FIELD_PAYLOADS[fields]
+        async for row in theory_repo.stream_all(db, after_id, columns=THEORY_FIELD_COLUMNS[fields]):
+            yield payload(row)
+
+    async def get_by_id(self, db: AsyncSession, id_: int) -> dict:
+        rows = await theory_repo.find_rows_by_ids(db, [id_])
+        if not rows:
+            raise NotFoundError(f"Theory not found with id={id_}")
+        return theory_payload(rows[0])
+
+    async def find_by_ids(self, db: AsyncSession, ids: List[int]) -> List[dict]:
+        """Тела теорий пачкой (по возрастанию id); несуществующие id пропускаются."""
+        rows = await theory_repo.find_rows_by_ids(db, sorted(set(ids)))
+        return [theory_payload(row) for row in rows]
+
+    async def search(
+        self,
+        db: AsyncSession,
+        text: str,
+        skill_id: Optional[int] = None,
+        profession_id: Optional[int] = None,
+        after: Optional[Tuple[float, int]] = None,
+        limit: int = 20,
+    ) -> List[dict]:
+        rows = await theory_repo.search_rows(
+            db, search_tsquery(text), skill_id=skill_id, profession_id=profession_id, after=after, limit=limit
+        )
+        return [theory_search_payload(row) for row in rows]
+
+    async def get_subtree(self, db: AsyncSession, id_: int, fields: TheoryFields = "full") -> dict:
+        """Теория со всеми потомками (вложенные subTheories) — один запрос по материализованному пути."""
+        rows = await theory_repo.find_subtree_rows(db, id_, columns=THEORY_FIELD_COLUMNS[fields])
+        roots = theory_tree_payload(rows, THEORY_FIELD_PAYLOADS[fields])
+        if not roots:
+            raise NotFoundError(f"Theory not found with id={id_}")
+        return roots[0]
+
+    async def get_ancestors(self, db: AsyncSession, id_: int, fields: TheoryFields = "full") -> List[dict]:
+        """Цепочка предков от корня к родителю (хлебные крошки); у корня — пустой список."""
+        rows = await theory_repo.find_ancestor_rows(db, id_, columns=THEORY_FIELD_COLUMNS[fields])
+        if not rows and not await theory_repo.exists_by_id(db, id_):
+            raise NotFoundError(f"Theory not found with id={id_}")
+        payload = THEORY_FIELD_PAYLOADS[fields]
+        return [payload(row) for row in rows]
 
     async def save(self, db: AsyncSession, payload: TheoryCreate) -> Theory:
         obj = Theory(**payload.model_dump())
         await theory_repo.save(db, obj)
+        await catalog_versions.bump(db, THEORIES)
         await db.commit()
         return obj
 
@@ -19,6 +106,7 @@ class TheoryService:
         if not await theory_repo.exists_by_id(db, id_):
             raise NotFoundError(f"Theory not found with id={id_}")
         await theory_repo.delete_by_id(db, id_)
+        await catalog_versions.bump(db, THEORIES)
         await db.commit()
 
     async def update(self, db: AsyncSession, id_: int, payload: TheoryUpdate) -> Theory:
@@ -27,6 +115,14 @@ class TheoryService:
             raise NotFoundError("Theory not found")
 
         data = payload.model_dump(exclude_unset=True)
+        # до изменения атрибутов: иначе запрос родителя сбросит UPDATE (autoflush) и path устареет
+        parent_id = data.get("parent_id")
+        if parent_id is not None and parent_id != existing.parent_id:
+            parent = await theory_repo.find_by_id(db, parent_id)
+            if not parent:
+                raise NotFoundError("Parent theory not found")
+            if parent.path.startswith(existing.path):
+                raise RuntimeError("Theory cannot be moved under itself or its descendant")
         if "title" in data and data["title"] is not None:
             existing.title = data["title"]
         if "content" in data and data["content"] is not None:
@@ -35,7 +131,13 @@ class TheoryService:
             if k in data and data[k] is not None:
                 setattr(existing, k, data[k])
 
-        await theory_repo.save(db, existing)
+        # path/depth (и пути потомков) при смене parent_id пересчитывает триггер
+        try:
+            await theory_repo.save(db, existing)
+        except IntegrityError:
+            await db.rollback()
+            raise RuntimeError("Theory cannot be moved under itself or its descendant")
+        await catalog_versions.bump(db, THEORIES)
         await db.commit()
         return existing
 
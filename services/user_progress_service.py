@@ -1,27 +1,201 @@
 # services/user_progress_service.py
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import Table
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from repositories.profession_repo import profession_repo
+from repositories.quest_repo import quest_repo
 from repositories.user_progress_repo import user_progress_repo
-from models.models import UserProgress
-
-
-FIXED_UP_ID = 1
+from models.models import (
+    UserProgress,
+    user_completed_quests,
+    user_completed_theories,
+    user_selected_professions,
+)
+from schemas.user_progress import (
+    IdEncoding,
+    ProfessionProgressOut,
+    ProgressDeltaOut,
+    ProgressItemIn,
+    SkillProgressOut,
+    TheoryProgressOut,
+    user_progress_payload,
+)
+from services.exceptions import NotFoundError
 
 
 class UserProgressService:
-    async def get_user_progress(self, db: AsyncSession) -> UserProgress | None:
-        return await user_progress_repo.find_by_id(db, FIXED_UP_ID)
+    # id прогресса = id пользователя: одна строка user_progress на пользователя
 
-    async def create_user_progress(self, db: AsyncSession, user_name: str) -> UserProgress:
-        existing = await user_progress_repo.find_by_id(db, FIXED_UP_ID)
+    async def get_user_progress(
+        self, db: AsyncSession, user_id: int, encoding: IdEncoding = "ids"
+    ) -> dict | None:
+        # списки id берутся прямо из таблиц связей, ORM-объекты каталога не загружаются
+        row = await user_progress_repo.find_row_with_ids(db, user_id)
+        return user_progress_payload(row, encoding) if row is not None else None
+
+    async def create_user_progress(self, db: AsyncSession, user_id: int, user_name: str) -> dict:
+        existing = await user_progress_repo.find_by_id(db, user_id)
         if existing:
-            raise RuntimeError("UserProgress with ID 1 already exists")
+            raise RuntimeError(f"UserProgress for user {user_id} already exists")
+
+        up = UserProgress(id=user_id, user_name=user_name)
+        try:
+            await user_progress_repo.save(db, up)
+        except IntegrityError:
+            # параллельное создание того же пользователя
+            await db.rollback()
+            raise RuntimeError(f"UserProgress for user {user_id} already exists")
+        await db.commit()
+        return await self.get_user_progress(db, user_id)
+
+    async def complete_theories(
+        self, db: AsyncSession, mongo_db, user_id: int, items: List[ProgressItemIn]
+    ) -> ProgressDeltaOut:
+        ids = self._unique_ids(items)
+        rewards = await self._theory_rewards(db, mongo_db, ids)
+        return await self._add_items(db, user_id, user_completed_theories, "theory_id", ids, rewards, "Theory")
+
+    async def complete_quests(
+        self, db: AsyncSession, mongo_db, user_id: int, items: List[ProgressItemIn]
+    ) -> ProgressDeltaOut:
+        ids = self._unique_ids(items)
+        rewards = await self._quest_rewards(mongo_db, ids)
+        return await self._add_items(db, user_id, user_completed_quests, "quest_id", ids, rewards, "Quest")
+
+    async def select_professions(self, db: AsyncSession, user_id: int, ids: List[int]) -> ProgressDeltaOut:
+        ids = sorted(set(ids))
+        return await self._add_items(db, user_id, user_selected_professions, "profession_id", ids, {}, "Profession")
+
+    # -------- Сводки прогресса --------
+
+    async def skill_summary(self, db: AsyncSession, user_id: int, skill_id: int) -> SkillProgressOut:
+        await self._require_progress(db, user_id)
+        rows = await user_progress_repo.skill_summary_rows(db, user_id, skill_ids=[skill_id])
+        if not rows:
+            raise NotFoundError("Skill not found")
+        return self._skill_progress(rows[0])
 
-        up = UserProgress(id=FIXED_UP_ID, user_name=user_name)
-        await user_progress_repo.save(db, up)
+    async def profession_summary(
+        self, db: AsyncSession, user_id: int, profession_id: int
+    ) -> ProfessionProgressOut:
+        await self._require_progress(db, user_id)
+        rows = await user_progress_repo.skill_summary_rows(db, user_id, profession_id=profession_id)
+        # пустой список — профессия без скиллов или её нет
+        if not rows and not await profession_repo.find_by_id(db, profession_id):
+            raise NotFoundError("Profession not found")
+        skills = [self._skill_progress(row) for row in rows]
+        total = sum(s.total for s in skills)
+        completed = sum(s.completed for s in skills)
+        return ProfessionProgressOut(
+            professionId=profession_id,
+            total=total,
+            completed=completed,
+            percent=self._percent(completed, total),
+            skills=skills,
+        )
+
+    async def theory_summary(self, db: AsyncSession, user_id: int, theory_id: int) -> TheoryProgressOut:
+        await self._require_progress(db, user_id)
+        row = await user_progress_repo.theory_subtree_summary(db, user_id, theory_id)
+        if not row.total:
+            raise NotFoundError("Theory not found")
+        return TheoryProgressOut(
+            theoryId=theory_id,
+            total=row.total,
+            completed=row.completed,
+            percent=self._percent(row.completed, row.total),
+        )
+
+    # -------- Helpers --------
+
+    async def _add_items(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        junction: Table,
+        item_column: str,
+        ids: List[int],
+        rewards: Dict[int, Tuple[int, int]],
+        item_name: str,
+    ) -> ProgressDeltaOut:
+        # ids отсортированы — одинаковый порядок блокировок у пересекающихся запросов, без взаимных блокировок
+        rows = [(id_, *rewards.get(id_, (0, 0))) for id_ in ids]
+        try:
+            row = await user_progress_repo.add_items(db, user_id, junction, item_column, rows)
+        except IntegrityError:
+            # FK: нет такого элемента каталога или самого прогресса
+            await db.rollback()
+            raise NotFoundError(f"{item_name} or user progress not found")
+        if row is None:
+            await db.rollback()
+            raise NotFoundError("User progress not found")
         await db.commit()
-        await db.refresh(up)
-        return up
+        return ProgressDeltaOut(
+            added=sorted(row.added or []),
+            totalExperiencePoints=row.total_experience_points,
+            totalGoldPoints=row.total_gold_points,
+        )
+
+    @staticmethod
+    def _unique_ids(items: List[ProgressItemIn]) -> List[int]:
+        # повтор id в одном запросе считаем одним элементом
+        return sorted({item.id for item in items})
+
+    # Очки не принимаются от клиента: их задаёт каталог. Квест хранит награды в quest_meta.rewards
+    # (schemas.quest.QuestRewards): experience/goldPoints — за сам квест,
+    # theoryExperience/theoryGoldPoints — за каждую пройденную теорию квеста
+    # (теория из нескольких квестов получает сумму). mongo_db=None — без Mongo, очков нет.
+    # Ошибка Mongo пробрасывается до записи: прогресс без положенных очков не фиксируется.
+
+    async def _quest_meta_rewards(self, mongo_db, quest_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        quest_ids = list(quest_ids)
+        if mongo_db is None or not quest_ids:
+            return {}
+        cursor = mongo_db["quest_meta"].find({"quest_id": {"$in": quest_ids}}, {"_id": 0, "quest_id": 1, "rewards": 1})
+        return {doc["quest_id"]: doc.get("rewards") or {} async for doc in cursor}
+
+    async def _quest_rewards(self, mongo_db, quest_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+        meta = await self._quest_meta_rewards(mongo_db, quest_ids)
+        return {
+            quest_id: (int(r.get("experiencePoints", 0)), int(r.get("goldPoints", 0)))
+            for quest_id, r in meta.items()
+        }
+
+    async def _theory_rewards(
+        self, db: AsyncSession, mongo_db, theory_ids: List[int]
+    ) -> Dict[int, Tuple[int, int]]:
+        if mongo_db is None:
+            return {}
+        links = await quest_repo.find_theory_links(db, theory_ids)
+        meta = await self._quest_meta_rewards(mongo_db, {link.quest_id for link in links})
+        rewards: Dict[int, Tuple[int, int]] = {}
+        for link in links:
+            r = meta.get(link.quest_id, {})
+            xp, gold = rewards.get(link.theory_id, (0, 0))
+            rewards[link.theory_id] = (
+                xp + int(r.get("theoryExperiencePoints", 0)),
+                gold + int(r.get("theoryGoldPoints", 0)),
+            )
+        return rewards
+
+    async def _require_progress(self, db: AsyncSession, user_id: int) -> None:
+        if not await user_progress_repo.find_by_id(db, user_id):
+            raise NotFoundError("User progress not found")
+
+    def _skill_progress(self, row) -> SkillProgressOut:
+        return SkillProgressOut(
+            skillId=row.skill_id,
+            total=row.total,
+            completed=row.completed,
+            percent=self._percent(row.completed, row.total),
+        )
+
+    @staticmethod
+    def _percent(completed: int, total: int) -> float:
+        return round(completed * 100 / total, 1) if total else 0.0
 
 
 user_progress_service = UserProgressService()
@@ -0,0 +1,101 @@
+# services/versions.py
+import asyncio
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.session import engine
+from models.models import catalog_version
+
+PROFESSIONS = "professions"
+SKILLS = "skills"
+THEORIES = "theories"
+QUESTS = "quests"
+RESOURCES = (PROFESSIONS, SKILLS, THEORIES, QUESTS)
+
+
+class ResourceVersions:
+    """
+    Версии каталога, общие для всех воркеров и подов: строка catalog_version в Postgres.
+    Мутирующие методы сервисов увеличивают версии затронутых ресурсов последним
+    оператором своей транзакции (bump) — версия фиксируется вместе с данными.
+    Роутеры строят из версий ETag и отвечают 304 Not Modified, не запрашивая каталог.
+
+    Процесс держит прочитанные версии не дольше ttl_s (refresh перед get/etag):
+    изменения других процессов видны клиентам и CDN не позже чем через ttl_s, свои —
+    сразу после commit (bump сбрасывает версии процесса). ttl_s = 0 — читать строку
+    на каждый запрос. epoch строки меняется при её пересоздании (новая база).
+    """
+
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self.epoch = ""
+        self._versions: Dict[str, int] = {}
+        self._expires_at = float("-inf")
+        # сбросы после commit: загрузка, начатая до сброса, не продлевает старые версии
+        self._invalidations = 0
+        self._loading: Optional[asyncio.Task] = None
+        self._loading_invalidations = -1
+        self.reads = 0
+
+    async def bump(self, db: AsyncSession, *resources: str) -> None:
+        """Увеличивает версии в транзакции db; вызывать непосредственно перед commit."""
+        # строка блокируется до commit — поэтому последним оператором, после всех изменений
+        stmt = (
+            insert(catalog_version)
+            .values(id=1, **{resource: 1 for resource in resources})
+            .on_conflict_do_update(
+                index_elements=[catalog_version.c.id],
+                set_={resource: catalog_version.c[resource] + 1 for resource in resources},
+            )
+        )
+        await db.execute(stmt)
+        event.listen(db.sync_session, "after_commit", self._expire, once=True)
+
+    async def refresh(self) -> None:
+        """Перечитывает версии, если закэшированные старше ttl_s (одна загрузка на всех ждущих)."""
+        if time.monotonic() < self._expires_at:
+            return
+        task = self._loading
+        if task is None or self._loading_invalidations != self._invalidations:
+            task = asyncio.ensure_future(self._load())
+            self._loading, self._loading_invalidations = task, self._invalidations
+            task.add_done_callback(self._on_loaded)
+        await asyncio.shield(task)
+
+    def get(self, resource: str) -> int:
+        return self._versions.get(resource, 0)
+
+    def etag(self, *resources: str, generation: Optional[int] = None) -> str:
+        """generation — поколение снимка каталога, из которого отдан ответ (api.conditional)."""
+        parts = ".".join(f"{r}{self.get(r)}" for r in resources)
+        if generation is not None:
+            parts += f".g{generation:x}"
+        return f'W/"{self.epoch}-{parts}"'
+
+    # -------- Helpers --------
+
+    def _expire(self, session) -> None:
+        self._invalidations += 1
+        self._expires_at = float("-inf")
+
+    def _on_loaded(self, task: asyncio.Task) -> None:
+        if self._loading is task:
+            self._loading = None
+
+    async def _load(self) -> None:
+        invalidations = self._invalidations
+        async with engine.connect() as conn:
+            row = (await conn.execute(select(catalog_version).where(catalog_version.c.id == 1))).first()
+        self.reads += 1
+        self.epoch = row.epoch if row is not None else ""
+        self._versions = {resource: getattr(row, resource) if row is not None else 0 for resource in RESOURCES}
+        if invalidations == self._invalidations:
+            self._expires_at = time.monotonic() + self.ttl_s
+
+
+catalog_versions = ResourceVersions(settings.catalog_versions_ttl_s)
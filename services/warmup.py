@@ -0,0 +1,94 @@
+# services/warmup.py
+"""
+Прогрев процесса на старте (lifespan), чтобы первые запросы холодного пода не платили за:
+- настройку мапперов SQLAlchemy (configure_mappers при первом запросе к ORM);
+- сборку OpenAPI-схемы (строится лениво при первом /docs или /openapi.json);
+- установку соединений: settings.warmup_db_connections соединений Postgres
+  и settings.warmup_mongo_connections соединений Mongo открываются параллельно;
+- компиляцию горячих запросов: каждый прогреваемый сеанс выполняет их по разу —
+  SQL попадает в кэш компиляции движка, prepared statements — в кэш каждого соединения;
+- первую сборку снимка каталога (services.catalog_snapshot), если он включён.
+
+Ошибки шагов логируются и не валят старт: без прогрева сервис работает, только медленнее.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict
+
+from fastapi import FastAPI
+from sqlalchemy.orm import configure_mappers
+
+from core.config import settings
+from db.mongo import get_mongo_db
+from db.session import AsyncSessionLocal
+from services.catalog_snapshot import catalog_snapshot
+from services.profession_service import profession_service
+from services.quest_service import quest_service
+from services.skill_service import skill_service
+from services.theory_service import theory_service
+from services.user_progress_service import user_progress_service
+
+logger = logging.getLogger(__name__)
+
+
+async def _hot_queries() -> None:
+    """Горячие чтения каталога и прогресса на одном соединении (выборки по одной строке)."""
+    async with AsyncSessionLocal() as db:
+        await profession_service.find_all(db, limit=1)
+        skills = await skill_service.find_all(db, limit=1)
+        await theory_service.find_all(db, limit=1)
+        await theory_service.find_all(db, limit=1, fields="summary")
+        await quest_service.find_all(db, limit=1)
+        if skills:
+            await skill_service.get_theories_by_skill(db, skills[0]["id"])
+        await user_progress_service.get_user_progress(db, 0)
+
+
+async def _db_connections() -> None:
+    # параллельно — иначе все сеансы получили бы одно и то же соединение из пула
+    count = min(settings.warmup_db_connections, settings.db_pool_size)
+    await asyncio.gather(*(_hot_queries() for _ in range(count)))
+
+
+async def _mongo_connections() -> None:
+    db = get_mongo_db()
+    await asyncio.gather(*(db.command("ping") for _ in range(settings.warmup_mongo_connections)))
+
+
+async def warm_up(app: FastAPI) -> Dict[str, float]:
+    """Выполняет шаги прогрева; возвращает длительность каждого в секундах (для лога и бенчмарка)."""
+    steps: Dict[str, Callable[[], Awaitable[None]]] = {}
+
+    async def _mappers() -> None:
+        configure_mappers()
+
+    async def _openapi() -> None:
+        app.openapi()
+
+    async def _catalog_snapshot() -> None:
+        await catalog_snapshot.refresh()
+
+    steps["mappers"] = _mappers
+    steps["openapi"] = _openapi
+    if settings.warmup_db_connections:
+        steps["postgres"] = _db_connections
+    if settings.mongo_enabled and settings.warmup_mongo_connections:
+        steps["mongo"] = _mongo_connections
+    if settings.catalog_snapshot_enabled:
+        steps["catalog_snapshot"] = _catalog_snapshot
+
+    timings: Dict[str, float] = {}
+    for name, step in steps.items():
+        started = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            logger.warning("Warm-up step %s failed, continuing without it: %r", name, e)
+        timings[name] = time.perf_counter() - started
+    logger.info(
+        "Warm-up done in %.1fms (%s)",
+        sum(timings.values()) * 1000,
+        ", ".join(f"{name}={elapsed * 1000:.1f}ms" for name, elapsed in timings.items()),
+    )
+    return timings
@@ -0,0 +1,118 @@
+# tests/conftest.py
+"""
+Интеграционные тесты против Postgres из APP_DB_URL (схема — alembic upgrade head).
+Без APP_DB_URL тесты пропускаются.
+
+Данные каталога создаются через API и удаляются в конце сессии.
+Кэш ответов, снимок каталога и прогрев выключены: тесты видят запросы самих эндпоинтов.
+"""
+import os
+import uuid
+
+import pytest
+
+# до импорта core.config: Settings читается один раз при импорте
+os.environ.setdefault("APP_MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("APP_MONGO_DB", "learner_test")
+os.environ["APP_RESPONSE_CACHE_ENABLED"] = "false"
+os.environ["APP_CATALOG_SNAPSHOT_ENABLED"] = "false"
+os.environ["APP_WARMUP_ENABLED"] = "false"
+# версии каталога перечитываются только после изменений — чтение catalog_version не попадает в счёт
+os.environ["APP_CATALOG_VERSIONS_TTL_S"] = "3600"
+
+# id тестового пользователя — вне диапазона реальных (как в benchmarks)
+TEST_USER_ID = 2_000_000_000 + os.getpid() % 100_000
+
+
+@pytest.fixture(scope="session")
+def client():
+    if not os.environ.get("APP_DB_URL"):
+        pytest.skip("APP_DB_URL is not set")
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def statements(client):
+    """SQL-операторы, выполненные за время запроса (то же событие, что у core.metrics)."""
+    from sqlalchemy import event
+
+    from db.session import engine
+
+    seen = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    yield seen
+    event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def request_statements(client, statements):
+    """request_statements(method, url, **kwargs) -> (response, [SQL-операторы этого запроса])."""
+
+    def _request(method: str, url: str, **kwargs):
+        statements.clear()
+        response = client.request(method, url, **kwargs)
+        return response, list(statements)
+
+    return _request
+
+
+@pytest.fixture(scope="session")
+def catalog(client):
+    """
+    Профессия со скиллом, дерево теорий скилла (корень -> ребёнок -> внук), квест
+    и прогресс тестового пользователя. Возвращает id созданных объектов.
+    """
+    tag = uuid.uuid4().hex[:8]
+
+    def created(response):
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+
+    profession = created(client.post("/api/professions", json={"name": f"test-{tag}", "icon": "t"}))
+    skill = created(client.post(f"/api/professions/{profession}/skills", json={"name": f"test-{tag}", "icon": "t"}))
+    root = created(client.post(f"/api/skills/{skill}/theories", json={"title": f"root {tag}", "content": "c"}))
+    child = created(
+        client.post(f"/api/skills/{skill}/theories", json={"title": f"child {tag}", "content": "c", "parent": root})
+    )
+    grandchild = created(
+        client.post(f"/api/skills/{skill}/theories", json={"title": f"leaf {tag}", "content": "c", "parent": child})
+    )
+    quest = created(client.post("/api/quests", json={"name": f"test-{tag}"}))
+    user_headers = {"X-User-Id": str(TEST_USER_ID)}
+    response = client.post("/api/user-progress", json={"userName": f"test-{tag}"}, headers=user_headers)
+    assert response.status_code in (201, 409), response.text
+    # после изменений версии каталога перечитываются первым запросом — делаем его здесь
+    client.get("/api/professions")
+
+    yield {
+        "profession": profession,
+        "skill": skill,
+        "theories": [root, child, grandchild],
+        "quest": quest,
+        "user_headers": user_headers,
+    }
+
+    client.delete(f"/api/quests/{quest}")
+    client.delete(f"/api/skills/{skill}")
+    client.delete(f"/api/professions/{profession}")
+    client.portal.call(_delete_user_progress, TEST_USER_ID)
+
+
+async def _delete_user_progress(user_id: int) -> None:
+    from sqlalchemy import delete
+
+    from db.session import AsyncSessionLocal
+    from models.models import UserProgress
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(UserProgress).where(UserProgress.id == user_id))
+        await db.commit()
@@ -0,0 +1,53 @@
+# tests/test_catalog_snapshot.py
+"""
+Пересборка снимка каталога по возрасту (изменение в обход catalog_version) доходит
+до клиентов: меняются ETag и X-Catalog-Generation, запись кэша готовых ответов устаревает.
+"""
+import pytest
+
+
+async def _rename_profession_bypassing_versions(profession_id: int, name: str) -> None:
+    from sqlalchemy import update
+
+    from db.session import AsyncSessionLocal
+    from models.models import Profession
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Profession).where(Profession.id == profession_id).values(name=name))
+        await db.commit()
+
+
+@pytest.fixture
+def snapshot_enabled(monkeypatch):
+    from core.config import settings
+
+    monkeypatch.setattr(settings, "catalog_snapshot_enabled", True)
+
+
+def test_rebuild_by_age_reaches_clients(catalog, client, snapshot_enabled, monkeypatch):
+    from api.compression import CachedResponse, ResponseCache
+    from api.conditional import catalog_etag
+    from services.catalog_snapshot import catalog_snapshot
+    from services.versions import PROFESSIONS
+
+    first = client.get("/api/professions")
+    etag, generation = first.headers["etag"], first.headers["x-catalog-generation"]
+    assert client.get("/api/professions", headers={"If-None-Match": etag}).status_code == 304
+
+    cache = ResponseCache(max_entries=10, max_bytes=1 << 20, ttl_s=0)
+    cache.put("key", CachedResponse(etag, (PROFESSIONS,), [], first.content, snapshot=True))
+    assert client.portal.call(cache.get, "key") is not None
+
+    renamed = f"renamed-{catalog['profession']}"
+    client.portal.call(_rename_profession_bypassing_versions, catalog["profession"], renamed)
+    # снимок ещё не устарел по возрасту — изменение не видно
+    assert client.get("/api/professions", headers={"If-None-Match": etag}).status_code == 304
+
+    monkeypatch.setattr(catalog_snapshot, "max_staleness_s", 1e-6)
+    response = client.get("/api/professions", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.headers["x-catalog-generation"] != generation
+    assert renamed in {p["name"] for p in response.json()}
+    assert client.portal.call(cache.get, "key") is None
+    assert client.portal.call(catalog_etag, (PROFESSIONS,), True)[0] == response.headers["etag"]
@@ -0,0 +1,50 @@
+# tests/test_catalog_versions.py
+"""ETag каталога из общей строки catalog_version: свои изменения видны сразу, чужие — через TTL."""
+from sqlalchemy import update
+
+
+async def _bump_as_another_worker() -> None:
+    from db.session import AsyncSessionLocal
+    from models.models import catalog_version
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(catalog_version).values(professions=catalog_version.c.professions + 1))
+        await db.commit()
+
+
+def test_not_modified_until_own_write(catalog, client):
+    etag = client.get("/api/professions").headers["etag"]
+    assert client.get("/api/professions", headers={"If-None-Match": etag}).status_code == 304
+
+    created = client.post("/api/professions", json={"name": "test-etag", "icon": "t"}).json()["id"]
+    try:
+        response = client.get("/api/professions", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+    finally:
+        client.delete(f"/api/professions/{created}")
+
+
+def test_write_by_another_worker_changes_etag_after_ttl(catalog, client, monkeypatch):
+    from services.versions import catalog_versions
+
+    etag = client.get("/api/professions").headers["etag"]
+    client.portal.call(_bump_as_another_worker)
+    # версии процесса ещё не устарели (TTL тестов — час): клиент получает 304
+    assert client.get("/api/professions", headers={"If-None-Match": etag}).status_code == 304
+
+    monkeypatch.setattr(catalog_versions, "ttl_s", 0)
+    monkeypatch.setattr(catalog_versions, "_expires_at", float("-inf"))
+    response = client.get("/api/professions", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_stream_keeps_catalog_cache_headers(catalog, client):
+    response = client.get("/api/professions", params={"stream": "true"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "etag" in response.headers and "cache-control" in response.headers
+    not_modified = client.get(
+        "/api/professions", params={"stream": "true"}, headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert not_modified.status_code == 304
@@ -0,0 +1,238 @@
+# tests/test_explain_indexes.py
+"""
+Горячие запросы используют индексы из миграций
+7b16a5dbd595, 5c2e9d41a7f3, b4e7a1c9d2f5 и e8c5d3f1a6b9.
+Индексы секций сводятся к индексу секционированной таблицы.
+
+Для каждого запроса выполняется EXPLAIN (FORMAT JSON) с enable_seqscan=off
+(на маленькой базе планировщик иначе честно выбрал бы seq scan) и ищется
+ожидаемый индекс в плане. Перед проверкой в транзакции создаётся небольшой каталог
+(много скиллов с деревьями) и собирается статистика: на пустых таблицах выбор между
+индексами theory случаен. Транзакция откатывается.
+"""
+import asyncio
+import os
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+import pytest
+
+if not os.environ.get("APP_DB_URL"):
+    pytest.skip("APP_DB_URL is not set", allow_module_level=True)
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from core.config import settings
+from models.models import (
+    Profession,
+    Quest,
+    Skill,
+    Theory,
+    UserProgress,
+    profession_skill,
+    theory_quest,
+    user_completed_theories,
+    user_completed_quests,
+    user_selected_professions,
+)
+from repositories.theory_repo import theory_repo
+
+HOT_QUERIES: List[Tuple[str, Any, str]] = [
+    (
+        "skill roots (get_theories_by_skill, _max_order_index_among_root_theories)",
+        select(Theory.id, Theory.order_index)
+        .where(Theory.skill_id == 1, Theory.parent_id.is_(None))
+        .order_by(Theory.order_index),
+        "ix_theory_skill_id_parent_id_order_index",
+    ),
+    (
+        "children of parent (_get_children_order, _max_order_index_among_children)",
+        select(Theory.id, Theory.order_index)
+        .where(Theory.parent_id == 1)
+        .order_by(Theory.order_index),
+        "ix_theory_parent_id_order_index",
+    ),
+    (
+        "skill tree by path ranges (find_tree_rows_by_skill)",
+        theory_repo.tree_rows_statement(1),
+        "ix_theory_path",
+    ),
+    (
+        "subtree by path range (find_subtree_rows, theory_subtree_summary)",
+        select(Theory.id).where(Theory.path >= "1.", Theory.path < "1.~"),
+        "ix_theory_path",
+    ),
+    (
+        "full-text search (search_rows)",
+        select(Theory.id).where(Theory.search_vector.bool_op("@@")(text("to_tsquery('russian', 'r1:*')"))),
+        "ix_theory_search_vector",
+    ),
+    (
+        "skills of professions (Profession.skills)",
+        select(profession_skill).where(profession_skill.c.profession_id.in_([1, 2])),
+        "ix_profession_skill_profession_id_skill_id",
+    ),
+    (
+        "theories of quests (Quest.theories)",
+        select(theory_quest).where(theory_quest.c.quest_id.in_([1, 2])),
+        "ix_theory_quest_quest_id_theory_id",
+    ),
+    (
+        "completed theories of one user (one hash partition)",
+        select(user_completed_theories.c.theory_id)
+        .where(user_completed_theories.c.user_progress_id == 1)
+        .order_by(user_completed_theories.c.theory_id),
+        "user_completed_theories_pkey",
+    ),
+    (
+        "ON DELETE CASCADE from theory",
+        select(user_completed_theories).where(user_completed_theories.c.theory_id == 1),
+        "ix_user_completed_theories_theory_id_user_progress_id",
+    ),
+    (
+        "ON DELETE CASCADE from quest",
+        select(user_completed_quests).where(user_completed_quests.c.quest_id == 1),
+        "ix_user_completed_quests_quest_id_user_progress_id",
+    ),
+    (
+        "ON DELETE CASCADE from profession",
+        select(user_selected_professions).where(user_selected_professions.c.profession_id == 1),
+        "ix_user_selected_professions_profession_id_user_progress_id",
+    ),
+]
+
+
+async def seed_catalog(
+    conn,
+    skills: int = 50,
+    roots: int = 10,
+    children: int = 5,
+    professions: int = 20,
+    quests: int = 50,
+    users: int = 200,
+) -> None:
+    """
+    skills скиллов, у каждого roots корней и по children детей у корня; professions профессий
+    по skills / 5 скиллов, quests квестов по корням; users пользователей с прогрессом.
+    """
+    skill_ids = (
+        await conn.execute(
+            insert(Skill).returning(Skill.id, sort_by_parameter_order=True),
+            [{"name": f"explain-{i}", "icon": "explain"} for i in range(skills)],
+        )
+    ).scalars().all()
+    root_rows = [
+        {"title": f"r{i}", "content": "-", "order_index": i, "skill_id": skill_id, "parent_id": None}
+        for skill_id in skill_ids
+        for i in range(roots)
+    ]
+    root_ids = (await conn.execute(insert(Theory).returning(Theory.id, sort_by_parameter_order=True), root_rows)).scalars().all()
+    await conn.execute(
+        insert(Theory),
+        [
+            {"title": f"c{i}", "content": "-", "order_index": i, "skill_id": row["skill_id"], "parent_id": root_id}
+            for row, root_id in zip(root_rows, root_ids)
+            for i in range(children)
+        ],
+    )
+    # связи в обе стороны: без статистики по таблицам связей планировщик берёт первичный ключ
+    profession_ids = (
+        await conn.execute(
+            insert(Profession).returning(Profession.id, sort_by_parameter_order=True),
+            [{"name": f"explain-{i}", "icon": "explain"} for i in range(professions)],
+        )
+    ).scalars().all()
+    await conn.execute(
+        insert(profession_skill),
+        [
+            {"profession_id": profession_id, "skill_id": skill_id}
+            for n, profession_id in enumerate(profession_ids)
+            for skill_id in skill_ids[n % 5 :: 5]
+        ],
+    )
+    quest_ids = (
+        await conn.execute(
+            insert(Quest).returning(Quest.id, sort_by_parameter_order=True),
+            [{"name": f"explain-{i}"} for i in range(quests)],
+        )
+    ).scalars().all()
+    await conn.execute(
+        insert(theory_quest),
+        [
+            {"quest_id": quest_id, "theory_id": theory_id}
+            for n, quest_id in enumerate(quest_ids)
+            for theory_id in root_ids[n :: len(quest_ids)]
+        ],
+    )
+    user_ids = (
+        await conn.execute(
+            insert(UserProgress).returning(UserProgress.id, sort_by_parameter_order=True),
+            [{"id": 1_000_000 + i, "user_name": f"explain-{i}"} for i in range(users)],
+        )
+    ).scalars().all()
+    await conn.execute(
+        insert(user_completed_theories),
+        [
+            {"user_progress_id": user_id, "theory_id": theory_id}
+            for n, user_id in enumerate(user_ids)
+            for theory_id in root_ids[n % 10 :: 25]
+        ],
+    )
+    await conn.execute(
+        text("ANALYZE profession, skill, theory, quest, profession_skill, theory_quest, user_completed_theories")
+    )
+
+
+def _index_names(plan: dict) -> Iterator[str]:
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for sub in plan.get("Plans", []):
+        yield from _index_names(sub)
+
+
+async def partition_index_parents(conn) -> Dict[str, str]:
+    """Индекс секции -> индекс секционированной таблицы, из которого он создан."""
+    res = await conn.execute(
+        text(
+            "SELECT c.relname, p.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE c.relkind = 'i'"
+        )
+    )
+    return dict(res.all())
+
+
+async def explain_hot_queries() -> Dict[str, Set[str]]:
+    """Имя запроса -> индексы (секционированных таблиц) в его плане."""
+    # свой движок без пула: тест не делит соединения с event loop приложения
+    engine = create_async_engine(settings.db_url, poolclass=NullPool)
+    used: Dict[str, Set[str]] = {}
+    try:
+        async with engine.connect() as conn:
+            trans = await conn.begin()
+            try:
+                await seed_catalog(conn)
+                parents = await partition_index_parents(conn)
+                await conn.execute(text("SET LOCAL enable_seqscan = off"))
+                for name, stmt, _ in HOT_QUERIES:
+                    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+                    plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar_one()[0]["Plan"]
+                    used[name] = {parents.get(index, index) for index in _index_names(plan)}
+            finally:
+                await trans.rollback()
+    finally:
+        await engine.dispose()
+    return used
+
+
+@pytest.fixture(scope="module")
+def used_indexes() -> Dict[str, Set[str]]:
+    return asyncio.run(explain_hot_queries())
+
+
+@pytest.mark.parametrize("name, expected", [(name, expected) for name, _, expected in HOT_QUERIES])
+def test_hot_query_uses_index(name, expected, used_indexes):
+    assert expected in used_indexes[name], f"{name}: expected {expected}, used {sorted(used_indexes[name]) or '-'}"
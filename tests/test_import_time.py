@@ -0,0 +1,28 @@
+# tests/test_import_time.py
+"""
+Регрессия холодного старта: медиана `python -X importtime -c "import main"` в новых
+процессах не больше settings.import_time_budget_ms (APP_IMPORT_TIME_BUDGET_MS).
+"""
+import os
+import statistics
+from pathlib import Path
+
+import pytest
+
+# Settings требует APP_DB_URL — без него main не импортируется
+pytestmark = pytest.mark.skipif(not os.environ.get("APP_DB_URL"), reason="APP_DB_URL is not set")
+
+RUNS = 5
+
+
+def test_import_main_within_budget(monkeypatch):
+    from benchmarks.cold_start import import_once
+    from core.config import settings
+
+    monkeypatch.chdir(Path(__file__).resolve().parent.parent)
+    totals = [import_once()[0] for _ in range(RUNS)]
+    median = statistics.median(totals)
+    assert median <= settings.import_time_budget_ms, (
+        f"import main: median {median:.1f}ms > budget {settings.import_time_budget_ms:.0f}ms "
+        f"(runs: {', '.join(f'{t:.0f}' for t in totals)}); top modules: python -m benchmarks.cold_start --no-startup"
+    )
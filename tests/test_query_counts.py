@@ -0,0 +1,67 @@
+# tests/test_query_counts.py
+"""
+Число SQL-операторов на эндпоинт: списки — один запрос, деталь и деревья — заданное число.
+Новое отношение с ленивой загрузкой или N+1 в сервисе сразу меняет эти числа.
+"""
+import pytest
+
+LIST_ENDPOINTS = [
+    "/api/professions",
+    "/api/professions?limit=10",
+    "/api/skills",
+    "/api/skills?limit=10",
+    "/api/theories",
+    "/api/theories?fields=summary&limit=10",
+    "/api/quests",
+    "/api/quests?limit=10",
+]
+
+# (URL-шаблон, ожидаемое число операторов); {profession}, {skill}, {root}, {leaf}, {quest} — из фикстуры catalog
+DETAIL_ENDPOINTS = [
+    # профессия + её скиллы
+    ("/api/professions/{profession}/skills", 2),
+    # скилл + всё дерево одним запросом по материализованному пути
+    ("/api/skills/{skill}/theories", 2),
+    ("/api/skills/{skill}/theories?fields=summary&maxDepth=1", 2),
+    ("/api/theories/{root}", 1),
+    ("/api/theories/batch?ids={root}&ids={leaf}", 1),
+    ("/api/theories/{root}/subtree", 1),
+    ("/api/theories/{leaf}/ancestors", 1),
+    ("/api/theories/search?q=root", 1),
+    # квест из Postgres, сценарий — из Mongo (не SQL)
+    ("/api/quests/{quest}", 1),
+    ("/api/user-progress", 1),
+    # прогресс + сводка по счётчикам
+    ("/api/user-progress/summary/skills/{skill}", 2),
+    ("/api/user-progress/summary/professions/{profession}", 2),
+    ("/api/user-progress/summary/theories/{root}", 2),
+]
+
+
+def _url(template: str, catalog: dict) -> str:
+    root, _, leaf = catalog["theories"]
+    return template.format(
+        profession=catalog["profession"], skill=catalog["skill"], quest=catalog["quest"], root=root, leaf=leaf
+    )
+
+
+@pytest.mark.parametrize("url", LIST_ENDPOINTS)
+def test_list_endpoint_issues_one_statement(url, catalog, request_statements):
+    response, statements = request_statements("GET", url)
+    assert response.status_code == 200, response.text
+    assert len(statements) == 1, statements
+
+
+@pytest.mark.parametrize("template, expected", DETAIL_ENDPOINTS)
+def test_detail_endpoint_statement_count(template, expected, catalog, request_statements):
+    response, statements = request_statements("GET", _url(template, catalog), headers=catalog["user_headers"])
+    assert response.status_code == 200, response.text
+    assert len(statements) == expected, statements
+
+
+def test_skill_tree_is_nested(catalog, client):
+    root, child, leaf = catalog["theories"]
+    tree = client.get(f"/api/skills/{catalog['skill']}/theories").json()
+    assert [node["id"] for node in tree] == [root]
+    assert [node["id"] for node in tree[0]["subTheories"]] == [child]
+    assert [node["id"] for node in tree[0]["subTheories"][0]["subTheories"]] == [leaf]
@@ -0,0 +1,105 @@
+# tests/test_response_cache.py
+"""ResponseCache: запись уходит при смене ETag ресурсов и по возрасту (ttl_s)."""
+import asyncio
+import os
+
+import pytest
+
+# Settings требует APP_DB_URL — без него модули приложения не импортируются
+pytestmark = pytest.mark.skipif(not os.environ.get("APP_DB_URL"), reason="APP_DB_URL is not set")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    from api import compression
+    from services.versions import catalog_versions
+
+    # версии считаем свежими: проверка записи не читает catalog_version
+    monkeypatch.setattr(catalog_versions, "_expires_at", float("inf"))
+    now = [1000.0]
+    monkeypatch.setattr(compression.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _get(cache, key):
+    return asyncio.run(cache.get(key))
+
+
+def _entry():
+    from api.compression import CachedResponse
+    from services.versions import PROFESSIONS, catalog_versions
+
+    return CachedResponse(catalog_versions.etag(PROFESSIONS), [PROFESSIONS], [], b"[]")
+
+
+def test_entry_expires_after_ttl(clock):
+    from api.compression import ResponseCache
+
+    cache = ResponseCache(max_entries=10, max_bytes=1024, ttl_s=5)
+    cache.put("key", _entry())
+    clock[0] += 4.9
+    assert _get(cache, "key") is not None
+    clock[0] += 0.1
+    assert _get(cache, "key") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_zero_ttl_keeps_entry_until_etag_changes(clock, monkeypatch):
+    from api.compression import ResponseCache
+    from services.versions import PROFESSIONS, catalog_versions
+
+    cache = ResponseCache(max_entries=10, max_bytes=1024, ttl_s=0)
+    cache.put("key", _entry())
+    clock[0] += 10**6
+    assert _get(cache, "key") is not None
+
+    monkeypatch.setitem(catalog_versions._versions, PROFESSIONS, catalog_versions.get(PROFESSIONS) + 1)
+    assert _get(cache, "key") is None
+    assert cache.stats()["stale"] == 1
+
+
+def _catalog_app(compress: bool):
+    from fastapi import Depends, FastAPI
+
+    from api.compression import CompressionMiddleware, ResponseCache
+    from api.conditional import catalog_cache
+    from services.versions import PROFESSIONS
+
+    cache = ResponseCache(max_entries=10, max_bytes=1 << 20, ttl_s=0)
+    app = FastAPI()
+
+    @app.get("/items", dependencies=[Depends(catalog_cache(PROFESSIONS))])
+    async def items():
+        return [{"id": i, "name": "x" * 20} for i in range(100)]
+
+    app.add_middleware(CompressionMiddleware, cache=cache, compress=compress)
+    return app, cache
+
+
+def test_cache_works_without_compression(clock):
+    from fastapi.testclient import TestClient
+
+    app, cache = _catalog_app(compress=False)
+    with TestClient(app) as client:
+        first = client.get("/items", headers={"Accept-Encoding": "gzip"})
+        second = client.get("/items", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in first.headers and "content-encoding" not in second.headers
+    assert second.json() == first.json()
+    assert cache.stats()["hits"] == 1
+
+
+def test_cached_hits_keep_route_label(clock):
+    from fastapi.testclient import TestClient
+
+    from core.metrics import RequestMetricsMiddleware, registry
+
+    app, cache = _catalog_app(compress=True)
+    app.add_middleware(RequestMetricsMiddleware)
+    with TestClient(app) as client:
+        etag = client.get("/items").headers["etag"]
+        client.get("/items")
+        assert client.get("/items", headers={"If-None-Match": etag}).status_code == 304
+    assert cache.stats()["hits"] == 2
+    rendered = registry.render()
+    assert 'learner_http_requests_total{method="GET",route="/items",status="200"} 2' in rendered
+    assert 'learner_http_requests_total{method="GET",route="/items",status="304"} 1' in rendered
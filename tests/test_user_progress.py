@@ -0,0 +1,44 @@
+# tests/test_user_progress.py
+"""Прогресс пользователя: очки считает сервер, чужой прогресс недоступен."""
+
+
+def test_client_points_are_ignored(catalog, client):
+    leaf = catalog["theories"][-1]
+    before = client.get("/api/user-progress", headers=catalog["user_headers"]).json()
+
+    response = client.post(
+        "/api/user-progress/completed-theories",
+        json={"items": [{"id": leaf, "experiencePoints": 1000, "goldPoints": 1000}]},
+        headers=catalog["user_headers"],
+    )
+    assert response.status_code == 200, response.text
+    delta = response.json()
+    assert delta["added"] == [leaf]
+    # теория не входит ни в один квест — наград нет
+    assert delta["totalExperiencePoints"] == before["totalExperiencePoints"]
+    assert delta["totalGoldPoints"] == before["totalGoldPoints"]
+
+    repeated = client.post(
+        "/api/user-progress/completed-theories", json={"items": [{"id": leaf}]}, headers=catalog["user_headers"]
+    )
+    assert repeated.json()["added"] == []
+
+
+def test_path_route_serves_only_own_progress(catalog, client):
+    from conftest import TEST_USER_ID
+
+    url = f"/api/users/{TEST_USER_ID}/progress"
+    assert client.get(url, headers=catalog["user_headers"]).status_code == 200
+    assert client.get(url, headers={"X-User-Id": str(TEST_USER_ID + 1)}).status_code == 403
+    assert client.get(url).status_code == 400
+
+
+def test_header_is_required_by_default(client):
+    assert client.get("/api/user-progress").status_code == 400
+
+
+def test_ids_beyond_int32_are_rejected(client):
+    too_big = str(2**31)
+    assert client.get("/api/user-progress", headers={"X-User-Id": too_big}).status_code == 422
+    assert client.get(f"/api/users/{too_big}/progress", headers={"X-User-Id": too_big}).status_code == 422
+    assert client.get(f"/api/professions?afterId={too_big}").status_code == 422